@@ -21,8 +21,8 @@ def create_db(db_name: str) -> Engine:
     Returns:
         SQLAlchemy Engine instance for the database
     """
-    from sqlmodel import SQLModel
+    from property_tracker.database.connection import create_database_tables
 
     engine = create_engine(f"sqlite:///{db_name}")
-    SQLModel.metadata.create_all(engine)
+    create_database_tables(engine)
     return engine
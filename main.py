@@ -1,6 +1,7 @@
 # source /home/hlynge/dev/property/venv/bin/activate
 # http://20.105.249.39:4444/
 import json
+import math
 import os
 import time
 from datetime import date
@@ -11,11 +12,32 @@ from sqlmodel import Session, select, update  #
 
 import dao
 from dao import Property
+from property_tracker.config.settings import (
+    ARCHIVE_AFTER_DAYS,
+    ARCHIVE_BATCH_SIZE,
+    BACKUP_BEFORE_RUN,
+    CHANGE_FEED_RETENTION,
+    DISTANCE_MEMO,
+    MAINTENANCE_AFTER_RUN,
+    get_shard_dir,
+    get_snapshot_path,
+)
+from property_tracker.database.backup import snapshot_database
+from property_tracker.database.maintenance import run_maintenance
+from property_tracker.database.shards import create_shard, merge_shards, prune_shards
+from property_tracker.database.snapshot import ListingSnapshot
+from property_tracker.services.archive import ArchiveService
+from property_tracker.services.changes import ChangeFeedService
+from property_tracker.services.distance_memo import DistanceMemoService
+from property_tracker.services.photos import PhotoService
 
 # Import new service abstractions
 from property_tracker.services.poi import get_poi_service
 from property_tracker.services.translation import get_translation_service
-from property_tracker.utils.distance import get_calculator
+from property_tracker.utils.admin_boundaries import admin_boundaries_available, get_admin_boundaries
+from property_tracker.utils.amenities import amenities_available, get_amenity_index
+from property_tracker.utils.distance import get_calculator, initial_bearing
+from property_tracker.utils.distance_raster import enricher_version, raster_distances
 
 # Load environment variables from .env file
 load_dotenv()
@@ -242,12 +264,6 @@ def update_sold(session, region, id_list):
     session.commit()
 
 
-def update_sold1(session):
-    statement = update(Property).values(sold=0)
-    session.execute(statement)
-    session.commit()
-
-
 def update_sold2(session, first_observed, id_list):
     sold_items = []
     for item in first_observed:
@@ -256,8 +272,9 @@ def update_sold2(session, first_observed, id_list):
             sold_items.append(item_id)
     print("Items sold are: ")
     print(sold_items)
-    statement = update(Property).values(sold=1).where(Property.id.in_(sold_items))
-    session.execute(statement)
+    # Only flip rows whose status changed, so sold_date survives across runs
+    session.execute(update(Property).values(sold=0).where(Property.sold == 1).where(~Property.id.in_(sold_items)))
+    session.execute(update(Property).values(sold=1).where(Property.sold == 0).where(Property.id.in_(sold_items)))
     session.commit()
 
 
@@ -283,6 +300,96 @@ def calc_dist_water_main(item: Property) -> Property:
     return item
 
 
+def calc_page_distances(items: list[Property], memo: DistanceMemoService | None = None) -> dict[int, dict[str, float | None]]:
+    """Calculate coast and water distances and the nearest coast point for a page of listings in one batch call.
+
+    The coast distance, the nearest coast point and the bearing to it come
+    from one exact nearest-point query, so the stored distance always matches
+    the point the coast map draws to. Water distances come from the
+    precomputed raster where it is built (``utils/build_distance_raster.py``),
+    and are calculated exactly otherwise.
+
+    Args:
+        items: Listings of a scraped page
+        memo: Answers water distances for coordinates seen before and stores the new ones (None to always calculate)
+
+    Returns:
+        Dictionary mapping property ID to {column: value}: ``dist_coast``/``dist_water`` in km,
+        rounded to 2 decimals (-1 where a distance could not be calculated), and
+        ``coast_lat``/``coast_lon``/``coast_bearing`` (None where not calculable)
+    """
+    located = [item for item in items if item.latitude is not None and item.longitude is not None]
+    if not located:
+        return {}
+    lats = [float(item.latitude) for item in located]
+    lons = [float(item.longitude) for item in located]
+
+    def water_distances(layer_lats, layer_lons):
+        return raster_distances("water", layer_lats, layer_lons, calculator=distance_calculator)
+
+    try:
+        coast, coast_lats, coast_lons = distance_calculator.nearest_coast_points(lats, lons)
+        bearings = initial_bearing(lats, lons, coast_lats, coast_lons)
+    except Exception:
+        coast = [-1] * len(located)
+        coast_lats = coast_lons = bearings = [math.nan] * len(located)
+    try:
+        water = water_distances(lats, lons) if memo is None else memo.distances("water", enricher_version("water"), lats, lons, water_distances)
+    except Exception:
+        water = [-1] * len(located)
+
+    def stored(value: float, decimals: int) -> float | None:
+        return round(float(value), decimals) if math.isfinite(value) else None
+
+    return {
+        item.id: {
+            "dist_coast": round(float(c), 2),
+            "dist_water": round(float(w), 2),
+            "coast_lat": stored(lat, 6),
+            "coast_lon": stored(lon, 6),
+            "coast_bearing": stored(bearing, 1),
+        }
+        for item, c, w, lat, lon, bearing in zip(located, coast, water, coast_lats, coast_lons, bearings, strict=True)
+    }
+
+
+def calc_page_admin(items: list[Property]) -> dict[int, tuple[str | None, str | None, str | None]]:
+    """Look up comune, province and region for a page of listings from the offline boundaries.
+
+    Args:
+        items: Listings of a scraped page
+
+    Returns:
+        Dictionary mapping property ID to (city, province, admin_region); empty when
+        the comuni boundaries are not present. Names are None outside every comune.
+    """
+    located = [item for item in items if item.latitude is not None and item.longitude is not None]
+    if not located or not admin_boundaries_available():
+        return {}
+    names = get_admin_boundaries().lookup([float(item.latitude) for item in located], [float(item.longitude) for item in located])
+    return {item.id: row for item, row in zip(located, zip(names["city"], names["province"], names["admin_region"], strict=True), strict=True)}
+
+
+def calc_page_amenities(items: list[Property]) -> dict[int, dict[str, float]]:
+    """Calculate distances to the nearest amenity of each class for a page of listings in one batch call.
+
+    Args:
+        items: Listings of a scraped page
+
+    Returns:
+        Dictionary mapping property ID to {column: distance in km, rounded to 2 decimals};
+        empty when no amenity extract has been imported. Classes without amenities are left out.
+    """
+    located = [item for item in items if item.latitude is not None and item.longitude is not None]
+    if not located or not amenities_available():
+        return {}
+    distances = get_amenity_index().distances([float(item.latitude) for item in located], [float(item.longitude) for item in located])
+    return {
+        item.id: {column: round(float(values[i]), 2) for column, values in distances.items() if math.isfinite(values[i])}
+        for i, item in enumerate(located)
+    }
+
+
 def enrich_with_pois(item: Property) -> Property:
     """Enrich property with POI counts using the configured service.
 
@@ -332,6 +439,12 @@ def update_existing_property(existing_item: Property, incoming_item: Property) -
     return existing_item
 
 
+def existing_ids(engine, ids: list[int]) -> set[int]:
+    """IDs among ``ids`` of listings already stored in a database."""
+    with Session(engine) as session:
+        return set(session.exec(select(Property.id).where(Property.id.in_(ids))).all())
+
+
 def get_list_id(session) -> list:
     statement = select(Property.id)
     data = session.execute(statement)
@@ -351,6 +464,12 @@ if __name__ == "__main__":  #
     logger.info(f"POI provider: {'google' if USE_GOOGLE_POI_PROVIDER else 'overpass'}")
     logger.info(f"POI radius (m): {POI_SEARCH_RADIUS}")
 
+    # Online snapshot before the run writes anything (readers and writers are not blocked)
+    run_db_path = DATABASE_PATH if production else os.getenv("TEST_DATABASE_PATH", "test.db")
+    if BACKUP_BEFORE_RUN and os.path.exists(run_db_path):
+        backup = snapshot_database(run_db_path)
+        logger.info(f"Snapshot of {run_db_path} written to {backup.path} in {backup.seconds:.1f}s")
+
     if production:
         db_engine = dao.create_db(DATABASE_PATH)
         # Radius-based search: (name, centro, raggio, min_lat, max_lat, min_lng, max_lng)
@@ -375,11 +494,18 @@ if __name__ == "__main__":  #
             first_observed = {}
             print("first_observed.json not found, starting with empty dictionary")
 
+    # With SHARD_DIR set, each region is crawled into its own database and merged afterwards
+    shard_dir = get_shard_dir(use_test_db=not production)
+    if shard_dir:
+        logger.info(f"Sharded crawl into {shard_dir}")
+
     total_count = 0
     id_list = []
+    memo_hits = memo_misses = 0
     for name, centro, raggio, min_lat, max_lat, min_lng, max_lng in data:
         print(name)
         page = 0
+        region_engine = create_shard(name, shard_dir) if shard_dir else db_engine
 
         while True:
             page = page + 1
@@ -403,11 +529,33 @@ if __name__ == "__main__":  #
             page_poi_bakeries = 0
             page_poi_restaurants = 0
 
-            with Session(db_engine) as session:
+            # Only listings that will be written are enriched: new ones, and existing ones when they are refreshed
+            to_enrich = web_result
+            if not UPDATE_EXISTING_RECORDS:
+                page_ids = [item.id for item in web_result]
+                known = existing_ids(region_engine, page_ids)
+                if region_engine is not db_engine:
+                    known |= existing_ids(db_engine, page_ids)
+                to_enrich = [item for item in web_result if item.id not in known]
+
+            # The memo lives in the main database, shared by all regions
+            with Session(db_engine) as memo_session:
+                memo = DistanceMemoService(memo_session) if DISTANCE_MEMO else None
+                distances = calc_page_distances(to_enrich, memo)
+                if memo is not None:
+                    memo_hits += memo.hits
+                    memo_misses += memo.misses
+            admin_names = calc_page_admin(to_enrich)
+            amenity_distances = calc_page_amenities(to_enrich)
+            with Session(region_engine) as session, Session(db_engine) as main_session:
+                photo_service = PhotoService(session)
                 # exist_id = get_list_id(session)
                 for item in web_result:
                     item_id = str(item.id)
                     existing_item = session.get(Property, item.id)
+                    if existing_item is None and region_engine is not db_engine:
+                        # A shard only holds what it has crawled; listings already in the main database are not new
+                        existing_item = main_session.get(Property, item.id)
                     is_new_item = existing_item is None
 
                     if is_new_item:
@@ -426,8 +574,12 @@ if __name__ == "__main__":  #
                         working_item = update_existing_property(existing_item, item)
 
                     if working_item.latitude is not None and working_item.longitude is not None:
-                        calc_dist_cost(working_item)
-                        calc_dist_water_main(working_item)
+                        for column, value in distances[working_item.id].items():
+                            setattr(working_item, column, value)
+                        if working_item.id in admin_names:
+                            working_item.city, working_item.province, working_item.admin_region = admin_names[working_item.id]
+                        for column, distance in amenity_distances.get(working_item.id, {}).items():
+                            setattr(working_item, column, distance)
                         if ENABLE_POI_LOOKUP:
                             enrich_with_pois(working_item)
                             page_poi_queries += 1
@@ -439,6 +591,10 @@ if __name__ == "__main__":  #
                     if is_new_item:
                         working_item.observed = str(date.today())
                         session.merge(working_item)
+                    elif working_item not in session:
+                        # Copy the main database's listing into the shard; the merge keeps its review columns
+                        session.merge(working_item)
+                    photo_service.set_photos(working_item.id, working_item.photo_list)
                     id_list.append(str(item.id))
                 session.commit()
                 if ENABLE_POI_LOOKUP:
@@ -460,11 +616,44 @@ if __name__ == "__main__":  #
                 total_count = total_count + count
                 break
 
+    if DISTANCE_MEMO:
+        lookups = memo_hits + memo_misses
+        logger.info(f"Distance memo: {memo_hits} hits, {memo_misses} misses ({memo_hits / lookups if lookups else 0:.0%} hit rate)")
+
+    if shard_dir:
+        merged = merge_shards(db_engine, shard_dir)
+        logger.info(f"Merged shards into the main database: {merged}")
+
     new_today = [key for key, value in first_observed.items() if value == str(date.today())]
     print(len(new_today))
     logger.debug("Today we have added :" + str(new_today))
     with Session(db_engine) as session:
-        update_sold1(session)
         update_sold2(session, first_observed, id_list)
+        archived = ArchiveService(session).archive_sold(ARCHIVE_AFTER_DAYS, batch_size=ARCHIVE_BATCH_SIZE)
+    logger.info(f"Archived {archived} listings sold more than {ARCHIVE_AFTER_DAYS} days ago")
+    if shard_dir:
+        pruned = prune_shards(db_engine, shard_dir)
+        logger.info(f"Dropped archived listings from the shards: {pruned}")
     with open("first_observed.json", "w") as f:
         json.dump(first_observed, f, indent=4)
+
+    # Refresh the columnar snapshot the UI loads from
+    snapshot = ListingSnapshot(get_snapshot_path(use_test_db=not production))
+    with db_engine.connect() as connection:
+        snapshot_rows = snapshot.rebuild(connection)
+    logger.info(f"Snapshot rebuilt with {snapshot_rows} active listings")
+
+    # Sessions older than the rebuilt snapshot reload it anyway, so the feed only needs a margin before it
+    with Session(db_engine) as session:
+        pruned = ChangeFeedService(session).prune(snapshot.feed_version() - CHANGE_FEED_RETENTION)
+    logger.info(f"Pruned {pruned} change feed entries")
+
+    # Keep planner statistics, free pages and the WAL in check as the listing count grows
+    if MAINTENANCE_AFTER_RUN:
+        db_engine.dispose()
+        maintenance = run_maintenance(run_db_path)
+        for step in maintenance.steps:
+            logger.info(f"Maintenance {step.name}: {step.status} in {step.seconds:.2f}s, reclaimed {step.reclaimed_bytes} bytes ({step.detail})")
+        if not maintenance.ok:
+            logger.warning(f"Maintenance of {run_db_path} reported failures")
+        logger.info(f"Maintenance took {maintenance.seconds:.1f}s: {maintenance.size_before} -> {maintenance.size_after} bytes")
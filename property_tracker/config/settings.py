@@ -53,6 +53,122 @@ def get_database_url(use_test_db: bool | None = None) -> str:
     return f"sqlite:///{db_path}"
 
 
+def get_snapshot_path(use_test_db: bool | None = None) -> Path:
+    """Get the path of the Arrow snapshot of active listings.
+
+    The snapshot lives next to its database, e.g. ``database.db`` ->
+    ``database.active.arrow``.
+
+    Args:
+        use_test_db: Optional override; if omitted, read from DB_SELECTOR env var
+
+    Returns:
+        Path to the snapshot file
+    """
+    if use_test_db is None:
+        use_test_db = use_test_database()
+
+    db_path = Path(TEST_DATABASE_PATH if use_test_db else DATABASE_PATH)
+    return db_path.with_name(f"{db_path.stem}.active.arrow")
+
+
+# Rows buffered in the snapshot delta file before it is folded into the base file
+SNAPSHOT_COMPACT_ROWS = int(os.getenv("SNAPSHOT_COMPACT_ROWS", "500"))
+
+# Change feed entries kept before the rebuilt snapshot's version; older ones are pruned after each run
+CHANGE_FEED_RETENTION = int(os.getenv("CHANGE_FEED_RETENTION", "10000"))
+
+
+def get_write_journal_path(use_test_db: bool | None = None) -> Path:
+    """Get the path of the review write queue journal.
+
+    The journal lives next to its database, e.g. ``database.db`` ->
+    ``database.writes.jsonl``.
+
+    Args:
+        use_test_db: Optional override; if omitted, read from DB_SELECTOR env var
+
+    Returns:
+        Path to the journal file
+    """
+    if use_test_db is None:
+        use_test_db = use_test_database()
+
+    db_path = Path(TEST_DATABASE_PATH if use_test_db else DATABASE_PATH)
+    return db_path.with_name(f"{db_path.stem}.writes.jsonl")
+
+
+def get_backfill_state_path(use_test_db: bool | None = None) -> Path:
+    """Get the path of the backfill resume state.
+
+    The state lives next to its database, e.g. ``database.db`` ->
+    ``database.backfill.json``.
+
+    Args:
+        use_test_db: Optional override; if omitted, read from DB_SELECTOR env var
+
+    Returns:
+        Path to the state file
+    """
+    if use_test_db is None:
+        use_test_db = use_test_database()
+
+    db_path = Path(TEST_DATABASE_PATH if use_test_db else DATABASE_PATH)
+    return db_path.with_name(f"{db_path.stem}.backfill.json")
+
+
+# Listings per backfill chunk: one worker task and one write transaction
+BACKFILL_CHUNK_SIZE = int(os.getenv("BACKFILL_CHUNK_SIZE", "5000"))
+
+# Interval between write-behind flushes of queued review/interaction writes
+WRITE_QUEUE_FLUSH_SECONDS = int(os.getenv("WRITE_QUEUE_FLUSH_MS", "250")) / 1000
+
+# Online snapshots (SQLite backup API)
+BACKUP_DIR = Path(os.getenv("BACKUP_DIR", "backups"))
+BACKUP_KEEP = int(os.getenv("BACKUP_KEEP", "7"))  # Snapshots kept per database
+BACKUP_COMPRESS = os.getenv("BACKUP_COMPRESS", "true").lower() == "true"
+BACKUP_BEFORE_RUN = os.getenv("BACKUP_BEFORE_RUN", "true").lower() == "true"  # Snapshot at the start of main.py
+BACKUP_PAGES_PER_STEP = int(os.getenv("BACKUP_PAGES_PER_STEP", "1024"))
+BACKUP_STEP_SLEEP_SECONDS = int(os.getenv("BACKUP_STEP_SLEEP_MS", "10")) / 1000
+
+# Slow-query log: statements slower than the threshold are logged with their query plan and call site
+SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG", "false").lower() == "true"
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "100"))
+SLOW_QUERY_LOG_PATH = Path(os.getenv("SLOW_QUERY_LOG_PATH", "slow_queries.log"))
+SLOW_QUERY_LOG_MAX_BYTES = int(os.getenv("SLOW_QUERY_LOG_MAX_BYTES", str(5 * 1024 * 1024)))
+SLOW_QUERY_LOG_BACKUPS = int(os.getenv("SLOW_QUERY_LOG_BACKUPS", "3"))  # Rotated files kept
+
+# Post-run maintenance (ANALYZE, incremental vacuum, WAL checkpoint, quick_check)
+MAINTENANCE_AFTER_RUN = os.getenv("MAINTENANCE_AFTER_RUN", "true").lower() == "true"  # At the end of main.py
+MAINTENANCE_BUDGET_SECONDS = float(os.getenv("MAINTENANCE_BUDGET_SECONDS", "60"))
+MAINTENANCE_ANALYSIS_LIMIT = int(os.getenv("MAINTENANCE_ANALYSIS_LIMIT", "1000"))  # Rows sampled per index by ANALYZE
+MAINTENANCE_FULL_VACUUM_MAX_MB = int(os.getenv("MAINTENANCE_FULL_VACUUM_MAX_MB", "256"))  # Largest file converted in place
+
+
+def get_shard_dir(use_test_db: bool | None = None) -> Path | None:
+    """Get the directory of per-region shard databases, if sharded storage is enabled.
+
+    Set ``SHARD_DIR`` to enable it; shards for the test database live in a
+    ``test`` subdirectory.
+
+    Args:
+        use_test_db: Optional override; if omitted, read from DB_SELECTOR env var
+
+    Returns:
+        Shard directory, or None when everything lives in one database
+    """
+    shard_dir = os.getenv("SHARD_DIR", "")
+    if not shard_dir:
+        return None
+    if use_test_db is None:
+        use_test_db = use_test_database()
+    return Path(shard_dir) / "test" if use_test_db else Path(shard_dir)
+
+
+# Listings sold for more than this many days move to the compressed archive table
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "500"))
+
 # ==============================================================================
 # Data File Paths
 # ==============================================================================
@@ -62,6 +178,30 @@ BOUNDARIES_DIR = DATA_DIR / "boundaries"
 # Geospatial data files
 COASTLINE_PATH = BOUNDARIES_DIR / "ITA_coastline.json"
 WATERLINES_PATH = BOUNDARIES_DIR / "ITA_water_lines.json"
+# ISTAT-style comuni polygons with province and region names, for offline reverse geocoding
+COMUNI_PATH = Path(os.getenv("COMUNI_PATH", str(BOUNDARIES_DIR / "ITA_comuni.json")))
+
+# Water network cut into simplified UTM tiles (utils/build_water_tiles.py); used instead of WATERLINES_PATH when built
+WATER_TILE_DIR = Path(os.getenv("WATER_TILE_DIR", str(DATA_DIR / "water_tiles")))
+WATER_TILE_SIZE_M = float(os.getenv("WATER_TILE_SIZE_M", "10000"))
+WATER_TILE_SIMPLIFY_M = float(os.getenv("WATER_TILE_SIMPLIFY_M", "10"))
+WATER_TILE_CACHE_SIZE = int(os.getenv("WATER_TILE_CACHE_SIZE", "256"))  # Tiles kept in memory
+
+# Nearest train station, hospital, motorway exit, airport and town centre (utils/import_amenities.py)
+AMENITY_INDEX_PATH = Path(os.getenv("AMENITY_INDEX_PATH", str(DATA_DIR / "amenities" / "amenities.npz")))
+
+# Parsed, projected boundary geometry (.npz), rebuilt when a boundary file changes
+GEOMETRY_CACHE_DIR = Path(os.getenv("GEOMETRY_CACHE_DIR", str(DATA_DIR / "cache")))
+
+# Precomputed distance rasters (utils/build_distance_raster.py); used for distances when built
+DISTANCE_RASTER_DIR = Path(os.getenv("DISTANCE_RASTER_DIR", str(DATA_DIR / "rasters")))
+DISTANCE_RASTER_RESOLUTION_M = float(os.getenv("DISTANCE_RASTER_RESOLUTION_M", "100"))
+DISTANCE_RASTER_BOX = (43.5, 47.1, 6.6, 14.0)  # (min_lat, max_lat, min_lon, max_lon) of the NORTHERN_ITALY search
+DISTANCE_RASTER_REFINE_KM = float(os.getenv("DISTANCE_RASTER_REFINE_KM", "1.0"))  # Closer points are calculated exactly
+
+# Persistent memo of calculated distances, keyed by coordinate rounded to this many decimals (4 is ~10 m)
+DISTANCE_MEMO = os.getenv("DISTANCE_MEMO", "true").lower() == "true"
+DISTANCE_MEMO_DECIMALS = int(os.getenv("DISTANCE_MEMO_DECIMALS", "4"))
 
 # ==============================================================================
 # API Configuration
@@ -0,0 +1,119 @@
+"""Sold-date tracking and the archive table for sold listings.
+
+Triggers on ``property`` stamp ``sold_date`` when a listing becomes sold
+and clear it when it is relisted, so the archiver can tell how long a
+listing has been off the market. Archived rows live in
+``property_archive``, which mirrors the property table's columns and
+types, so the description and photo columns are ``CompressedText`` in
+both tables and archived and live values decode the same way.
+"""
+
+import zlib
+
+from sqlalchemy import DDL, Column, Connection, String, Table, event
+
+from property_tracker.database.compression import COMPRESSED_COLUMNS, compress_value
+
+ARCHIVE_TABLE = "property_archive"
+
+TRIGGER_NAMES = ["property_sold_date_insert", "property_sold_date_update"]
+
+SOLD_DATE_TRIGGERS = [
+    """CREATE TRIGGER IF NOT EXISTS property_sold_date_insert AFTER INSERT ON property
+    WHEN new.sold = 1 AND new.sold_date IS NULL
+    BEGIN
+        UPDATE property SET sold_date = date('now') WHERE id = new.id;
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS property_sold_date_update AFTER UPDATE OF sold ON property
+    WHEN old.sold IS NOT new.sold
+    BEGIN
+        UPDATE property SET sold_date = CASE WHEN new.sold = 1 THEN COALESCE(new.sold_date, date('now')) END WHERE id = new.id;
+    END""",
+]
+
+# First byte of the plain zlib streams the archive stored before it used CompressedText
+LEGACY_ZLIB_HEADER = "78"
+
+
+def build_archive_table(property_table: Table) -> Table:
+    """Define the archive table in the property table's metadata.
+
+    Derived from the property table's columns so the archive keeps up as
+    columns are added. Calling it again returns the same Table.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+
+    Returns:
+        The ``property_archive`` Table
+    """
+    columns = [Column(column.name, column.type, primary_key=column.primary_key) for column in property_table.columns]
+    return Table(ARCHIVE_TABLE, property_table.metadata, *columns, Column("archived_at", String), extend_existing=True)
+
+
+def install_archive_ddl(property_table: Table) -> None:
+    """Define the archive table and attach the sold-date triggers to the property table's create event.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+    """
+    build_archive_table(property_table)
+    for statement in SOLD_DATE_TRIGGERS:
+        event.listen(property_table, "after_create", DDL(statement))
+
+
+def _table_columns(connection: Connection, table_name: str) -> set[str]:
+    """Names of the columns a table currently has in the database."""
+    return {row[1] for row in connection.exec_driver_sql(f"PRAGMA table_info({table_name})")}
+
+
+def convert_legacy_archive_rows(connection: Connection) -> int:
+    """Re-encode archived values stored as plain zlib in the ``CompressedText`` format.
+
+    ``CompressedText`` BLOBs start with a dictionary version byte, never
+    the zlib header, so converted values are not matched again.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+
+    Returns:
+        Number of values converted
+    """
+    converted = 0
+    for name in COMPRESSED_COLUMNS:
+        rows = connection.exec_driver_sql(
+            f"SELECT id, {name} FROM {ARCHIVE_TABLE} WHERE typeof({name}) = 'blob' AND hex(substr({name}, 1, 1)) = ?", (LEGACY_ZLIB_HEADER,)
+        ).fetchall()
+        params = [(compress_value(zlib.decompress(value).decode("utf-8")), row_id) for row_id, value in rows]
+        if params:
+            connection.exec_driver_sql(f"UPDATE {ARCHIVE_TABLE} SET {name} = ? WHERE id = ?", params)
+        converted += len(params)
+    return converted
+
+
+def ensure_archive(connection: Connection) -> None:
+    """Prepare an existing database for archiving.
+
+    Adds the ``sold_date`` column if missing (stamping already-sold rows
+    with today's date, so they age from now), installs the sold-date
+    triggers, creates the archive table or adds columns it lacks, and
+    re-encodes values archived as plain zlib. Safe to run multiple times.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    from property_tracker.models.archive import property_archive
+
+    if "sold_date" not in _table_columns(connection, "property"):
+        connection.exec_driver_sql("ALTER TABLE property ADD COLUMN sold_date VARCHAR")
+        connection.exec_driver_sql("UPDATE property SET sold_date = date('now') WHERE sold = 1")
+    for statement in SOLD_DATE_TRIGGERS:
+        connection.exec_driver_sql(statement)
+
+    property_archive.create(connection, checkfirst=True)
+    existing = _table_columns(connection, property_archive.name)
+    for column in property_archive.columns:
+        if column.name not in existing:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE {property_archive.name} ADD COLUMN {column.name} {column_type}")
+    convert_legacy_archive_rows(connection)
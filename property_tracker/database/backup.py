@@ -0,0 +1,272 @@
+"""Online database snapshots via the SQLite backup API.
+
+The backup API copies the database a few pages at a time, sleeping
+between steps, so the scraper and the UI keep reading and writing while a
+snapshot runs; the copy it produces is a consistent point-in-time image.
+Every snapshot is checked with ``PRAGMA integrity_check`` before it is
+kept, optionally gzip-compressed, described by a JSON manifest holding its
+per-table row counts, and rotated so only the newest few are kept.
+Restores are verified against the manifest before they touch the target.
+"""
+
+import gzip
+import json
+import os
+import shutil
+import sqlite3
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from property_tracker.config.settings import BACKUP_COMPRESS, BACKUP_DIR, BACKUP_KEEP, BACKUP_PAGES_PER_STEP, BACKUP_STEP_SLEEP_SECONDS
+
+MANIFEST_SUFFIX = ".json"
+
+
+class BackupVerificationError(RuntimeError):
+    """Raised when a snapshot fails its integrity check or row count comparison."""
+
+
+@dataclass
+class BackupResult:
+    """Outcome of a snapshot."""
+
+    path: Path
+    row_counts: dict[str, int]
+    pages: int
+    seconds: float
+
+
+def manifest_path(backup_path: Path) -> Path:
+    """Manifest file describing a snapshot, e.g. ``x.db.gz`` -> ``x.db.gz.json``."""
+    return backup_path.with_name(backup_path.name + MANIFEST_SUFFIX)
+
+
+def table_row_counts(connection: sqlite3.Connection) -> dict[str, int]:
+    """Count the rows of every table in a database.
+
+    Args:
+        connection: Open sqlite3 connection
+
+    Returns:
+        Dictionary mapping table name to row count
+    """
+    names = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name")]
+    return {name: connection.execute(f'SELECT COUNT(*) FROM "{name}"').fetchone()[0] for name in names}
+
+
+def verify_database(db_path: Path | str, expected_counts: dict[str, int] | None = None) -> dict[str, int]:
+    """Run an integrity check on a database file and compare its row counts.
+
+    Args:
+        db_path: Uncompressed database file
+        expected_counts: Row counts the database must match (e.g. from a manifest)
+
+    Returns:
+        Row counts per table
+
+    Raises:
+        BackupVerificationError: If the integrity check or the row counts do not match
+    """
+    connection = sqlite3.connect(f"file:{Path(db_path).resolve()}?mode=ro", uri=True)
+    try:
+        result = [row[0] for row in connection.execute("PRAGMA integrity_check")]
+        if result != ["ok"]:
+            raise BackupVerificationError(f"Integrity check failed for {db_path}: {'; '.join(result[:5])}")
+        counts = table_row_counts(connection)
+    finally:
+        connection.close()
+
+    if expected_counts is not None and counts != expected_counts:
+        differing = sorted(name for name in set(counts) | set(expected_counts) if counts.get(name) != expected_counts.get(name))
+        raise BackupVerificationError(f"Row counts of {db_path} differ from the manifest for: {', '.join(differing)}")
+    return counts
+
+
+def _online_copy(source_path: Path | str, target_path: Path | str, pages_per_step: int, step_sleep: float) -> int:
+    """Copy a database with the backup API in page steps; returns the page count.
+
+    Raises:
+        FileNotFoundError: If the source database does not exist
+    """
+    source_path = Path(source_path)
+    # A plain connect would create an empty source and snapshot that
+    if not source_path.is_file():
+        raise FileNotFoundError(f"Database not found: {source_path}")
+    source = sqlite3.connect(f"file:{source_path.resolve()}?mode=ro", uri=True)
+    target = sqlite3.connect(target_path)
+    progress = {"pages": 0}
+
+    def _progress(status, remaining, total):
+        progress["pages"] = total
+
+    try:
+        source.backup(target, pages=pages_per_step, sleep=step_sleep, progress=_progress)
+    finally:
+        target.close()
+        source.close()
+    return progress["pages"]
+
+
+def snapshot_database(
+    db_path: Path | str,
+    backup_dir: Path | str = BACKUP_DIR,
+    compress: bool = BACKUP_COMPRESS,
+    keep: int | None = BACKUP_KEEP,
+    pages_per_step: int = BACKUP_PAGES_PER_STEP,
+    step_sleep: float = BACKUP_STEP_SLEEP_SECONDS,
+) -> BackupResult:
+    """Take a verified online snapshot of a database.
+
+    Args:
+        db_path: Database to snapshot (may be in use)
+        backup_dir: Directory for snapshots
+        compress: Gzip the snapshot
+        keep: Number of snapshots of this database to keep (None keeps all)
+        pages_per_step: Pages copied per backup step; the source is only locked during a step
+        step_sleep: Seconds to sleep between steps, letting writers in
+
+    Returns:
+        BackupResult with the snapshot path and its row counts
+
+    Raises:
+        FileNotFoundError: If the database does not exist
+        BackupVerificationError: If the copy fails its integrity check (nothing is kept)
+    """
+    started = time.perf_counter()
+    db_path = Path(db_path)
+    backup_dir = Path(backup_dir)
+    backup_dir.mkdir(parents=True, exist_ok=True)
+
+    # Microseconds, so snapshots taken within the same second do not overwrite each other
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = backup_dir / f"{db_path.stem}-{stamp}.db"
+    partial = path.with_name(path.name + ".partial")
+
+    try:
+        pages = _online_copy(db_path, partial, pages_per_step, step_sleep)
+        counts = verify_database(partial)
+        if compress:
+            path = path.with_name(path.name + ".gz")
+            with open(partial, "rb") as source, gzip.open(path, "wb") as target:
+                shutil.copyfileobj(source, target)
+        else:
+            os.replace(partial, path)
+    finally:
+        partial.unlink(missing_ok=True)
+
+    manifest = {"source": str(db_path), "created": datetime.now().isoformat(), "compressed": compress, "pages": pages, "row_counts": counts}
+    manifest_path(path).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    if keep is not None:
+        rotate_backups(backup_dir, db_path.stem, keep)
+    return BackupResult(path=path, row_counts=counts, pages=pages, seconds=time.perf_counter() - started)
+
+
+def list_backups(backup_dir: Path | str = BACKUP_DIR, stem: str | None = None) -> list[Path]:
+    """List snapshots, oldest first.
+
+    Args:
+        backup_dir: Directory holding snapshots
+        stem: Only snapshots of the database with this file stem (e.g. "database")
+
+    Returns:
+        Snapshot paths
+    """
+    pattern = f"{stem}-*" if stem else "*"
+    paths = [*Path(backup_dir).glob(f"{pattern}.db"), *Path(backup_dir).glob(f"{pattern}.db.gz")]
+    # Names end in a sortable timestamp
+    return sorted(paths, key=lambda p: p.name.removesuffix(".gz"))
+
+
+def rotate_backups(backup_dir: Path | str, stem: str, keep: int) -> list[Path]:
+    """Delete all but the newest ``keep`` snapshots of a database.
+
+    Args:
+        backup_dir: Directory holding snapshots
+        stem: File stem of the database the snapshots belong to
+        keep: Number of snapshots to keep
+
+    Returns:
+        Deleted snapshot paths
+    """
+    backups = list_backups(backup_dir, stem)
+    expired = backups[: max(len(backups) - keep, 0)]
+    for path in expired:
+        path.unlink(missing_ok=True)
+        manifest_path(path).unlink(missing_ok=True)
+    return expired
+
+
+def _extract(backup_path: Path, target: Path) -> None:
+    """Write a snapshot's database to ``target``, decompressing if needed."""
+    if backup_path.suffix == ".gz":
+        with gzip.open(backup_path, "rb") as source, open(target, "wb") as out:
+            shutil.copyfileobj(source, out)
+    else:
+        shutil.copyfile(backup_path, target)
+
+
+def _manifest_counts(backup_path: Path) -> dict[str, int] | None:
+    """Row counts recorded in a snapshot's manifest, if it has one."""
+    manifest_file = manifest_path(backup_path)
+    if not manifest_file.exists():
+        return None
+    return json.loads(manifest_file.read_text(encoding="utf-8"))["row_counts"]
+
+
+def verify_backup(backup_path: Path | str) -> dict[str, int]:
+    """Verify a snapshot against its manifest without restoring it.
+
+    Args:
+        backup_path: Snapshot file (``.db`` or ``.db.gz``)
+
+    Returns:
+        Row counts per table
+
+    Raises:
+        BackupVerificationError: If the integrity check or the row counts do not match
+    """
+    backup_path = Path(backup_path)
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = Path(tmp) / "verify.db"
+        _extract(backup_path, scratch)
+        return verify_database(scratch, _manifest_counts(backup_path))
+
+
+def restore_database(
+    backup_path: Path | str,
+    target_path: Path | str,
+    pages_per_step: int = BACKUP_PAGES_PER_STEP,
+    step_sleep: float = BACKUP_STEP_SLEEP_SECONDS,
+) -> dict[str, int]:
+    """Restore a snapshot into a database after verifying it.
+
+    The snapshot is decompressed to a scratch file and checked against its
+    manifest before the target is touched; it is then copied into the
+    target with the backup API and the target is checked again.
+
+    Args:
+        backup_path: Snapshot file (``.db`` or ``.db.gz``)
+        target_path: Database to overwrite
+
+    Returns:
+        Row counts of the restored database
+
+    Raises:
+        BackupVerificationError: If the snapshot or the restored database fails verification
+    """
+    backup_path = Path(backup_path)
+    target_path = Path(target_path)
+
+    scratch = target_path.with_name(target_path.name + ".restore")
+    try:
+        _extract(backup_path, scratch)
+        counts = verify_database(scratch, _manifest_counts(backup_path))
+        _online_copy(scratch, target_path, pages_per_step, step_sleep)
+    finally:
+        scratch.unlink(missing_ok=True)
+
+    return verify_database(target_path, counts)
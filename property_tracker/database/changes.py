@@ -0,0 +1,99 @@
+"""Trigger maintenance for the property change feed.
+
+Insert/update/delete triggers on ``property`` append to ``property_change``
+(see ``PropertyChange``), recording which columns an update touched. The
+trigger bodies are generated from the table's columns, so
+``ensure_change_feed()`` recreates them whenever the schema grows.
+
+The insert and update triggers also stamp the row's ``row_version`` with
+the version of the entry they appended, so a row's version is the feed
+version of its latest change. Writers compare it for optimistic
+concurrency, and ``row_version > X`` finds the rows changed since X even
+after the feed has been pruned.
+"""
+
+from sqlalchemy import DDL, Connection, Table, event
+
+from property_tracker.models.change import CHANGE_DELETE, CHANGE_INSERT, CHANGE_UPDATE
+
+TRIGGER_NAMES = ["property_change_insert", "property_change_update", "property_change_delete"]
+
+VERSION_COLUMN = "row_version"
+VERSION_INDEX = "ix_property_row_version"
+
+# Within a trigger, last_insert_rowid() is the feed entry the trigger just appended
+_STAMP_VERSION = f"UPDATE property SET {VERSION_COLUMN} = last_insert_rowid() WHERE id = new.id;"
+
+_NOW = "strftime('%Y-%m-%dT%H:%M:%f', 'now')"
+
+
+def change_feed_triggers(property_table: Table) -> list[str]:
+    """Build the change feed trigger statements for the property table's current columns.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+
+    Returns:
+        List of CREATE TRIGGER statements
+    """
+    # The version stamp itself is not a change
+    names = [column.name for column in property_table.columns if column.name != VERSION_COLUMN]
+    any_changed = " OR ".join(f"old.{name} IS NOT new.{name}" for name in names)
+    changed_list = " || ".join(f"CASE WHEN old.{name} IS NOT new.{name} THEN '{name},' ELSE '' END" for name in names)
+
+    return [
+        f"""CREATE TRIGGER IF NOT EXISTS property_change_insert AFTER INSERT ON property
+    BEGIN
+        INSERT INTO property_change (property_id, operation, changed_at) VALUES (new.id, '{CHANGE_INSERT}', {_NOW});
+        {_STAMP_VERSION}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS property_change_update AFTER UPDATE ON property
+    WHEN {any_changed}
+    BEGIN
+        INSERT INTO property_change (property_id, operation, changed_columns, changed_at)
+        VALUES (new.id, '{CHANGE_UPDATE}', rtrim({changed_list}, ','), {_NOW});
+        {_STAMP_VERSION}
+    END""",
+        f"""CREATE TRIGGER IF NOT EXISTS property_change_delete AFTER DELETE ON property
+    BEGIN
+        INSERT INTO property_change (property_id, operation, changed_at) VALUES (old.id, '{CHANGE_DELETE}', {_NOW});
+    END""",
+    ]
+
+
+def install_change_feed_ddl(property_table: Table) -> None:
+    """Attach the change feed triggers to the property table's create event.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+    """
+    for statement in change_feed_triggers(property_table):
+        # DDL() applies %-formatting, so escape the strftime pattern
+        event.listen(property_table, "after_create", DDL(statement.replace("%", "%%")))
+
+
+def ensure_change_feed(connection: Connection) -> None:
+    """(Re)install the change feed triggers on an existing database.
+
+    The triggers are dropped and recreated so they cover columns added
+    since they were first installed. Databases without ``row_version``
+    get the column, stamped from the feed entries still present (0 for
+    rows without any).
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    from property_tracker.models.property import Property
+
+    if VERSION_COLUMN not in {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(property)")}:
+        connection.exec_driver_sql(f"ALTER TABLE property ADD COLUMN {VERSION_COLUMN} INTEGER DEFAULT 0")
+        connection.exec_driver_sql(
+            f"UPDATE property SET {VERSION_COLUMN} = "
+            "COALESCE((SELECT MAX(version) FROM property_change WHERE property_change.property_id = property.id), 0)"
+        )
+    connection.exec_driver_sql(f"CREATE INDEX IF NOT EXISTS {VERSION_INDEX} ON property ({VERSION_COLUMN})")
+
+    for name in TRIGGER_NAMES:
+        connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {name}")
+    for statement in change_feed_triggers(Property.__table__):
+        connection.exec_driver_sql(statement)
@@ -0,0 +1,132 @@
+"""Transparent compression for the large text columns of ``property``.
+
+``discription``, ``discription_dk`` and ``photo_list`` (a JSON array of
+photo URLs) make up most of the table's bytes. ``CompressedText`` stores
+them as raw-deflate BLOBs primed with a shared preset dictionary of
+listing vocabulary and the photo URL template, so even short values
+compress well. Values are compressed on write and decompressed by the
+result processor, i.e. only by queries that select the column; the
+listing snapshot and ``PropertyRepository`` callers that do not project
+these columns never read or inflate them.
+
+Stored values are self-describing, so compressed and plain rows can
+coexist while a database is being converted:
+
+- NULL and ``""`` are stored unchanged (``discription_dk == ""`` still
+  finds untranslated listings)
+- values that would not shrink stay plain TEXT
+- everything else is a BLOB whose first byte names the dictionary version
+"""
+
+import zlib
+
+from sqlalchemy import Connection, LargeBinary, TypeDecorator
+
+# Property columns stored as ``CompressedText``, in ``property`` and ``property_archive``
+COMPRESSED_COLUMNS = ("discription", "discription_dk", "photo_list")
+
+COMPRESSION_LEVEL = 9
+
+# Raw deflate: no zlib header or checksum, which matter for short values
+WINDOW_BITS = -15
+
+# Preset dictionaries by version byte. A published version must never change,
+# since stored values can only be inflated with the exact bytes they were
+# deflated with; add a new version instead. Frequent strings go last, where
+# matches are cheapest to reference.
+DICTIONARIES = {
+    1: (
+        "Immobile in vendita. Casa indipendente su due livelli con giardino privato, posto auto e cantina. "
+        "Rustico da ristrutturare con terreno agricolo, uliveto e vigneto in posizione panoramica. "
+        "Casale in pietra con vista sulle colline, a pochi chilometri dal mare e dal centro storico. "
+        "Appartamento al piano terra composto da ingresso, ampio soggiorno con camino, cucina abitabile, "
+        "due camere da letto matrimoniali, bagno con doccia, ripostiglio e terrazzo. Riscaldamento autonomo, "
+        "infissi in legno, luminoso, ristrutturato, arredato, libero subito. Classe energetica G. "
+        "Ejendom til salg. Fritliggende hus i to plan med privat have, parkeringsplads og kælder. "
+        "Landejendom der skal renoveres med landbrugsjord, olivenlund og vinmark i panoramisk beliggenhed. "
+        "Stenhus med udsigt over bakkerne, få kilometer fra havet og den historiske bykerne. "
+        "Lejlighed i stueetagen bestående af entré, stor stue med pejs, køkken, to soveværelser, "
+        "badeværelse med bruser, depotrum og terrasse. Lys, renoveret, møbleret, ledig straks. "
+        '"https://pwm.im-cdn.it/image/1143904616/xxl.jpg", "https://pwm.im-cdn.it/image/1494290751/xxl.jpg", '
+        '["https://pwm.im-cdn.it/image/1586351897/xxl.jpg", "https://pwm.im-cdn.it/image/'
+    ).encode(),
+}
+CURRENT_DICTIONARY = 1
+
+
+def compress_value(value: str | None, version: int = CURRENT_DICTIONARY) -> str | bytes | None:
+    """Encode a column value for storage.
+
+    Args:
+        value: Text to store
+        version: Dictionary version to compress with
+
+    Returns:
+        Compressed bytes, or the value itself if it is None, empty or would not shrink
+    """
+    if not value:
+        return value
+    raw = value.encode("utf-8")
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, WINDOW_BITS, zdict=DICTIONARIES[version])
+    packed = bytes([version]) + compressor.compress(raw) + compressor.flush()
+    return packed if len(packed) < len(raw) else value
+
+
+def decompress_value(value: str | bytes | None) -> str | None:
+    """Decode a stored column value, compressed or plain.
+
+    Raises:
+        ValueError: If a BLOB names an unknown dictionary version
+    """
+    if value is None or isinstance(value, str):
+        return value
+    value = bytes(value)
+    dictionary = DICTIONARIES.get(value[0])
+    if dictionary is None:
+        raise ValueError(f"Unknown compression dictionary version: {value[0]}")
+    decompressor = zlib.decompressobj(WINDOW_BITS, zdict=dictionary)
+    return (decompressor.decompress(value[1:]) + decompressor.flush()).decode("utf-8")
+
+
+class CompressedText(TypeDecorator):
+    """Text column stored dictionary-compressed; reads and writes plain ``str``.
+
+    The processors replace, rather than wrap, the BLOB ones, because a
+    stored value may be either bytes or text.
+    """
+
+    impl = LargeBinary
+    cache_ok = True
+
+    def bind_processor(self, dialect):
+        """Compress values on their way into the database."""
+        return compress_value
+
+    def result_processor(self, dialect, coltype):
+        """Decompress values read from the database."""
+        return decompress_value
+
+
+def compress_existing_rows(connection: Connection, table_name: str, columns: tuple[str, ...], batch_size: int = 500) -> int:
+    """Convert plain TEXT values of compressed columns to their compressed form.
+
+    Values already compressed, empty, or that would not shrink are left
+    alone, so the conversion can be interrupted and rerun.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+        table_name: Table holding the columns
+        columns: Names of ``CompressedText`` columns to convert
+        batch_size: Rows written per executemany
+
+    Returns:
+        Number of values compressed
+    """
+    converted = 0
+    for name in columns:
+        rows = connection.exec_driver_sql(f"SELECT id, {name} FROM {table_name} WHERE typeof({name}) = 'text' AND {name} != ''").fetchall()
+        packed = [(value, row_id) for row_id, value in ((row_id, compress_value(text)) for row_id, text in rows) if isinstance(value, bytes)]
+        for start in range(0, len(packed), batch_size):
+            connection.exec_driver_sql(f"UPDATE {table_name} SET {name} = ? WHERE id = ?", packed[start : start + batch_size])
+        converted += len(packed)
+    return converted
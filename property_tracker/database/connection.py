@@ -7,12 +7,50 @@ management using SQLModel and SQLAlchemy.
 from collections.abc import Generator
 from contextlib import contextmanager
 
-from sqlalchemy import Engine
+from sqlalchemy import Connection, Engine
 from sqlmodel import Session, SQLModel, create_engine
 
 # Global engine instance (singleton pattern)
 _engine: Engine | None = None
 
+# Whether install_database_hooks() has run in this process
+_hooks_installed = False
+
+
+def install_database_hooks() -> None:
+    """Attach the property table's DDL and the engine-wide SQLite hooks.
+
+    Makes ``SQLModel.metadata.create_all()`` create the R*Tree index,
+    summary cube, change feed, archive and photo triggers along with the
+    ``property`` table, registers the ``haversine_km`` SQL function on new
+    connections and enables the slow-query log if ``SLOW_QUERY_LOG`` is
+    set. Called by ``get_engine()`` and ``create_database_tables()``; call
+    it at startup before creating an engine any other way. Safe to call
+    more than once.
+    """
+    global _hooks_installed
+
+    if _hooks_installed:
+        return
+
+    from property_tracker.database.archive import install_archive_ddl
+    from property_tracker.database.changes import install_change_feed_ddl
+    from property_tracker.database.photos import install_photo_ddl
+    from property_tracker.database.querylog import install_query_log
+    from property_tracker.database.rtree import install_rtree_ddl, install_sqlite_functions
+    from property_tracker.database.summary import install_summary_ddl
+    from property_tracker.models.property import Property
+
+    # Keep the coordinate R*Tree index, the summary cube, the change feed, sold dates and photos in step with the property table
+    install_rtree_ddl(Property.__table__)
+    install_summary_ddl(Property.__table__)
+    install_change_feed_ddl(Property.__table__)
+    install_archive_ddl(Property.__table__)
+    install_photo_ddl(Property.__table__)
+    install_sqlite_functions()
+    install_query_log()
+    _hooks_installed = True
+
 
 def get_engine(use_test_db: bool = False) -> Engine:
     """Get or create database engine (singleton).
@@ -33,6 +71,7 @@ def get_engine(use_test_db: bool = False) -> Engine:
         # Import here to avoid circular dependency
         from property_tracker.config.settings import get_database_url
 
+        install_database_hooks()
         database_url = get_database_url(use_test_db=use_test_db)
         _engine = create_engine(database_url, echo=False)
 
@@ -86,12 +125,53 @@ def create_database_tables(engine: Engine | None = None) -> None:
 
     Note:
         This should be called once during application initialization
-        or when setting up a new database.
+        or when setting up a new database. Databases created before the
+        R*Tree index, summary cube, change feed, sold listing archive
+        and photo table existed get their columns and triggers installed
+        and their contents rebuilt here.
     """
+    from property_tracker.database.archive import ensure_archive
+    from property_tracker.database.changes import ensure_change_feed
+    from property_tracker.database.photos import ensure_photos
+    from property_tracker.database.rtree import ensure_rtree_index
+    from property_tracker.database.summary import ensure_summary_cube
+
+    # Registers the review event log and distance memo tables, which no property module imports
+    from property_tracker.models.distance_memo import DistanceMemo  # noqa: F401
+    from property_tracker.models.review_event import ReviewEvent  # noqa: F401
+
     if engine is None:
         engine = get_engine()
 
+    install_database_hooks()
     SQLModel.metadata.create_all(engine)
+    with engine.begin() as connection:
+        # First: adds the columns that the change feed triggers cover
+        ensure_archive(connection)
+        ensure_property_columns(connection)
+        ensure_rtree_index(connection)
+        ensure_summary_cube(connection)
+        ensure_change_feed(connection)
+        ensure_photos(connection)
+
+
+def ensure_property_columns(connection: Connection) -> None:
+    """Add model columns that an existing property table lacks, e.g. ``admin_region``.
+
+    ``row_version`` is left to ``ensure_change_feed()``, which stamps it
+    when adding it.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    from property_tracker.database.changes import VERSION_COLUMN
+    from property_tracker.models.property import Property
+
+    existing = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(property)")}
+    for column in Property.__table__.columns:
+        if column.name not in existing and column.name != VERSION_COLUMN:
+            column_type = column.type.compile(dialect=connection.dialect)
+            connection.exec_driver_sql(f"ALTER TABLE property ADD COLUMN {column.name} {column_type}")
 
 
 def reset_engine() -> None:
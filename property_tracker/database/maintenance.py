@@ -0,0 +1,170 @@
+"""Post-run database maintenance within a time budget.
+
+Each scrape leaves free pages behind (updated descriptions, archived and
+deleted rows), planner statistics that no longer match the table sizes
+and, in WAL mode, a write-ahead log that keeps growing while readers are
+connected. ``run_maintenance()`` runs, in order:
+
+1. ``analyze``: ``ANALYZE`` with a bounded ``analysis_limit``, then ``PRAGMA optimize``
+2. ``vacuum``: ``PRAGMA incremental_vacuum``; a database still in
+   ``auto_vacuum=NONE`` mode is converted with one full ``VACUUM`` if it is
+   small enough, after which every run is incremental
+3. ``checkpoint``: ``PRAGMA wal_checkpoint(TRUNCATE)`` (WAL databases only)
+4. ``quick_check``: ``PRAGMA quick_check``
+
+Steps share one deadline. A progress handler interrupts a statement that
+runs past it, and steps not yet started are skipped, so a run never takes
+much longer than its budget. Each step reports its duration and the bytes
+it returned to the filesystem.
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from property_tracker.config.settings import MAINTENANCE_ANALYSIS_LIMIT, MAINTENANCE_BUDGET_SECONDS, MAINTENANCE_FULL_VACUUM_MAX_MB
+
+# SQLite virtual machine instructions between deadline checks
+PROGRESS_INTERVAL = 10_000
+
+# Pages freed per incremental_vacuum statement, so the deadline is checked between chunks
+VACUUM_CHUNK_PAGES = 1024
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+@dataclass
+class MaintenanceStep:
+    """Outcome of one maintenance step."""
+
+    name: str
+    status: str  # "ok", "skipped", "interrupted" or "failed"
+    seconds: float = 0.0
+    reclaimed_bytes: int = 0
+    detail: str = ""
+
+
+@dataclass
+class MaintenanceResult:
+    """Outcome of a maintenance run."""
+
+    db_path: Path
+    steps: list[MaintenanceStep] = field(default_factory=list)
+    size_before: int = 0
+    size_after: int = 0
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        """True when no step failed (skipped and interrupted steps are not failures)."""
+        return all(step.status != "failed" for step in self.steps)
+
+
+def database_size(db_path: Path | str) -> int:
+    """Bytes on disk of a database file and its WAL."""
+    path = Path(db_path)
+    wal = path.with_name(path.name + "-wal")
+    return sum(p.stat().st_size for p in (path, wal) if p.exists())
+
+
+def _analyze(connection: sqlite3.Connection) -> str:
+    connection.execute(f"PRAGMA analysis_limit = {MAINTENANCE_ANALYSIS_LIMIT}")
+    connection.execute("ANALYZE")
+    connection.execute("PRAGMA optimize")
+    tables = connection.execute("SELECT COUNT(DISTINCT tbl) FROM sqlite_stat1").fetchone()[0]
+    return f"statistics for {tables} tables"
+
+
+def _limit_to(connection: sqlite3.Connection, deadline: float) -> None:
+    """Interrupt statements on the connection once the deadline has passed."""
+    connection.set_progress_handler(lambda: int(time.monotonic() > deadline), PROGRESS_INTERVAL)
+
+
+def _vacuum(connection: sqlite3.Connection, deadline: float, db_path: Path) -> str:
+    free_pages = connection.execute("PRAGMA freelist_count").fetchone()[0]
+    if connection.execute("PRAGMA auto_vacuum").fetchone()[0] != AUTO_VACUUM_INCREMENTAL:
+        size_mb = database_size(db_path) / 1024 / 1024
+        if size_mb > MAINTENANCE_FULL_VACUUM_MAX_MB:
+            return f"skipped conversion to incremental auto_vacuum: {size_mb:.0f} MB is over {MAINTENANCE_FULL_VACUUM_MAX_MB} MB; run VACUUM offline"
+        # Takes effect with the VACUUM that rebuilds the file
+        connection.execute("PRAGMA auto_vacuum = INCREMENTAL")
+        # One-off and bounded by the size limit: exempt from the deadline, since an interrupted
+        # VACUUM rolls back and would be retried, and interrupted again, on every run
+        connection.set_progress_handler(None, 0)
+        try:
+            connection.execute("VACUUM")
+        finally:
+            _limit_to(connection, deadline)
+        return f"converted to incremental auto_vacuum, {free_pages} free pages released"
+
+    released = 0
+    while free_pages and time.monotonic() < deadline:
+        connection.execute(f"PRAGMA incremental_vacuum({VACUUM_CHUNK_PAGES})")
+        remaining = connection.execute("PRAGMA freelist_count").fetchone()[0]
+        released += free_pages - remaining
+        free_pages = remaining
+    return f"{released} free pages released, {free_pages} left"
+
+
+def _checkpoint(connection: sqlite3.Connection) -> str | None:
+    if connection.execute("PRAGMA journal_mode").fetchone()[0] != "wal":
+        return None
+    busy, log_frames, checkpointed = connection.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+    return f"{checkpointed}/{log_frames} frames checkpointed" + (" (readers kept the WAL busy)" if busy else "")
+
+
+def _quick_check(connection: sqlite3.Connection) -> list[str]:
+    return [row[0] for row in connection.execute("PRAGMA quick_check")]
+
+
+def run_maintenance(db_path: Path | str, budget_seconds: float = MAINTENANCE_BUDGET_SECONDS) -> MaintenanceResult:
+    """Run the maintenance steps on a database within a time budget.
+
+    Safe to run while the UI is reading; writers wait on the busy timeout.
+
+    Args:
+        db_path: SQLite database file
+        budget_seconds: Time budget shared by all steps
+
+    Returns:
+        MaintenanceResult with one entry per step
+    """
+    db_path = Path(db_path)
+    result = MaintenanceResult(db_path=db_path, size_before=database_size(db_path))
+    started = time.monotonic()
+    deadline = started + budget_seconds
+
+    connection = sqlite3.connect(db_path, isolation_level=None, timeout=30)
+    _limit_to(connection, deadline)
+    steps = [
+        ("analyze", lambda: _analyze(connection)),
+        ("vacuum", lambda: _vacuum(connection, deadline, db_path)),
+        ("checkpoint", lambda: _checkpoint(connection)),
+        ("quick_check", lambda: _quick_check(connection)),
+    ]
+    try:
+        for name, run in steps:
+            if time.monotonic() >= deadline:
+                result.steps.append(MaintenanceStep(name, "skipped", detail="time budget used up"))
+                continue
+            size = database_size(db_path)
+            step_started = time.monotonic()
+            try:
+                outcome = run()
+                if outcome is None:
+                    status, detail = "skipped", "not in WAL mode"
+                elif name == "quick_check":
+                    status, detail = ("ok", "ok") if outcome == ["ok"] else ("failed", "; ".join(outcome[:5]))
+                else:
+                    status, detail = "ok", outcome
+            except sqlite3.DatabaseError as e:
+                status, detail = ("interrupted", "time budget used up") if "interrupted" in str(e) else ("failed", str(e))
+            reclaimed = max(size - database_size(db_path), 0)
+            result.steps.append(MaintenanceStep(name, status, seconds=time.monotonic() - step_started, reclaimed_bytes=reclaimed, detail=detail))
+    finally:
+        connection.close()
+
+    result.size_after = database_size(db_path)
+    result.seconds = time.monotonic() - started
+    return result
@@ -0,0 +1,97 @@
+"""Normalised listing photos.
+
+Photos arrive as a JSON array of URLs in ``property.photo_list``. They are
+also written to ``property_photo`` at ingest, one row per photo, so cover
+photos and galleries can be read without decompressing and parsing the
+JSON. A trigger removes a listing's photos when the listing is deleted
+(e.g. when it is archived).
+"""
+
+import json
+import re
+
+from sqlalchemy import DDL, Connection, Table, event
+
+PHOTO_TABLE = "property_photo"
+
+PHOTO_DELETE_TRIGGER = f"""CREATE TRIGGER IF NOT EXISTS property_photo_delete AFTER DELETE ON property
+    BEGIN
+        DELETE FROM {PHOTO_TABLE} WHERE property_id = old.id;
+    END"""
+
+# Size variant in an immobiliare photo URL, e.g. ".../image/1143904616/xxl.jpg"
+_VARIANT = re.compile(r"/([a-z0-9-]+)\.(jpe?g|png|webp)$")
+
+
+def parse_photo_list(photo_list: str | None) -> list[str]:
+    """Decode a ``photo_list`` JSON array, ignoring malformed values.
+
+    Args:
+        photo_list: JSON array of photo URLs
+
+    Returns:
+        List of URLs (empty if the value is missing or not a JSON array)
+    """
+    if not photo_list:
+        return []
+    try:
+        urls = json.loads(photo_list)
+    except json.JSONDecodeError:
+        return []
+    return [url for url in urls if isinstance(url, str) and url] if isinstance(urls, list) else []
+
+
+def photo_variant(url: str) -> str | None:
+    """Size variant of a photo URL, or None if the URL has no recognisable variant."""
+    match = _VARIANT.search(url)
+    return match.group(1) if match else None
+
+
+def with_variant(url: str, variant: str | None) -> str:
+    """Rewrite a photo URL to another size variant (unchanged if None or not applicable)."""
+    if variant is None:
+        return url
+    return _VARIANT.sub(lambda match: f"/{variant}.{match.group(2)}", url)
+
+
+def photo_rows(property_id: int, urls: list[str]) -> list[dict]:
+    """Build ``property_photo`` rows for a listing's photos, in order."""
+    return [{"property_id": property_id, "ordinal": ordinal, "url": url, "variant": photo_variant(url)} for ordinal, url in enumerate(urls)]
+
+
+def install_photo_ddl(property_table: Table) -> None:
+    """Register the photo table and attach its delete trigger to the property table's create event.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+    """
+    # The trigger needs the photo table wherever the property table is created
+    from property_tracker.models.photo import PropertyPhoto  # noqa: F401
+
+    event.listen(property_table, "after_create", DDL(PHOTO_DELETE_TRIGGER))
+
+
+def ensure_photos(connection: Connection) -> None:
+    """Create the photo table's trigger on an existing database and backfill it.
+
+    The backfill only runs while the photo table is empty (the first run
+    after upgrading); from then on photos are written at ingest.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    from property_tracker.models.photo import PropertyPhoto
+    from property_tracker.models.property import Property
+
+    PropertyPhoto.__table__.create(connection, checkfirst=True)
+    connection.exec_driver_sql(PHOTO_DELETE_TRIGGER)
+    if connection.exec_driver_sql(f"SELECT EXISTS (SELECT 1 FROM {PHOTO_TABLE})").scalar():
+        return
+
+    table = Property.__table__
+    rows = []
+    # Core select so photo_list is decompressed by its column type
+    for property_id, photo_list in connection.execute(table.select().with_only_columns(table.c.id, table.c.photo_list)):
+        rows.extend(photo_rows(property_id, parse_photo_list(photo_list)))
+    if rows:
+        connection.execute(PropertyPhoto.__table__.insert(), rows)
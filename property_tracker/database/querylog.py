@@ -0,0 +1,258 @@
+"""Slow-query log for every SQLAlchemy engine.
+
+When enabled (``SLOW_QUERY_LOG=true``), cursor-execute hooks on the
+``Engine`` class time every statement, whichever engine issued it (the
+services, the Streamlit pages or ``main.py``). Statements slower than
+``SLOW_QUERY_THRESHOLD_MS`` are written as one JSON line each to a
+rotating log with:
+
+- the statement, whitespace-collapsed and with expanded ``IN`` lists folded
+- the shape of its parameters (row count and value types; never the values)
+- its ``EXPLAIN QUERY PLAN`` output
+- the project frames that issued it (e.g. the repository method and its service caller)
+
+``summarize()`` groups the log by statement and ranks it by total or p95
+time; ``utils/slow_query_report.py`` prints that report. A threshold of 0
+logs every statement, for a short profiling session.
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import sysconfig
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from sqlalchemy import Engine, event
+
+from property_tracker.config import settings
+
+_LOGGER = logging.getLogger("property_tracker.slow_queries")
+
+# Key under Connection.info holding the start times of statements in flight
+_START_KEY = "query_log_start"
+
+# Statements EXPLAIN QUERY PLAN accepts
+_EXPLAINABLE = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE", "REPLACE")
+
+_IN_LIST = re.compile(r"\(\?(?:, \?)+\)")
+
+_PACKAGE_ROOT = settings.PROJECT_ROOT.resolve()
+# Library, standard library and this module's frames are skipped when looking for the call site
+_IGNORED_FRAMES = ("site-packages", sysconfig.get_paths()["stdlib"], str(Path(__file__).resolve()))
+
+_threshold_seconds: float | None = None
+
+
+def normalize_statement(statement: str) -> str:
+    """Collapse whitespace and fold ``IN (?, ?, ...)`` lists so repeats of a query group together."""
+    return _IN_LIST.sub("(?, ...)", " ".join(statement.split()))
+
+
+def parameter_shape(parameters: Any, executemany: bool) -> dict[str, Any]:
+    """Describe parameters without recording their values.
+
+    Returns:
+        Dictionary with the number of parameter rows and the type name of each value in the first row
+    """
+    rows = list(parameters) if executemany else [parameters]
+    first = rows[0] if rows else ()
+    if isinstance(first, dict):
+        types = {name: type(value).__name__ for name, value in first.items()}
+    else:
+        types = [type(value).__name__ for value in (first or ())]
+    return {"rows": len(rows), "types": types}
+
+
+def call_site(depth: int = 2) -> str | None:
+    """The innermost project frames that issued a statement.
+
+    Args:
+        depth: Number of project frames to include, innermost first
+
+    Returns:
+        Frames as ``path:line in function`` joined by " <- ", or None outside project code
+    """
+    frames = []
+    for frame in reversed(traceback.extract_stack()):
+        if any(ignored in frame.filename for ignored in _IGNORED_FRAMES):
+            continue
+        path = Path(frame.filename).resolve()
+        location = path.relative_to(_PACKAGE_ROOT) if path.is_relative_to(_PACKAGE_ROOT) else path
+        frames.append(f"{location}:{frame.lineno} in {frame.name}")
+        if len(frames) == depth:
+            break
+    return " <- ".join(frames) or None
+
+
+def explain(dbapi_connection: sqlite3.Connection, statement: str, parameters: Any, executemany: bool) -> list[str] | None:
+    """``EXPLAIN QUERY PLAN`` of a statement, one line per plan step indented by depth.
+
+    Runs on the raw driver connection, so it is not itself timed.
+
+    Returns:
+        Plan lines, or None for statements that cannot be explained
+    """
+    if not statement.lstrip().upper().startswith(_EXPLAINABLE):
+        return None
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    try:
+        rows = dbapi_connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters or ()).fetchall()
+    except sqlite3.Error:
+        return None
+    depth = {0: -1}
+    lines = []
+    for node_id, parent_id, _unused, detail in rows:
+        depth[node_id] = depth.get(parent_id, -1) + 1
+        lines.append("  " * depth[node_id] + detail)
+    return lines
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, parameters, _context, executemany) -> None:
+    starts = conn.info.get(_START_KEY)
+    if not starts:
+        return
+    elapsed = time.perf_counter() - starts.pop()
+    if _threshold_seconds is None or elapsed < _threshold_seconds:
+        return
+    dbapi_connection = conn.connection.driver_connection
+    record = {
+        "at": datetime.now().isoformat(timespec="seconds"),
+        "ms": round(elapsed * 1000, 3),
+        "statement": normalize_statement(statement),
+        "parameters": parameter_shape(parameters, executemany),
+        "plan": explain(dbapi_connection, statement, parameters, executemany) if isinstance(dbapi_connection, sqlite3.Connection) else None,
+        "call_site": call_site(),
+    }
+    _LOGGER.info(json.dumps(record))
+
+
+def _handle_error(exception_context) -> None:
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    connection = exception_context.connection
+    if connection is not None and connection.info.get(_START_KEY):
+        connection.info[_START_KEY].pop()
+
+
+def enable_query_log(
+    threshold_ms: float | None = None,
+    path: Path | str | None = None,
+    max_bytes: int | None = None,
+    backups: int | None = None,
+) -> None:
+    """Start timing statements on every engine and logging the slow ones.
+
+    Args:
+        threshold_ms: Log statements at least this slow (defaults to ``SLOW_QUERY_THRESHOLD_MS``)
+        path: Log file (defaults to ``SLOW_QUERY_LOG_PATH``)
+        max_bytes: Size at which the log rotates (defaults to ``SLOW_QUERY_LOG_MAX_BYTES``)
+        backups: Rotated files kept (defaults to ``SLOW_QUERY_LOG_BACKUPS``)
+    """
+    global _threshold_seconds
+
+    path = Path(settings.SLOW_QUERY_LOG_PATH if path is None else path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    for handler in list(_LOGGER.handlers):
+        _LOGGER.removeHandler(handler)
+        handler.close()
+    handler = RotatingFileHandler(
+        path,
+        maxBytes=settings.SLOW_QUERY_LOG_MAX_BYTES if max_bytes is None else max_bytes,
+        backupCount=settings.SLOW_QUERY_LOG_BACKUPS if backups is None else backups,
+        encoding="utf-8",
+    )
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    _LOGGER.addHandler(handler)
+    _LOGGER.setLevel(logging.INFO)
+    _LOGGER.propagate = False
+
+    _threshold_seconds = (settings.SLOW_QUERY_THRESHOLD_MS if threshold_ms is None else threshold_ms) / 1000
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(Engine, "handle_error", _handle_error)
+
+
+def disable_query_log() -> None:
+    """Stop timing statements and close the log file."""
+    global _threshold_seconds
+
+    _threshold_seconds = None
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.remove(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.remove(Engine, "after_cursor_execute", _after_cursor_execute)
+        event.remove(Engine, "handle_error", _handle_error)
+    for handler in list(_LOGGER.handlers):
+        _LOGGER.removeHandler(handler)
+        handler.close()
+
+
+def install_query_log() -> None:
+    """Enable the slow-query log if ``SLOW_QUERY_LOG`` is set."""
+    if settings.SLOW_QUERY_LOG and _threshold_seconds is None:
+        enable_query_log()
+
+
+def read_query_log(path: Path | str | None = None) -> list[dict[str, Any]]:
+    """Read the log and its rotated files, oldest first.
+
+    Args:
+        path: Log file (defaults to ``SLOW_QUERY_LOG_PATH``)
+
+    Returns:
+        List of logged statement records
+    """
+    path = Path(settings.SLOW_QUERY_LOG_PATH if path is None else path)
+    rotated = sorted(path.parent.glob(f"{path.name}.*"), key=lambda p: int(p.suffix[1:]) if p.suffix[1:].isdigit() else 0, reverse=True)
+    records = []
+    for log_file in [*rotated, path]:
+        if not log_file.exists():
+            continue
+        with open(log_file, encoding="utf-8") as f:
+            records.extend(json.loads(line) for line in f if line.strip())
+    return records
+
+
+def summarize(records: list[dict[str, Any]], order_by: str = "total_ms") -> list[dict[str, Any]]:
+    """Group logged statements and rank them.
+
+    Args:
+        records: Records from ``read_query_log()``
+        order_by: "total_ms", "p95_ms", "max_ms" or "count"
+
+    Returns:
+        One dictionary per statement with count, total/p95/max time, its
+        most frequent call site and latest plan, slowest first
+    """
+    groups: dict[str, list[dict[str, Any]]] = {}
+    for record in records:
+        groups.setdefault(record["statement"], []).append(record)
+
+    summary = []
+    for statement, group in groups.items():
+        times = np.array([record["ms"] for record in group])
+        sites = Counter(record["call_site"] for record in group)
+        summary.append(
+            {
+                "statement": statement,
+                "count": len(group),
+                "total_ms": round(float(times.sum()), 3),
+                "p95_ms": round(float(np.percentile(times, 95)), 3),
+                "max_ms": round(float(times.max()), 3),
+                "call_site": sites.most_common(1)[0][0],
+                "plan": group[-1]["plan"],
+            }
+        )
+    return sorted(summary, key=lambda row: row[order_by], reverse=True)
@@ -0,0 +1,208 @@
+"""Read-only property queries that bypass the ORM.
+
+Loading listings through ``session.exec(select(Property))`` builds a
+SQLModel instance per row, runs its Pydantic validators and then throws
+it away again in ``model_dump()``, even though callers only want a few
+columns. ``PropertyRepository`` runs SQLAlchemy Core statements with an
+explicit column projection and returns the result as:
+
+- ``fetch_arrow()``: an Arrow table with the snapshot's column types
+- ``fetch_arrays()``: a NumPy array per column
+- ``fetch_rows()``: lightweight named tuples (``__slots__ = ()``, no per-row dict)
+
+No ORM instances are created, so no identity map or validation cost is
+paid. Writes still go through the ORM and services.
+"""
+
+from collections import namedtuple
+from collections.abc import Iterable
+from functools import lru_cache
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from sqlalchemy import Connection, Float, FromClause, Integer, Select, select
+from sqlmodel import Session
+
+from property_tracker.database.compression import COMPRESSED_COLUMNS
+from property_tracker.models.property import Property
+
+# Columns stored as TEXT in SQLite but exposed as floats
+FLOAT_COLUMNS = {"latitude", "longitude", "dist_coast", "dist_water"}
+
+PROPERTY_COLUMNS = tuple(column.name for column in Property.__table__.columns)
+
+# Columns the listing views use: everything but the compressed description and photo columns
+LISTING_COLUMNS = tuple(name for name in PROPERTY_COLUMNS if name not in COMPRESSED_COLUMNS)
+
+
+def _arrow_type(column) -> pa.DataType:
+    """Map a property table column to its Arrow type."""
+    if column.name in FLOAT_COLUMNS or isinstance(column.type, Float):
+        return pa.float64()
+    if isinstance(column.type, Integer):
+        return pa.int64()
+    return pa.string()
+
+
+def arrow_schema(columns: Iterable[str] | None = None, table: FromClause | None = None) -> pa.Schema:
+    """Arrow schema for a projection of the property table.
+
+    Args:
+        columns: Column names (defaults to all, in table order)
+        table: Selectable the columns come from (defaults to ``property``); may add
+            columns of its own, e.g. ``distance_km``
+
+    Returns:
+        Schema with floats for coordinates and distances, int64 for integer columns, strings otherwise
+    """
+    table = Property.__table__ if table is None else table
+    names = PROPERTY_COLUMNS if columns is None else columns
+    return pa.schema([pa.field(name, _arrow_type(table.c[name])) for name in names])
+
+
+@lru_cache(maxsize=64)
+def row_type(columns: tuple[str, ...]) -> type:
+    """Named tuple class for a column projection."""
+    return namedtuple("PropertyRow", columns)
+
+
+def _to_int(value: Any) -> int | None:
+    """Coerce legacy float-like integer values, returning None when unparseable."""
+    if value is None or value == "":
+        return None
+    try:
+        return int(round(float(value)))
+    except (TypeError, ValueError):
+        return None
+
+
+def _column_array(values: tuple, data_type: pa.DataType) -> pa.Array:
+    """Convert one fetched column to an Arrow array, vectorised where the values allow it."""
+    if pa.types.is_floating(data_type):
+        # TEXT coordinates: parse in C; unparseable values become null
+        parsed = pd.to_numeric(pd.Series(values, dtype=object), errors="coerce")
+        return pa.array(parsed, type=data_type, from_pandas=True)
+    try:
+        return pa.array(values, type=data_type)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Mixed legacy values (e.g. "12.0" in an integer column); fall back to per-value coercion
+        if pa.types.is_integer(data_type):
+            return pa.array([_to_int(v) for v in values], type=data_type)
+        return pa.array([None if v is None else str(v) for v in values], type=data_type)
+
+
+class PropertyRepository:
+    """Column-projected property reads without ORM hydration."""
+
+    def __init__(self, connection: Connection | Session, table: FromClause | None = None):
+        """Initialize the repository.
+
+        Args:
+            connection: SQLAlchemy connection, or a session whose connection is used
+            table: Selectable with the property table's columns to read from
+                (defaults to ``property``; e.g. a union over shards)
+        """
+        self.connection = connection.connection() if isinstance(connection, Session) else connection
+        self.table = Property.__table__ if table is None else table
+
+    def statement(
+        self,
+        columns: Iterable[str] | None = None,
+        status: str | None = None,
+        region: str | None = None,
+        ids: Iterable[int] | None = None,
+        active_only: bool = True,
+        limit: int | None = None,
+        since_version: int | None = None,
+    ) -> Select:
+        """Build a Core SELECT over the property table.
+
+        Args:
+            columns: Columns to select (defaults to all)
+            status: Filter by review status (None or "All" for all)
+            region: Filter by region (None or "All" for all)
+            ids: Only these property IDs
+            active_only: Only unsold properties
+            limit: Maximum number of rows
+            since_version: Only rows changed after this ``row_version``
+
+        Returns:
+            SQLAlchemy Core Select
+        """
+        table = self.table
+        names = PROPERTY_COLUMNS if columns is None else columns
+        statement = select(*(table.c[name] for name in names))
+        if active_only:
+            statement = statement.where(table.c.sold == 0)
+        if status and status != "All":
+            statement = statement.where(table.c.review_status == status)
+        if region and region != "All":
+            statement = statement.where(table.c.region == region)
+        if ids is not None:
+            statement = statement.where(table.c.id.in_(list(ids)))
+        if since_version is not None:
+            statement = statement.where(table.c.row_version > since_version)
+        if limit:
+            statement = statement.limit(limit)
+        return statement
+
+    def fetch_rows(self, columns: Iterable[str] | None = None, **filters: Any) -> list[tuple]:
+        """Fetch rows as named tuples with attribute access to the projected columns.
+
+        Args:
+            columns: Columns to select (defaults to all)
+            **filters: Filters accepted by ``statement()``
+
+        Returns:
+            List of ``PropertyRow`` named tuples
+        """
+        names = tuple(PROPERTY_COLUMNS if columns is None else columns)
+        make = row_type(names)._make
+        return [make(row) for row in self.connection.execute(self.statement(names, **filters))]
+
+    def fetch_arrow(self, columns: Iterable[str] | None = None, **filters: Any) -> pa.Table:
+        """Fetch rows as a typed Arrow table.
+
+        Args:
+            columns: Columns to select (defaults to all)
+            **filters: Filters accepted by ``statement()``
+
+        Returns:
+            Arrow table with the ``arrow_schema()`` of the projection
+        """
+        schema = arrow_schema(columns, self.table)
+        rows = self.connection.execute(self.statement(schema.names, **filters)).all()
+        columns_values = list(zip(*rows, strict=True)) if rows else [() for _ in schema]
+        arrays = [_column_array(values, field.type) for field, values in zip(schema, columns_values, strict=True)]
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    def fetch_arrays(self, columns: Iterable[str] | None = None, **filters: Any) -> dict[str, np.ndarray]:
+        """Fetch rows as one NumPy array per column.
+
+        Float columns use NaN for missing values; integer columns with
+        missing values come back as float arrays, and string columns as
+        object arrays.
+
+        Args:
+            columns: Columns to select (defaults to all)
+            **filters: Filters accepted by ``statement()``
+
+        Returns:
+            Dictionary mapping column name to array
+        """
+        table = self.fetch_arrow(columns, **filters)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+
+    def fetch_df(self, columns: Iterable[str] | None = None, **filters: Any) -> pd.DataFrame:
+        """Fetch rows as a pandas DataFrame typed like the listing snapshot.
+
+        Args:
+            columns: Columns to select (defaults to all)
+            **filters: Filters accepted by ``statement()``
+
+        Returns:
+            DataFrame with the projected columns
+        """
+        return self.fetch_arrow(columns, **filters).to_pandas()
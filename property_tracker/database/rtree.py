@@ -0,0 +1,106 @@
+"""SQLite R*Tree index over property coordinates.
+
+This module keeps a ``property_rtree`` virtual table in step with the
+``property`` table via triggers, and ``install_sqlite_functions()`` registers
+the ``haversine_km`` SQL function on every SQLite connection so radius
+queries can refine the bounding-box prefilter inside the database.
+"""
+
+import sqlite3
+
+from sqlalchemy import DDL, Connection, Engine, Table, column, event, table
+
+from property_tracker.utils.geodesy import haversine_km
+
+RTREE_TABLE = "property_rtree"
+
+# Lightweight table construct for use in SQLAlchemy Core queries
+property_rtree = table(RTREE_TABLE, column("id"), column("min_lat"), column("max_lat"), column("min_lon"), column("max_lon"))
+
+# Only index rows whose coordinates are present and non-empty (they are stored as TEXT)
+_HAS_COORDS = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL AND new.latitude != '' AND new.longitude != ''"
+
+_INDEX_NEW_ROW = (
+    f"INSERT OR REPLACE INTO {RTREE_TABLE} (id, min_lat, max_lat, min_lon, max_lon) "
+    "VALUES (new.id, CAST(new.latitude AS REAL), CAST(new.latitude AS REAL), CAST(new.longitude AS REAL), CAST(new.longitude AS REAL));"
+)
+
+RTREE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {RTREE_TABLE} USING rtree(id, min_lat, max_lat, min_lon, max_lon)",
+    f"""CREATE TRIGGER IF NOT EXISTS property_rtree_insert AFTER INSERT ON property
+    WHEN {_HAS_COORDS}
+    BEGIN
+        {_INDEX_NEW_ROW}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_rtree_update AFTER UPDATE OF latitude, longitude, id ON property
+    BEGIN
+        DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+        INSERT OR REPLACE INTO {RTREE_TABLE} (id, min_lat, max_lat, min_lon, max_lon)
+        SELECT new.id, CAST(new.latitude AS REAL), CAST(new.latitude AS REAL), CAST(new.longitude AS REAL), CAST(new.longitude AS REAL)
+        WHERE {_HAS_COORDS};
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_rtree_delete AFTER DELETE ON property
+    BEGIN
+        DELETE FROM {RTREE_TABLE} WHERE id = old.id;
+    END""",
+]
+
+RTREE_BACKFILL = (
+    f"INSERT OR REPLACE INTO {RTREE_TABLE} (id, min_lat, max_lat, min_lon, max_lon) "
+    "SELECT id, CAST(latitude AS REAL), CAST(latitude AS REAL), CAST(longitude AS REAL), CAST(longitude AS REAL) "
+    "FROM property "
+    "WHERE latitude IS NOT NULL AND longitude IS NOT NULL AND latitude != '' AND longitude != '' "
+    f"AND id NOT IN (SELECT id FROM {RTREE_TABLE})"
+)
+
+
+def register_sqlite_functions(dbapi_connection: sqlite3.Connection) -> None:
+    """Register custom SQL functions on a raw SQLite connection.
+
+    Args:
+        dbapi_connection: DB-API connection created by the sqlite3 driver
+    """
+    dbapi_connection.create_function("haversine_km", 4, haversine_km, deterministic=True)
+
+
+def _on_connect(dbapi_connection, _connection_record) -> None:
+    """Register SQL functions on every new SQLite connection, whichever engine created it."""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        register_sqlite_functions(dbapi_connection)
+
+
+def install_sqlite_functions() -> None:
+    """Register the SQL functions on every SQLite connection opened from now on.
+
+    Safe to call more than once.
+    """
+    if not event.contains(Engine, "connect", _on_connect):
+        event.listen(Engine, "connect", _on_connect)
+
+
+def install_rtree_ddl(property_table: Table) -> None:
+    """Attach R*Tree DDL to the property table's create/drop events.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+
+    Note:
+        This makes ``SQLModel.metadata.create_all()`` create the index and its
+        triggers, and ``drop_all()`` remove the virtual table with it.
+    """
+    for statement in RTREE_DDL:
+        event.listen(property_table, "after_create", DDL(statement))
+    event.listen(property_table, "after_drop", DDL(f"DROP TABLE IF EXISTS {RTREE_TABLE}"))
+
+
+def ensure_rtree_index(connection: Connection) -> None:
+    """Create the R*Tree index on an existing database and backfill it.
+
+    Safe to run multiple times; only rows missing from the index are added.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    for statement in RTREE_DDL:
+        connection.exec_driver_sql(statement)
+    connection.exec_driver_sql(RTREE_BACKFILL)
@@ -0,0 +1,226 @@
+"""Optional per-region shard databases.
+
+With ``SHARD_DIR`` set, each search region is crawled into its own SQLite
+file (``<SHARD_DIR>/<region>.db``), chosen by the search name stored in
+``Property.region``. Crawlers for different regions then write to
+different files and never wait on each other's database lock. ``main.py``
+itself still crawls its regions one after another in one process; the
+shards are what lets separate crawler processes, one per region, run side
+by side.
+
+Shards are read together through ``ShardFederation``, which ATTACHes
+every shard to an in-memory connection and queries the union of their
+``property`` tables (or just one shard when a region is given). After a
+crawl, ``merge_shards()`` folds the shards into the main database the
+review UI writes to, refreshing only the crawler-owned columns so reviews
+and interactions are never overwritten. Once sold listings are archived,
+``prune_shards()`` drops them from the shards so the next merge does not
+bring them back.
+
+SQLite attaches at most 10 databases per connection by default.
+"""
+
+import re
+from pathlib import Path
+
+from sqlalchemy import Connection, Engine, FromClause, MetaData, Table, create_engine, event, select, union_all
+
+from property_tracker.database.repository import PROPERTY_COLUMNS, PropertyRepository
+from property_tracker.models.property import Property
+
+SHARD_SCHEMA_PREFIX = "shard_"
+
+# Columns owned by the review UI, set once at first sighting, or kept by the sold marking and its trigger; a merge never overwrites them
+MERGE_KEEP_COLUMNS = ("observed", "sold", "sold_date", "review_status", "reviewed_date", "favorite", "viewed", "hidden", "notes", "row_version")
+
+# Columns only filled in the main database for existing rows; a merge only sets them when the shard has a value
+MERGE_FILL_COLUMNS = ("discription_dk",)
+
+MERGE_BATCH_SIZE = 500
+
+
+def region_slug(region: str) -> str:
+    """File-name-safe form of a region/search name, e.g. "NORTHERN_ITALY" -> "northern_italy"."""
+    slug = re.sub(r"[^a-z0-9]+", "_", region.lower()).strip("_")
+    if not slug:
+        raise ValueError(f"Region name has no usable characters: {region!r}")
+    return slug
+
+
+def shard_path(region: str, shard_dir: Path | str) -> Path:
+    """Path of the shard database for a region."""
+    return Path(shard_dir) / f"{region_slug(region)}.db"
+
+
+def create_shard(region: str, shard_dir: Path | str) -> Engine:
+    """Create (or open) a region's shard database with the full schema.
+
+    Args:
+        region: Search/region name the shard holds
+        shard_dir: Directory of shard databases
+
+    Returns:
+        Engine for the shard
+    """
+    from property_tracker.database.connection import create_database_tables
+
+    path = shard_path(region, shard_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    engine = create_engine(f"sqlite:///{path}")
+    create_database_tables(engine)
+    return engine
+
+
+def list_shards(shard_dir: Path | str) -> dict[str, Path]:
+    """Shard databases in a directory.
+
+    Args:
+        shard_dir: Directory of shard databases
+
+    Returns:
+        Dictionary mapping region slug to shard path, sorted by slug
+    """
+    return {path.stem: path for path in sorted(Path(shard_dir).glob("*.db"))}
+
+
+class ShardFederation:
+    """Read-only federated queries over ATTACHed shard databases."""
+
+    def __init__(self, shard_dir: Path | str):
+        """Attach the shards in a directory.
+
+        Args:
+            shard_dir: Directory of shard databases
+
+        Raises:
+            FileNotFoundError: If the directory holds no shards
+        """
+        self.shards = list_shards(shard_dir)
+        if not self.shards:
+            raise FileNotFoundError(f"No shard databases in {shard_dir}")
+        self.schemas = {slug: f"{SHARD_SCHEMA_PREFIX}{index}" for index, slug in enumerate(self.shards)}
+
+        metadata = MetaData()
+        self._tables = {slug: Property.__table__.to_metadata(metadata, schema=schema) for slug, schema in self.schemas.items()}
+
+        self.engine = create_engine("sqlite://")
+        event.listen(self.engine, "connect", self._attach)
+
+    def _attach(self, dbapi_connection, _connection_record) -> None:
+        """Attach every shard to a new connection under its schema name."""
+        for slug, schema in self.schemas.items():
+            dbapi_connection.execute(f"ATTACH DATABASE ? AS {schema}", (str(self.shards[slug]),))
+
+    def property_table(self, region: str) -> Table:
+        """The ``property`` table of the shard holding a region.
+
+        Raises:
+            KeyError: If no shard holds the region
+        """
+        return self._tables[region_slug(region)]
+
+    def property_source(self, region: str | None = None) -> FromClause:
+        """The region's shard table, or a UNION ALL over all shards.
+
+        Args:
+            region: Region/search name (None or "All" for all shards)
+
+        Returns:
+            Selectable with the property table's columns
+        """
+        if region and region != "All":
+            return self.property_table(region)
+        tables = list(self._tables.values())
+        if len(tables) == 1:
+            return tables[0]
+        return union_all(*(select(table) for table in tables)).subquery("property")
+
+    def repository(self, connection: Connection, region: str | None = None) -> PropertyRepository:
+        """A ``PropertyRepository`` reading from one shard or all of them.
+
+        Args:
+            connection: Connection from ``self.engine``
+            region: Region/search name (None or "All" for all shards)
+        """
+        return PropertyRepository(connection, self.property_source(region))
+
+    def dispose(self) -> None:
+        """Close the federation's connections."""
+        self.engine.dispose()
+
+
+def merge_shards(target: Engine, shard_dir: Path | str, batch_size: int = MERGE_BATCH_SIZE) -> dict[str, int]:
+    """Fold shard databases into the main database.
+
+    New listings are inserted whole. Existing listings get the shard's
+    crawler-owned columns; ``MERGE_KEEP_COLUMNS`` are left as they are and
+    ``MERGE_FILL_COLUMNS`` only replace empty values. Values are copied as
+    stored (compressed columns are not inflated), and the listings' photos
+    are replaced with the shard's. The main database's triggers keep its
+    derived tables current.
+
+    Args:
+        target: Engine of the main database
+        shard_dir: Directory of shard databases
+        batch_size: Listings copied per executemany
+
+    Returns:
+        Dictionary mapping region slug to listings merged
+    """
+    columns = ", ".join(PROPERTY_COLUMNS)
+    placeholders = ", ".join("?" for _ in PROPERTY_COLUMNS)
+    assignments = [f"{name} = excluded.{name}" for name in PROPERTY_COLUMNS if name not in MERGE_KEEP_COLUMNS + MERGE_FILL_COLUMNS + ("id",)]
+    assignments += [f"{name} = CASE WHEN excluded.{name} != '' THEN excluded.{name} ELSE property.{name} END" for name in MERGE_FILL_COLUMNS]
+    upsert = f"INSERT INTO property ({columns}) VALUES ({placeholders}) ON CONFLICT(id) DO UPDATE SET {', '.join(assignments)}"
+
+    merged = {}
+    for slug, path in list_shards(shard_dir).items():
+        shard = create_engine(f"sqlite:///{path}")
+        with shard.connect() as source, target.begin() as connection:
+            rows = source.exec_driver_sql(f"SELECT {columns} FROM property").fetchall()
+            photos = source.exec_driver_sql("SELECT property_id, ordinal, url, variant FROM property_photo").fetchall()
+            for start in range(0, len(rows), batch_size):
+                batch = rows[start : start + batch_size]
+                connection.exec_driver_sql(upsert, [tuple(row) for row in batch])
+                ids = [row[0] for row in batch]
+                connection.exec_driver_sql(f"DELETE FROM property_photo WHERE property_id IN ({', '.join('?' for _ in ids)})", tuple(ids))
+            if photos:
+                connection.exec_driver_sql(
+                    "INSERT INTO property_photo (property_id, ordinal, url, variant) VALUES (?, ?, ?, ?)", [tuple(p) for p in photos]
+                )
+        shard.dispose()
+        merged[slug] = len(rows)
+    return merged
+
+
+def prune_shards(target: Engine, shard_dir: Path | str, batch_size: int = MERGE_BATCH_SIZE) -> dict[str, int]:
+    """Delete listings the main database has archived from the shards.
+
+    A shard keeps every listing it has crawled, so without pruning each
+    merge would insert archived listings into the main database again.
+    Run after archiving; a listing that was relisted is back in the main
+    ``property`` table by then and is kept.
+
+    Args:
+        target: Engine of the main database
+        shard_dir: Directory of shard databases
+        batch_size: Listings deleted per statement
+
+    Returns:
+        Dictionary mapping region slug to listings deleted
+    """
+    with target.connect() as connection:
+        archived = connection.exec_driver_sql("SELECT id FROM property_archive WHERE id NOT IN (SELECT id FROM property)").scalars().all()
+
+    pruned = {}
+    for slug, path in list_shards(shard_dir).items():
+        shard = create_engine(f"sqlite:///{path}")
+        deleted = 0
+        with shard.begin() as connection:
+            for start in range(0, len(archived), batch_size):
+                batch = archived[start : start + batch_size]
+                result = connection.exec_driver_sql(f"DELETE FROM property WHERE id IN ({', '.join('?' for _ in batch)})", tuple(batch))
+                deleted += result.rowcount
+        shard.dispose()
+        pruned[slug] = deleted
+    return pruned
@@ -0,0 +1,209 @@
+"""Columnar Arrow snapshot of the active (unsold) listing set.
+
+The snapshot is an uncompressed Arrow IPC file with typed columns, so
+loaders can memory-map it and read columns without copying. It leaves
+out the compressed description and photo columns, which the listing
+views do not show; read those per property through
+``PropertyRepository``. It is kept current incrementally:
+
+- ``rebuild()`` rewrites the base file from the database (after a scrape)
+- ``refresh_rows()`` writes changed rows to a small delta file (after a
+  review-status write); the delta is folded into the base once it grows
+  past ``SNAPSHOT_COMPACT_ROWS``
+
+Readers overlay the delta on the base, so a review click never rewrites
+the full snapshot. The base file records the change feed version it was
+built at, so readers can catch up on any later writes from the feed.
+
+Writers (Streamlit sessions, the write-behind flush thread, ``main.py``)
+hold an exclusive lock on ``<name>.lock`` while they replace the base or
+merge into the delta, so concurrent refreshes never drop each other's rows.
+"""
+
+import fcntl
+import os
+import uuid
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from sqlalchemy import Connection, func, select
+
+from property_tracker.config.settings import SNAPSHOT_COMPACT_ROWS, get_snapshot_path
+from property_tracker.database.repository import LISTING_COLUMNS, PropertyRepository
+from property_tracker.models.change import PropertyChange
+
+FEED_VERSION_KEY = b"feed_version"
+
+
+def _fetch_table(connection: Connection, **filters) -> pa.Table:
+    """Read property rows into an Arrow table with the snapshot schema."""
+    return PropertyRepository(connection).fetch_arrow(LISTING_COLUMNS, **filters)
+
+
+def fetch_listing_frame(connection: Connection, property_ids: Iterable[int]) -> pd.DataFrame:
+    """Read specific properties as a DataFrame typed like the snapshot.
+
+    Args:
+        connection: Open SQLAlchemy connection
+        property_ids: IDs of the properties to read
+
+    Returns:
+        DataFrame with the snapshot's columns and dtypes (sold rows included)
+    """
+    return _fetch_table(connection, ids=property_ids, active_only=False).to_pandas()
+
+
+def _write_atomic(table: pa.Table, path: Path) -> None:
+    """Write an Arrow IPC file via a temporary file and an atomic rename."""
+    # Unique per writer, so two writers never write into the same temporary file
+    tmp_path = path.with_name(f"{path.name}.{uuid.uuid4().hex}.tmp")
+    try:
+        with pa.OSFile(str(tmp_path), "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def _read_mapped(path: Path) -> pa.Table:
+    """Memory-map an Arrow IPC file; column buffers reference the mapping (zero copy)."""
+    with pa.memory_map(str(path), "r") as source:
+        return pa.ipc.open_file(source).read_all()
+
+
+class ListingSnapshot:
+    """Arrow snapshot of unsold listings with incremental row refresh."""
+
+    def __init__(self, path: Path | str | None = None):
+        """Initialize the snapshot.
+
+        Args:
+            path: Base snapshot file; defaults to the file next to the configured database
+        """
+        self.path = Path(path) if path is not None else get_snapshot_path()
+        self.delta_path = self.path.with_name(self.path.stem + ".delta.arrow")
+        self.lock_path = self.path.with_name(self.path.stem + ".lock")
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """Hold the snapshot's exclusive write lock (across processes and threads)."""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.lock_path, "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def exists(self) -> bool:
+        """Return True if a base snapshot has been written."""
+        return self.path.exists()
+
+    def feed_version(self) -> int:
+        """Change feed version the base snapshot was built at (0 if unknown)."""
+        with pa.memory_map(str(self.path), "r") as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        return int(metadata.get(FEED_VERSION_KEY, b"0"))
+
+    def schema_current(self) -> bool:
+        """Return True if the base snapshot has the current listing columns (False once the table gained columns)."""
+        with pa.memory_map(str(self.path), "r") as source:
+            return tuple(pa.ipc.open_file(source).schema.names) == LISTING_COLUMNS
+
+    def rebuild(self, connection: Connection) -> int:
+        """Rewrite the base snapshot from the database and drop any delta.
+
+        Args:
+            connection: Open SQLAlchemy connection
+
+        Returns:
+            Number of active listings written
+        """
+        # Same read transaction as the rows, so the version matches the data
+        version = connection.execute(select(func.coalesce(func.max(PropertyChange.version), 0))).scalar_one()
+        table = _fetch_table(connection)
+        table = table.replace_schema_metadata({FEED_VERSION_KEY: str(version).encode()})
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._locked():
+            _write_atomic(table, self.path)
+            self.delta_path.unlink(missing_ok=True)
+        return table.num_rows
+
+    def refresh_rows(self, connection: Connection, property_ids: Iterable[int]) -> None:
+        """Re-read changed properties into the delta file.
+
+        Rows that are now sold or deleted are recorded as tombstones so
+        readers drop them. The delta is folded into the base once it holds
+        more than ``SNAPSHOT_COMPACT_ROWS`` rows.
+
+        Args:
+            connection: Open SQLAlchemy connection
+            property_ids: IDs of properties whose row changed
+        """
+        ids = sorted({int(pid) for pid in property_ids})
+        if not ids:
+            return
+        # A base from before the table gained columns cannot take rows with them
+        if not self.exists() or not self.schema_current():
+            self.rebuild(connection)
+            return
+
+        changed = _fetch_table(connection, ids=ids, active_only=False)
+        missing = sorted(set(ids) - set(changed.column("id").to_pylist()))
+        if missing:
+            # Deleted rows: tombstone with sold=1 so the overlay removes them
+            tombstones = {name: [None] * len(missing) for name in changed.schema.names}
+            tombstones["id"] = missing
+            tombstones["sold"] = [1] * len(missing)
+            changed = pa.concat_tables([changed, pa.Table.from_pydict(tombstones, schema=changed.schema)])
+
+        # Read, merge and write the delta under the lock, so a concurrent refresh cannot drop these rows
+        with self._locked():
+            delta = changed
+            if self.delta_path.exists():
+                previous = _read_mapped(self.delta_path)
+                keep = pc.invert(pc.is_in(previous.column("id"), value_set=changed.column("id")))
+                delta = pa.concat_tables([previous.filter(keep), changed])
+
+            if delta.num_rows > SNAPSHOT_COMPACT_ROWS:
+                _write_atomic(self._overlay(_read_mapped(self.path), delta), self.path)
+                self.delta_path.unlink(missing_ok=True)
+            else:
+                _write_atomic(delta, self.delta_path)
+
+    @staticmethod
+    def _overlay(base: pa.Table, delta: pa.Table) -> pa.Table:
+        """Replace base rows by their delta version and drop rows no longer active."""
+        keep = pc.invert(pc.is_in(base.column("id"), value_set=delta.column("id")))
+        return pa.concat_tables([base.filter(keep), delta.filter(pc.equal(delta.column("sold"), 0))])
+
+    def load_table(self, columns: list[str] | None = None) -> pa.Table:
+        """Load the active listings as an Arrow table.
+
+        Args:
+            columns: Optional column projection
+
+        Returns:
+            Arrow table backed by the memory-mapped base file where unchanged
+        """
+        table = _read_mapped(self.path)
+        if self.delta_path.exists():
+            table = self._overlay(table, _read_mapped(self.delta_path))
+        if columns is not None:
+            table = table.select(columns)
+        return table
+
+    def load_df(self, columns: list[str] | None = None) -> pd.DataFrame:
+        """Load the active listings as a pandas DataFrame.
+
+        Args:
+            columns: Optional column projection
+
+        Returns:
+            DataFrame with typed columns (floats for coordinates and distances)
+        """
+        return self.load_table(columns).to_pandas()
@@ -0,0 +1,109 @@
+"""Trigger maintenance for the property summary cube.
+
+The ``property_summary`` table (see ``PropertySummary``) is kept in step
+with ``property`` by insert/update/delete triggers, so dashboard counts,
+distributions and dropdowns read O(buckets) rows instead of O(rows).
+"""
+
+from sqlalchemy import DDL, Connection, Table, event
+
+from property_tracker.models.summary import MAX_ROOMS_BUCKET, PRICE_BUCKET_SIZE, UNKNOWN_BUCKET
+
+_CUBE_KEYS = "region, review_status, sold, price_bucket, rooms_bucket"
+
+TRIGGER_NAMES = ["property_summary_insert", "property_summary_update", "property_summary_delete"]
+
+
+def _price_bucket(row: str) -> str:
+    """SQL expression for the price bucket of a trigger row (``new``/``old``) or plain table."""
+    return f"CASE WHEN {row}price IS NULL THEN {UNKNOWN_BUCKET} ELSE (CAST({row}price AS INTEGER) / {PRICE_BUCKET_SIZE}) * {PRICE_BUCKET_SIZE} END"
+
+
+def _rooms_bucket(row: str) -> str:
+    """SQL expression for the rooms bucket; rooms is TEXT such as "4" or "5+"."""
+    rooms = f"CAST({row}rooms AS INTEGER)"
+    return f"CASE WHEN {rooms} > 0 THEN MIN({rooms}, {MAX_ROOMS_BUCKET}) ELSE {UNKNOWN_BUCKET} END"
+
+
+_ADD_NEW_ROW = f"""INSERT INTO property_summary ({_CUBE_KEYS}, property_count, price_sum, price_count)
+        VALUES (new.region, new.review_status, new.sold, {_price_bucket("new.")}, {_rooms_bucket("new.")},
+                1, COALESCE(new.price, 0), new.price IS NOT NULL)
+        ON CONFLICT ({_CUBE_KEYS}) DO UPDATE SET
+            property_count = property_count + excluded.property_count,
+            price_sum = price_sum + excluded.price_sum,
+            price_count = price_count + excluded.price_count;"""
+
+_OLD_ROW_CELL = (
+    f"region = old.region AND review_status = old.review_status AND sold = old.sold "
+    f"AND price_bucket = {_price_bucket('old.')} AND rooms_bucket = {_rooms_bucket('old.')}"
+)
+
+_REMOVE_OLD_ROW = f"""UPDATE property_summary SET
+            property_count = property_count - 1,
+            price_sum = price_sum - COALESCE(old.price, 0),
+            price_count = price_count - (old.price IS NOT NULL)
+        WHERE {_OLD_ROW_CELL};
+        DELETE FROM property_summary WHERE {_OLD_ROW_CELL} AND property_count <= 0;"""
+
+SUMMARY_TRIGGERS = [
+    f"""CREATE TRIGGER IF NOT EXISTS property_summary_insert AFTER INSERT ON property
+    BEGIN
+        {_ADD_NEW_ROW}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_summary_update AFTER UPDATE OF region, review_status, sold, price, rooms ON property
+    BEGIN
+        {_REMOVE_OLD_ROW}
+        {_ADD_NEW_ROW}
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS property_summary_delete AFTER DELETE ON property
+    BEGIN
+        {_REMOVE_OLD_ROW}
+    END""",
+]
+
+SUMMARY_REBUILD = [
+    "DELETE FROM property_summary",
+    f"""INSERT INTO property_summary ({_CUBE_KEYS}, property_count, price_sum, price_count)
+    SELECT region, review_status, sold, {_price_bucket("")}, {_rooms_bucket("")}, COUNT(*), COALESCE(SUM(price), 0), COUNT(price)
+    FROM property
+    GROUP BY 1, 2, 3, 4, 5""",
+]
+
+
+def install_summary_ddl(property_table: Table) -> None:
+    """Attach the summary cube triggers to the property table's create event.
+
+    Args:
+        property_table: The ``property`` SQLAlchemy Table
+    """
+    for statement in SUMMARY_TRIGGERS:
+        event.listen(property_table, "after_create", DDL(statement))
+
+
+def rebuild_summary(connection: Connection) -> None:
+    """Recompute the whole summary cube from the property table.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    for statement in SUMMARY_REBUILD:
+        connection.exec_driver_sql(statement)
+
+
+def ensure_summary_cube(connection: Connection) -> None:
+    """Install the summary triggers on an existing database that lacks them, and rebuild the cube.
+
+    Safe to run multiple times. When every trigger is already installed
+    the cube is current and nothing is done, so startup stays O(1); the
+    rebuild repairs the drift from writes made while triggers were missing.
+    Run ``rebuild_summary()`` to repair a cube explicitly.
+
+    Args:
+        connection: Open SQLAlchemy connection (caller commits)
+    """
+    installed = {row[0] for row in connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'property'")}
+    if installed.issuperset(TRIGGER_NAMES):
+        return
+    for statement in SUMMARY_TRIGGERS:
+        connection.exec_driver_sql(statement)
+    rebuild_summary(connection)
@@ -0,0 +1,13 @@
+"""Sold listing archive table.
+
+This module exposes ``property_archive``, the cold store for listings that
+have been sold for a while. It mirrors the property table's columns and
+types, including the ``CompressedText`` description and photo columns,
+plus the date each row was archived.
+"""
+
+from property_tracker.database.archive import build_archive_table
+from property_tracker.models.property import Property
+
+# Already defined when the property model was imported; this returns that Table
+property_archive = build_archive_table(Property.__table__)
@@ -0,0 +1,30 @@
+"""Property change feed model.
+
+This module contains the PropertyChange model: one row per insert, update
+or delete on the property table, written by triggers and keyed by a
+monotonically increasing version.
+"""
+
+from sqlmodel import Field, SQLModel
+
+CHANGE_INSERT = "insert"
+CHANGE_UPDATE = "update"
+CHANGE_DELETE = "delete"
+
+
+class PropertyChange(SQLModel, table=True):
+    """Change-data feed entry for incremental UI refresh.
+
+    Clients remember the highest ``version`` they have applied and fetch
+    only newer entries. AUTOINCREMENT guarantees versions are never reused,
+    even after old entries are pruned.
+    """
+
+    __tablename__ = "property_change"
+    __table_args__ = {"extend_existing": True, "sqlite_autoincrement": True}
+
+    version: int | None = Field(default=None, primary_key=True)
+    property_id: int = Field(index=True)
+    operation: str  # "insert" | "update" | "delete"
+    changed_columns: str | None = None  # Comma-separated column names (updates only)
+    changed_at: str | None = None  # ISO datetime (UTC) written by the trigger
@@ -0,0 +1,26 @@
+"""Distance memo model.
+
+This module contains the DistanceMemo model: distances already calculated
+for a rounded coordinate, so re-scraped and nearby listings are not
+measured against the coastline and water network again.
+"""
+
+from sqlmodel import Field, SQLModel
+
+
+class DistanceMemo(SQLModel, table=True):
+    """A calculated distance for one rounded coordinate.
+
+    ``lat_key``/``lon_key`` are the coordinate in units of
+    ``10 ** -DISTANCE_MEMO_DECIMALS`` degrees; ``version`` identifies the
+    enricher (algorithm and boundary data) that produced ``distance_km``.
+    """
+
+    __tablename__ = "distance_memo"
+    __table_args__ = {"extend_existing": True, "sqlite_with_rowid": False}
+
+    layer: str = Field(primary_key=True)  # "coast" | "water"
+    version: str = Field(primary_key=True)
+    lat_key: int = Field(primary_key=True)
+    lon_key: int = Field(primary_key=True)
+    distance_km: float
@@ -0,0 +1,25 @@
+"""Property photo model.
+
+This module contains the PropertyPhoto model: one row per listing photo,
+so a page can fetch just the cover photo of many listings without
+decoding their ``photo_list`` JSON.
+"""
+
+from sqlmodel import Field, SQLModel
+
+
+class PropertyPhoto(SQLModel, table=True):
+    """One photo of a listing.
+
+    ``ordinal`` is the photo's position in the listing (0 is the cover);
+    ``variant`` is the size in the photo URL (e.g. "xxl"), which can be
+    swapped for another size without storing every variant.
+    """
+
+    __tablename__ = "property_photo"
+    __table_args__ = {"extend_existing": True}
+
+    property_id: int = Field(primary_key=True)
+    ordinal: int = Field(primary_key=True)
+    url: str
+    variant: str | None = None
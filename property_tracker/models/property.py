@@ -7,6 +7,8 @@ with review tracking and geospatial enrichment.
 from pydantic import field_validator
 from sqlmodel import Field, SQLModel
 
+from property_tracker.database.compression import CompressedText
+
 
 class Property(SQLModel, table=True):
     """Property listing model with review tracking and POI enrichment.
@@ -22,7 +24,8 @@ class Property(SQLModel, table=True):
     id: int | None = Field(default=None, primary_key=True)
     region: str
     province: str | None = None
-    city: str | None = None
+    city: str | None = None  # Comune, looked up from the coordinates
+    admin_region: str | None = None  # Administrative region; ``region`` holds the search name
     category: str
 
     # Pricing information
@@ -39,9 +42,9 @@ class Property(SQLModel, table=True):
 
     # Description and media
     caption: str | None = None
-    discription: str  # Note: typo from original schema
-    discription_dk: str  # Danish translation
-    photo_list: str
+    discription: str = Field(sa_type=CompressedText)  # Note: typo from original schema
+    discription_dk: str = Field(sa_type=CompressedText)  # Danish translation
+    photo_list: str = Field(sa_type=CompressedText)  # JSON array of photo URLs
 
     # Geospatial data
     latitude: str | None = None
@@ -49,6 +52,15 @@ class Property(SQLModel, table=True):
     marker: str | None = None
     dist_coast: str | None = None  # Distance to coast in km
     dist_water: str | None = None  # Distance to water in km
+    coast_lat: float | None = None  # Nearest coast point, stored with dist_coast for the coast map
+    coast_lon: float | None = None
+    coast_bearing: float | None = None  # Degrees clockwise from north, from the listing to coast_lat/coast_lon
+    # Distances in km to the nearest amenity of each class (utils/amenities.py)
+    dist_station: float | None = None
+    dist_hospital: float | None = None
+    dist_motorway_exit: float | None = None
+    dist_airport: float | None = None
+    dist_town_centre: float | None = None
 
     # POI counts (Points of Interest)
     shopping_count: int | None = None
@@ -59,6 +71,7 @@ class Property(SQLModel, table=True):
     # Status tracking
     sold: int = 0  # 0 = unsold, 1 = sold
     observed: str | None = None  # First observation date
+    sold_date: str | None = None  # Date the listing was first seen sold (set by trigger)
 
     # Review tracking fields
     review_status: str = Field(default="To Review")  # "To Review" | "Rejected" | "Interested"
@@ -70,6 +83,9 @@ class Property(SQLModel, table=True):
     hidden: int | None = Field(default=0)  # 0 = visible, 1 = hidden
     notes: str | None = Field(default=None)  # User notes about property
 
+    # Optimistic concurrency
+    row_version: int | None = Field(default=0, index=True)  # Change feed version of the row's latest change (set by trigger)
+
     @field_validator("price", "price_m", mode="before")
     @classmethod
     def _coerce_price_fields_to_int(cls, value):
@@ -0,0 +1,48 @@
+"""Review event log model.
+
+This module contains the ReviewEvent model: an append-only log with one
+compact, integer-coded row per review status or interaction change.
+"""
+
+from sqlmodel import Field, SQLModel
+
+# Field codes
+FIELD_REVIEW_STATUS = 1
+FIELD_FAVORITE = 2
+FIELD_VIEWED = 3
+FIELD_HIDDEN = 4
+FIELD_NOTES = 5
+
+# Property column for each field code
+FIELD_COLUMNS = {
+    FIELD_REVIEW_STATUS: "review_status",
+    FIELD_FAVORITE: "favorite",
+    FIELD_VIEWED: "viewed",
+    FIELD_HIDDEN: "hidden",
+    FIELD_NOTES: "notes",
+}
+
+
+class ReviewEvent(SQLModel, table=True):
+    """One review or interaction change.
+
+    ``old_value``/``new_value`` hold the status code (index into
+    ``REVIEW_STATUSES``) or the 0/1 flag; notes use ``old_text``/``new_text``,
+    as does a status outside ``REVIEW_STATUSES`` that a change replaced.
+    Undo appends an event that ``reverts`` the undone one, so the log is
+    never rewritten.
+    """
+
+    __tablename__ = "review_event"
+    __table_args__ = {"extend_existing": True, "sqlite_autoincrement": True}
+
+    id: int | None = Field(default=None, primary_key=True)
+    property_id: int = Field(index=True)
+    field: int  # FIELD_* code
+    old_value: int | None = None
+    new_value: int | None = None
+    old_text: str | None = None  # Notes, or an uncoded status
+    new_text: str | None = None  # Notes, or an uncoded status
+    created_at: int = Field(index=True)  # Unix time in milliseconds
+    actor: str | None = None  # User/session tag
+    reverts: int | None = Field(default=None, index=True)  # ID of the event this one undoes
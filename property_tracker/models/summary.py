@@ -0,0 +1,34 @@
+"""Property summary cube model.
+
+This module contains the PropertySummary model: pre-aggregated listing
+counts per (region, review status, sold, price bucket, rooms bucket),
+kept up to date by triggers on the property table.
+"""
+
+from sqlmodel import Field, SQLModel
+
+PRICE_BUCKET_SIZE = 25000  # EUR per price bucket
+MAX_ROOMS_BUCKET = 10  # Rooms above this are grouped together
+UNKNOWN_BUCKET = -1  # Bucket for missing/unparseable price or rooms
+
+
+class PropertySummary(SQLModel, table=True):
+    """Aggregated property counts for dashboard metrics and dropdowns.
+
+    Each row is one cell of the cube. ``price_bucket`` is the lower bound of
+    a ``PRICE_BUCKET_SIZE`` wide price band, ``rooms_bucket`` the room count;
+    both are ``UNKNOWN_BUCKET`` when the source value is missing.
+    """
+
+    __tablename__ = "property_summary"
+    __table_args__ = {"extend_existing": True}
+
+    region: str = Field(primary_key=True)
+    review_status: str = Field(primary_key=True)
+    sold: int = Field(primary_key=True)
+    price_bucket: int = Field(primary_key=True)
+    rooms_bucket: int = Field(primary_key=True)
+
+    property_count: int = 0
+    price_sum: int = 0  # Sum of known prices, for averages
+    price_count: int = 0  # Number of rows with a known price
@@ -0,0 +1,129 @@
+"""Service layer for archiving sold listings.
+
+Moves listings that have been sold for a while out of the hot ``property``
+table into the ``property_archive`` table, so the hot table
+tracks the live market rather than all history. Historical queries run
+over the union of both tables.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import delete, func, literal, select, union_all
+from sqlmodel import Session
+
+from property_tracker.database.compression import COMPRESSED_COLUMNS
+from property_tracker.models.archive import property_archive
+from property_tracker.models.property import Property
+
+# Columns shared by the hot and archive tables without compression
+HISTORY_COLUMNS = [column.name for column in Property.__table__.columns if column.name not in COMPRESSED_COLUMNS]
+
+ARCHIVE_COLUMNS = [column.name for column in Property.__table__.columns] + ["archived_at"]
+
+
+class ArchiveService:
+    """Handles moving sold listings to the archive and querying history."""
+
+    def __init__(self, session: Session):
+        """Initialize the archive service.
+
+        Args:
+            session: SQLModel database session
+        """
+        self.session = session
+
+    def archive_sold(self, older_than_days: int, batch_size: int = 500) -> int:
+        """Move listings sold more than ``older_than_days`` days ago into the archive.
+
+        Each batch is copied and deleted in its own transaction, so a long
+        run can be interrupted without losing or duplicating rows.
+
+        Args:
+            older_than_days: Minimum number of days a listing has been sold
+            batch_size: Number of listings moved per transaction
+
+        Returns:
+            Number of listings archived
+        """
+        cutoff = (date.today() - timedelta(days=older_than_days)).isoformat()
+        property_table = Property.__table__
+        archived = 0
+
+        while True:
+            ids = (
+                self.session.execute(
+                    select(property_table.c.id)
+                    .where(property_table.c.sold == 1)
+                    .where(property_table.c.sold_date <= cutoff)
+                    .order_by(property_table.c.id)
+                    .limit(batch_size)
+                )
+                .scalars()
+                .all()
+            )
+            if not ids:
+                return archived
+
+            # Both tables store the text columns as CompressedText, so rows are copied without decoding them
+            copy = select(*property_table.columns, literal(datetime.now().isoformat())).where(property_table.c.id.in_(ids))
+            # A listing can be archived again after being relisted and sold; keep the latest copy
+            self.session.execute(property_archive.insert().prefix_with("OR REPLACE").from_select(ARCHIVE_COLUMNS, copy))
+            self.session.execute(delete(property_table).where(property_table.c.id.in_(ids)))
+            self.session.commit()
+            archived += len(ids)
+
+    def get_archived(self, property_id: int) -> dict[str, Any] | None:
+        """Get an archived listing with its text columns decompressed.
+
+        Args:
+            property_id: ID of the archived property
+
+        Returns:
+            Dictionary of column values, or None if the property is not archived
+        """
+        row = self.session.execute(select(property_archive).where(property_archive.c.id == property_id)).mappings().first()
+        return dict(row) if row is not None else None
+
+    def history_statement(self, columns: list[str] | None = None):
+        """Build a UNION ALL over hot and archived listings.
+
+        Args:
+            columns: Columns to select (defaults to all uncompressed columns)
+
+        Returns:
+            Selectable with the requested columns plus ``archived`` (0 = hot, 1 = archive)
+        """
+        names = columns or HISTORY_COLUMNS
+        hot = select(*(Property.__table__.c[name] for name in names), literal(0).label("archived"))
+        cold = select(*(property_archive.c[name] for name in names), literal(1).label("archived"))
+        return union_all(hot, cold)
+
+    def get_history(self, region: str | None = None, columns: list[str] | None = None) -> list[dict[str, Any]]:
+        """Get hot and archived listings together for historical analysis.
+
+        Args:
+            region: Filter by region (None or "All" for all regions)
+            columns: Columns to return (defaults to all uncompressed columns)
+
+        Returns:
+            List of row dictionaries, each with an ``archived`` flag
+        """
+        names = list(columns or HISTORY_COLUMNS)
+        if region and region != "All" and "region" not in names:
+            names.append("region")
+        history = self.history_statement(names).subquery()
+        statement = select(history)
+        if region and region != "All":
+            statement = statement.where(history.c.region == region)
+        return [dict(row) for row in self.session.execute(statement).mappings()]
+
+    def get_counts(self) -> dict[str, int]:
+        """Get the number of hot and archived listings.
+
+        Returns:
+            Dictionary with "hot" and "archived" counts
+        """
+        hot = self.session.execute(select(func.count()).select_from(Property.__table__)).scalar_one()
+        archived = self.session.execute(select(func.count()).select_from(property_archive)).scalar_one()
+        return {"hot": hot, "archived": archived}
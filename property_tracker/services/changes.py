@@ -0,0 +1,118 @@
+"""Service layer for the property change feed.
+
+Lets cached DataFrames catch up by applying only the properties changed
+since the version they were built at, instead of reloading every row.
+"""
+
+import pandas as pd
+from sqlmodel import Session, delete, func, select
+
+from property_tracker.database.snapshot import fetch_listing_frame
+from property_tracker.models.change import PropertyChange
+
+
+class ChangeFeedService:
+    """Handles reading and pruning the trigger-populated change feed."""
+
+    def __init__(self, session: Session):
+        """Initialize the change feed service.
+
+        Args:
+            session: SQLModel database session
+        """
+        self.session = session
+
+    def current_version(self) -> int:
+        """Get the latest change version (0 if the feed is empty)."""
+        return self.session.exec(select(func.coalesce(func.max(PropertyChange.version), 0))).one()
+
+    def covers(self, version: int) -> bool:
+        """Check whether every change after ``version`` is still in the feed.
+
+        Args:
+            version: Version a client last applied
+
+        Returns:
+            False if entries the client has not seen were pruned, so it must reload fully
+        """
+        oldest = self.session.exec(select(func.min(PropertyChange.version))).one()
+        return oldest is None or version >= oldest - 1
+
+    def changes_since(self, version: int, limit: int | None = None) -> list[PropertyChange]:
+        """Get change entries newer than a version, oldest first.
+
+        Args:
+            version: Version a client last applied
+            limit: Maximum number of entries to return
+
+        Returns:
+            List of PropertyChange entries
+        """
+        statement = select(PropertyChange).where(PropertyChange.version > version).order_by(PropertyChange.version)
+        if limit:
+            statement = statement.limit(limit)
+        return self.session.exec(statement).all()
+
+    def changed_ids_since(self, version: int) -> tuple[int, set[int]]:
+        """Get the IDs of properties changed after a version.
+
+        Args:
+            version: Version a client last applied
+
+        Returns:
+            Tuple of (new_version, changed_property_ids); new_version equals
+            ``version`` when nothing changed
+        """
+        statement = select(PropertyChange.version, PropertyChange.property_id).where(PropertyChange.version > version)
+        rows = self.session.exec(statement).all()
+        if not rows:
+            return version, set()
+        return max(v for v, _ in rows), {property_id for _, property_id in rows}
+
+    def prune(self, before_version: int) -> int:
+        """Delete change entries up to and including a version.
+
+        The latest entry is always kept, so ``covers()`` can still tell
+        that older entries were pruned.
+
+        Args:
+            before_version: Highest version to delete
+
+        Returns:
+            Number of entries deleted
+        """
+        before_version = min(before_version, self.current_version() - 1)
+        result = self.session.execute(delete(PropertyChange).where(PropertyChange.version <= before_version))
+        self.session.commit()
+        return result.rowcount
+
+
+def apply_changes(df: pd.DataFrame, session: Session, since_version: int) -> tuple[pd.DataFrame, int] | None:
+    """Bring a cached DataFrame of active listings up to date.
+
+    Changed properties are re-read and replace their old rows; properties
+    that were sold or deleted are dropped.
+
+    Args:
+        df: Cached active listings, as built at ``since_version``
+        session: SQLModel database session
+        since_version: Change feed version the frame reflects
+
+    Returns:
+        Tuple of (updated_df, new_version), or None if the feed no longer
+        covers ``since_version`` and the caller must reload from scratch
+    """
+    feed = ChangeFeedService(session)
+    if not feed.covers(since_version):
+        return None
+
+    version, changed_ids = feed.changed_ids_since(since_version)
+    if not changed_ids:
+        return df, version
+
+    fresh = fetch_listing_frame(session.connection(), changed_ids)
+    fresh = fresh[fresh["sold"] == 0]
+    kept = df[~df["id"].isin(changed_ids)]
+    if kept.empty:
+        return fresh.reset_index(drop=True), version
+    return pd.concat([kept, fresh], ignore_index=True), version
@@ -0,0 +1,158 @@
+"""Service layer for the persistent distance memo.
+
+Listings are re-scraped every run and many share a building or a street,
+so most distance lookups repeat earlier ones. ``DistanceMemoService``
+rounds coordinates to ``DISTANCE_MEMO_DECIMALS`` (4 decimals is ~10 m),
+answers what it can from ``distance_memo`` in one query, calculates the
+misses in one batch call at the rounded coordinates and stores them.
+``lookup()``/``store()`` split that in two for callers that calculate the
+misses elsewhere, such as the backfill's worker processes.
+Entries are keyed by enricher version, so a new algorithm or boundary
+file never reads old distances. Hits and misses are counted per service.
+"""
+
+from collections.abc import Callable, Sequence
+
+import numpy as np
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.sqlite import insert
+from sqlmodel import Session
+
+from property_tracker.config.settings import DISTANCE_MEMO_DECIMALS
+from property_tracker.models.distance_memo import DistanceMemo
+
+# Coordinate pairs per lookup query
+LOOKUP_BATCH_SIZE = 400
+
+
+class DistanceMemoService:
+    """Memoises calculated distances by rounded coordinate."""
+
+    def __init__(self, session: Session, decimals: int = DISTANCE_MEMO_DECIMALS):
+        """Initialize the memo service.
+
+        Args:
+            session: SQLModel database session
+            decimals: Decimals coordinates are rounded to
+        """
+        self.session = session
+        self.scale = 10**decimals
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the memo (0.0 before any lookup)."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _keys(self, lats: np.ndarray, lons: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Coordinates in units of the memo's precision."""
+        return np.rint(lats * self.scale).astype(np.int64), np.rint(lons * self.scale).astype(np.int64)
+
+    def rounded(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Coordinates rounded to the memo's precision, where misses are calculated."""
+        lat_keys, lon_keys = self._keys(np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+        return lat_keys / self.scale, lon_keys / self.scale
+
+    def _lookup(self, layer: str, version: str, keys: list[tuple[int, int]]) -> dict[tuple[int, int], float]:
+        """Stored distances for coordinate keys."""
+        table = DistanceMemo.__table__
+        found = {}
+        for start in range(0, len(keys), LOOKUP_BATCH_SIZE):
+            statement = select(table.c.lat_key, table.c.lon_key, table.c.distance_km).where(
+                table.c.layer == layer,
+                table.c.version == version,
+                tuple_(table.c.lat_key, table.c.lon_key).in_(keys[start : start + LOOKUP_BATCH_SIZE]),
+            )
+            found.update({(lat_key, lon_key): distance for lat_key, lon_key, distance in self.session.execute(statement)})
+        return found
+
+    def lookup(self, layer: str, version: str, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> np.ndarray:
+        """Memoised distances for many points, counted as hits and misses (commits).
+
+        Args:
+            layer: Distance layer, e.g. "coast" or "water"
+            version: Enricher version the distances must come from
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Distances in kilometers; NaN where not memoised or a coordinate is missing
+        """
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        distances = np.full(lats.shape, np.nan)
+        valid = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+        if not len(valid):
+            return distances
+
+        lat_keys, lon_keys = self._keys(lats[valid], lons[valid])
+        keys = list(zip(lat_keys.tolist(), lon_keys.tolist(), strict=True))
+        found = self._lookup(layer, version, list(dict.fromkeys(keys)))
+        # End the read transaction, so the lock is not held between pages
+        self.session.commit()
+
+        distances[valid] = [found.get(key, np.nan) for key in keys]
+        hits = int(np.isfinite(distances[valid]).sum())
+        self.hits += hits
+        self.misses += len(valid) - hits
+        return distances
+
+    def store(
+        self,
+        layer: str,
+        version: str,
+        lats: Sequence[float] | np.ndarray,
+        lons: Sequence[float] | np.ndarray,
+        distances: Sequence[float] | np.ndarray,
+    ) -> None:
+        """Store distances calculated at rounded coordinates (commits; NaN distances are skipped).
+
+        Args:
+            layer: Distance layer, e.g. "coast" or "water"
+            version: Enricher version that produced the distances
+            lats: Latitudes rounded with ``rounded()``
+            lons: Longitudes rounded with ``rounded()``
+            distances: Distances in kilometers
+        """
+        lat_keys, lon_keys = self._keys(np.asarray(lats, dtype=float), np.asarray(lons, dtype=float))
+        rows = [
+            {"layer": layer, "version": version, "lat_key": lat_key, "lon_key": lon_key, "distance_km": float(distance)}
+            for lat_key, lon_key, distance in zip(lat_keys.tolist(), lon_keys.tolist(), np.asarray(distances, dtype=float).tolist(), strict=True)
+            if np.isfinite(distance)
+        ]
+        if rows:
+            self.session.execute(insert(DistanceMemo.__table__).on_conflict_do_nothing(), rows)
+        self.session.commit()
+
+    def distances(
+        self,
+        layer: str,
+        version: str,
+        lats: Sequence[float] | np.ndarray,
+        lons: Sequence[float] | np.ndarray,
+        calculate: Callable[[np.ndarray, np.ndarray], np.ndarray],
+    ) -> np.ndarray:
+        """Distances for many points, from the memo where possible (commits).
+
+        Args:
+            layer: Distance layer, e.g. "coast" or "water"
+            version: Enricher version the distances must come from
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+            calculate: Batch calculation for the misses, called with rounded coordinates
+
+        Returns:
+            Distances in kilometers; NaN where a coordinate is missing
+        """
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        distances = self.lookup(layer, version, lats, lons)
+        missing = np.flatnonzero(np.isnan(distances) & np.isfinite(lats) & np.isfinite(lons))
+        if len(missing):
+            # Each rounded coordinate is calculated once
+            keys, inverse = np.unique(np.column_stack(self._keys(lats[missing], lons[missing])), axis=0, return_inverse=True)
+            key_lats, key_lons = keys[:, 0] / self.scale, keys[:, 1] / self.scale
+            calculated = np.asarray(calculate(key_lats, key_lons), dtype=float)
+            self.store(layer, version, key_lats, key_lons, calculated)
+            distances[missing] = calculated[inverse.ravel()]
+        return distances
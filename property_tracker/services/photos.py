@@ -0,0 +1,73 @@
+"""Service layer for listing photos.
+
+Reads photos from the normalised ``property_photo`` table: the cover
+photos of many listings in one indexed query, and a listing's full
+gallery only when it is asked for. ``photo_list`` is never decoded on the
+read path.
+"""
+
+from collections.abc import Iterable
+
+from sqlalchemy import delete, insert, select
+from sqlmodel import Session
+
+from property_tracker.database.photos import parse_photo_list, photo_rows, with_variant
+from property_tracker.models.photo import PropertyPhoto
+
+
+class PhotoService:
+    """Handles writing and reading listing photos."""
+
+    def __init__(self, session: Session):
+        """Initialize the photo service.
+
+        Args:
+            session: SQLModel database session
+        """
+        self.session = session
+
+    def set_photos(self, property_id: int, photos: list[str] | str | None) -> int:
+        """Replace a listing's photos (called at ingest; caller commits).
+
+        Args:
+            property_id: ID of the property
+            photos: Photo URLs in listing order, or a ``photo_list`` JSON array
+
+        Returns:
+            Number of photos stored
+        """
+        urls = parse_photo_list(photos) if photos is None or isinstance(photos, str) else photos
+        table = PropertyPhoto.__table__
+        self.session.execute(delete(table).where(table.c.property_id == property_id))
+        rows = photo_rows(property_id, urls)
+        if rows:
+            self.session.execute(insert(table), rows)
+        return len(rows)
+
+    def cover_photos(self, property_ids: Iterable[int], variant: str | None = None) -> dict[int, str]:
+        """Get the cover (first) photo of many listings in one query.
+
+        Args:
+            property_ids: IDs of the properties
+            variant: Size variant to return (None for the stored size)
+
+        Returns:
+            Dictionary mapping property ID to cover photo URL; listings without photos are omitted
+        """
+        table = PropertyPhoto.__table__
+        statement = select(table.c.property_id, table.c.url).where(table.c.ordinal == 0).where(table.c.property_id.in_(list(property_ids)))
+        return {property_id: with_variant(url, variant) for property_id, url in self.session.execute(statement)}
+
+    def gallery(self, property_id: int, variant: str | None = None) -> list[str]:
+        """Get all photos of a listing, in listing order.
+
+        Args:
+            property_id: ID of the property
+            variant: Size variant to return (None for the stored size)
+
+        Returns:
+            List of photo URLs
+        """
+        table = PropertyPhoto.__table__
+        statement = select(table.c.url).where(table.c.property_id == property_id).order_by(table.c.ordinal)
+        return [with_variant(url, variant) for url in self.session.execute(statement).scalars()]
@@ -6,9 +6,64 @@ separate from database and UI concerns.
 
 from datetime import datetime
 
-from sqlmodel import Session, func, select, update
+from sqlalchemy import Connection, bindparam, func
+from sqlmodel import Session, select, update
 
+from property_tracker.database.repository import PropertyRepository
 from property_tracker.models.property import Property
+from property_tracker.services.review_log import now_ms, record_review_writes
+from property_tracker.services.summary import SummaryService
+
+
+class VersionConflictError(RuntimeError):
+    """Raised when a conditional update finds the row changed since the version the caller read."""
+
+    def __init__(self, property_id: int, expected_version: int, current_version: int | None):
+        """Describe the conflict.
+
+        Args:
+            property_id: ID of the property that was not updated
+            expected_version: ``row_version`` the caller read
+            current_version: ``row_version`` in the database (None if the row is gone)
+        """
+        super().__init__(f"Property {property_id} changed since version {expected_version} (now {current_version})")
+        self.property_id = property_id
+        self.expected_version = expected_version
+        self.current_version = current_version
+
+
+def claim_versions(connection: Connection, expected: dict[int, int]) -> dict[int, int | None]:
+    """Check that rows are still at the versions a writer read, holding the write lock from here on.
+
+    Issues a no-op ``UPDATE ... WHERE row_version = :expected`` per row, so
+    the transaction takes SQLite's write lock before anything is compared:
+    no other writer can change the claimed rows until the caller commits.
+    No-op updates do not touch the change feed or the versions.
+
+    Args:
+        connection: Connection of the writing transaction
+        expected: Property ID -> ``row_version`` the writer read
+
+    Returns:
+        Conflicting property ID -> current ``row_version`` (None if the row is gone); empty if all match
+    """
+    if not expected:
+        return {}
+    table = Property.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .where(table.c.row_version == bindparam("_expected"))
+        .values(row_version=table.c.row_version)
+    )
+    stale = []
+    for property_id, version in expected.items():
+        if connection.execute(statement, {"_id": property_id, "_expected": version}).rowcount == 0:
+            stale.append(property_id)
+    if not stale:
+        return {}
+    current = dict(connection.execute(select(table.c.id, table.c.row_version).where(table.c.id.in_(stale))).all())
+    return {property_id: current.get(property_id) for property_id in stale}
 
 
 class ReviewService:
@@ -22,17 +77,19 @@ class ReviewService:
         """
         self.session = session
 
-    def update_status(self, property_id: int, new_status: str) -> bool:
+    def update_status(self, property_id: int, new_status: str, actor: str | None = None) -> bool:
         """Update review status for a property.
 
         Args:
             property_id: ID of the property to update
             new_status: New status ("To Review", "Rejected", or "Interested")
+            actor: User/session tag recorded in the review event log
 
         Returns:
             True if update successful, False otherwise
         """
         try:
+            record_review_writes(self.session.connection(), [(property_id, {"review_status": new_status}, actor, now_ms())])
             statement = update(Property).values(review_status=new_status, reviewed_date=datetime.now().isoformat()).where(Property.id == property_id)
             self.session.execute(statement)
             self.session.commit()
@@ -42,24 +99,67 @@ class ReviewService:
             self.session.rollback()
             return False
 
+    def update_status_if_unchanged(self, property_id: int, new_status: str, expected_version: int, actor: str | None = None) -> int:
+        """Update review status only if nobody changed the property since the caller read it.
+
+        Args:
+            property_id: ID of the property to update
+            new_status: New status ("To Review", "Rejected", or "Interested")
+            expected_version: ``row_version`` the caller read
+            actor: User/session tag recorded in the review event log
+
+        Returns:
+            The property's new ``row_version``
+
+        Raises:
+            VersionConflictError: If the property changed (or was deleted) since ``expected_version``
+        """
+        connection = self.session.connection()
+        conflicts = claim_versions(connection, {property_id: expected_version})
+        if conflicts:
+            self.session.rollback()
+            raise VersionConflictError(property_id, expected_version, conflicts[property_id])
+        record_review_writes(connection, [(property_id, {"review_status": new_status}, actor, now_ms())])
+        table = Property.__table__
+        self.session.execute(
+            update(table).values(review_status=new_status, reviewed_date=datetime.now().isoformat()).where(table.c.id == property_id)
+        )
+        version = self.session.execute(select(table.c.row_version).where(table.c.id == property_id)).scalar_one()
+        self.session.commit()
+        return version
+
+    def get_changed_since(self, version: int, columns: list[str] | None = None) -> tuple[int, list[tuple]]:
+        """Get properties changed after a ``row_version``, sold ones included.
+
+        A cheap indexed range query: clients keep the highest version they
+        have seen and refresh only these rows.
+
+        Args:
+            version: Highest ``row_version`` the client has applied
+            columns: Columns to load (defaults to all; ``id`` and ``row_version`` are always included)
+
+        Returns:
+            Tuple of (new_version, rows); new_version equals ``version`` when nothing changed
+        """
+        names = list(dict.fromkeys(["id", "row_version", *(columns or [])])) if columns else None
+        rows = PropertyRepository(self.session).fetch_rows(names, active_only=False, since_version=version)
+        return max((row.row_version for row in rows), default=version), rows
+
+    def current_version(self) -> int:
+        """Get the highest ``row_version`` of any property (0 for an empty table)."""
+        return self.session.execute(select(func.coalesce(func.max(Property.__table__.c.row_version), 0))).scalar_one()
+
     def get_status_counts(self) -> dict[str, int]:
         """Get counts for each review status.
 
+        Reads the trigger-maintained summary cube rather than grouping
+        over the property table.
+
         Returns:
             Dictionary mapping status names to counts
             e.g., {"To Review": 1000, "Interested": 5, "Rejected": 2}
         """
-        statement = select(Property.review_status, func.count(Property.id).label("count")).where(Property.sold == 0).group_by(Property.review_status)
-
-        results = self.session.exec(statement).all()
-        counts = {status: count for status, count in results}
-
-        # Ensure all statuses are present, even if count is 0
-        for status in ["To Review", "Interested", "Rejected"]:
-            if status not in counts:
-                counts[status] = 0
-
-        return counts
+        return SummaryService(self.session).get_status_counts()
 
     def get_properties_by_status(self, status: str | None = None, region: str | None = None, limit: int | None = None) -> list[Property]:
         """Get properties filtered by review status and region.
@@ -85,17 +185,39 @@ class ReviewService:
 
         return self.session.exec(statement).all()
 
-    def bulk_update_status(self, property_ids: list[int], new_status: str) -> int:
+    def get_property_rows_by_status(
+        self, status: str | None = None, region: str | None = None, limit: int | None = None, columns: list[str] | None = None
+    ) -> list[tuple]:
+        """Get read-only rows filtered by review status and region.
+
+        Same filters as ``get_properties_by_status``, read through
+        ``PropertyRepository`` so no ORM objects are built.
+
+        Args:
+            status: Filter by review status (None or "All" for all properties)
+            region: Filter by region (None or "All" for all regions)
+            limit: Maximum number of properties to return
+            columns: Columns to load (defaults to all)
+
+        Returns:
+            List of read-only rows with attribute access to the loaded columns
+        """
+        return PropertyRepository(self.session).fetch_rows(columns, status=status, region=region, limit=limit)
+
+    def bulk_update_status(self, property_ids: list[int], new_status: str, actor: str | None = None) -> int:
         """Bulk update multiple properties to the same status.
 
         Args:
             property_ids: List of property IDs to update
             new_status: New status to apply to all properties
+            actor: User/session tag recorded in the review event log
 
         Returns:
             Number of properties updated
         """
         try:
+            created_at = now_ms()
+            record_review_writes(self.session.connection(), [(pid, {"review_status": new_status}, actor, created_at) for pid in property_ids])
             statement = (
                 update(Property).values(review_status=new_status, reviewed_date=datetime.now().isoformat()).where(Property.id.in_(property_ids))
             )
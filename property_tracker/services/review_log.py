@@ -0,0 +1,281 @@
+"""Service layer for the review event log.
+
+Every review status or interaction change is appended to ``review_event``
+in the same transaction as the property update, so the log costs one
+batched INSERT per write. The log supports undoing a session's last
+actions, review throughput queries, point-in-time status lookups and
+rebuilding the property columns from scratch.
+"""
+
+import time
+from collections.abc import Iterable
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Connection, bindparam, func, insert, update
+from sqlalchemy.orm import aliased
+from sqlmodel import Session, select
+
+from property_tracker.config.settings import REVIEW_STATUSES
+from property_tracker.models.property import Property
+from property_tracker.models.review_event import FIELD_COLUMNS, FIELD_NOTES, FIELD_REVIEW_STATUS, ReviewEvent
+
+# Logged property column -> field code
+COLUMN_FIELDS = {column: field for field, column in FIELD_COLUMNS.items()}
+
+# A review write: (property_id, column values, actor, Unix time in ms)
+ReviewWrite = tuple[int, dict[str, Any], str | None, int]
+
+
+def now_ms() -> int:
+    """Current Unix time in milliseconds, the log's timestamp format."""
+    return time.time_ns() // 1_000_000
+
+
+def encode_value(field: int, value: Any, strict: bool = True) -> int | None:
+    """Encode a status or flag value as the log's integer code.
+
+    Args:
+        field: FIELD_* code
+        value: Property column value
+        strict: If False, an unknown status encodes as None instead of raising
+
+    Raises:
+        ValueError: If a status is not one of ``REVIEW_STATUSES`` (strict only)
+    """
+    if value is None:
+        return None
+    if field == FIELD_REVIEW_STATUS:
+        if value not in REVIEW_STATUSES:
+            if not strict:
+                return None
+            raise ValueError(f"Unknown review status: {value}")
+        return REVIEW_STATUSES.index(value)
+    return int(value)
+
+
+def decode_value(field: int, code: int | None) -> Any:
+    """Decode a logged integer code back to the property column value."""
+    if code is None:
+        return None
+    return REVIEW_STATUSES[code] if field == FIELD_REVIEW_STATUS else code
+
+
+def logged_value(field: int, code: int | None, text: str | None) -> Any:
+    """Property column value of one side of an event.
+
+    Notes are stored as text, and so is a status outside ``REVIEW_STATUSES``
+    that a logged write replaced (it has no code).
+    """
+    if field == FIELD_NOTES or (code is None and text is not None):
+        return text
+    return decode_value(field, code)
+
+
+def _event_values(field: int, value: Any) -> dict[str, Any]:
+    """Column values of an event's new side for a field."""
+    if field == FIELD_NOTES:
+        return {"new_text": value}
+    return {"new_value": encode_value(field, value)}
+
+
+def record_review_writes(connection: Connection, writes: Iterable[ReviewWrite]) -> int:
+    """Append log events for review writes about to be applied.
+
+    Must run in the writing transaction, before the property UPDATEs, so
+    old values are read from the rows being changed. Several writes to one
+    property are logged in order, each against the previous one. Writes
+    that do not change a value, columns that are not logged, and statuses
+    outside ``REVIEW_STATUSES`` (which have no code) are skipped; the
+    caller still applies them, as before the log existed.
+
+    Args:
+        connection: Connection of the writing transaction
+        writes: Writes in submission order
+
+    Returns:
+        Number of events appended
+    """
+    writes = list(writes)
+    ids = {property_id for property_id, _, _, _ in writes}
+    if not ids:
+        return 0
+
+    table = Property.__table__
+    columns = [table.c.id, *(table.c[column] for column in COLUMN_FIELDS)]
+    current = {row.id: dict(row._mapping) for row in connection.execute(select(*columns).where(table.c.id.in_(ids)))}
+
+    events = []
+    for property_id, values, actor, created_at in writes:
+        state = current.get(property_id)
+        if state is None:
+            continue
+        for column, value in values.items():
+            field = COLUMN_FIELDS.get(column)
+            if field is None or state[column] == value:
+                continue
+            if field == FIELD_REVIEW_STATUS and value not in REVIEW_STATUSES:
+                state[column] = value
+                continue
+            if field == FIELD_NOTES:
+                old_side = {"old_text": state[column]}
+            else:
+                old_code = encode_value(field, state[column], strict=False)
+                # Keep an uncoded old status as text, so undo can restore it
+                old_side = {"old_value": old_code, "old_text": state[column] if old_code is None and state[column] is not None else None}
+            events.append(
+                {
+                    "property_id": property_id,
+                    "field": field,
+                    "old_value": None,
+                    "new_value": None,
+                    "old_text": None,
+                    "new_text": None,
+                    **old_side,
+                    **_event_values(field, value),
+                    "created_at": created_at,
+                    "actor": actor,
+                    "reverts": None,
+                }
+            )
+            state[column] = value
+
+    if events:
+        connection.execute(insert(ReviewEvent.__table__), events)
+    return len(events)
+
+
+class ReviewLogService:
+    """Handles undo, throughput, replay and rebuild over the review event log."""
+
+    def __init__(self, session: Session):
+        """Initialize the review log service.
+
+        Args:
+            session: SQLModel database session
+        """
+        self.session = session
+
+    def _undoable(self):
+        """Select events that are not undo events, have not been undone and have an old value to restore.
+
+        Status events logged without the old status (an uncoded one, before
+        it was kept as text) cannot be undone: ``review_status`` is NOT NULL.
+        """
+        undo = aliased(ReviewEvent)
+        undone = select(undo.id).where(undo.reverts == ReviewEvent.id).exists()
+        unrestorable = (ReviewEvent.field == FIELD_REVIEW_STATUS) & ReviewEvent.old_value.is_(None) & ReviewEvent.old_text.is_(None)
+        return select(ReviewEvent).where(ReviewEvent.reverts.is_(None)).where(~undone).where(~unrestorable)
+
+    def undo_last(self, count: int = 1, actor: str | None = None) -> list[int]:
+        """Undo the most recent review actions.
+
+        Each undone event's property column is set back to its old value
+        and an event that ``reverts`` it is appended.
+
+        Args:
+            count: Number of actions (logged events) to undo
+            actor: Only undo this user/session's actions (None for anyone's)
+
+        Returns:
+            IDs of the properties that were changed back, most recent first
+        """
+        statement = self._undoable()
+        if actor is not None:
+            statement = statement.where(ReviewEvent.actor == actor)
+        events = self.session.exec(statement.order_by(ReviewEvent.id.desc()).limit(count)).all()
+
+        table = Property.__table__
+        created_at = now_ms()
+        for event in events:
+            column = FIELD_COLUMNS[event.field]
+            restored = logged_value(event.field, event.old_value, event.old_text)
+            reverse = {"old_value": event.new_value, "new_value": event.old_value, "old_text": event.new_text, "new_text": event.old_text}
+            values = {column: restored}
+            if event.field == FIELD_REVIEW_STATUS:
+                values["reviewed_date"] = datetime.now().isoformat()
+            self.session.execute(update(table).where(table.c.id == event.property_id).values(values))
+            self.session.add(
+                ReviewEvent(property_id=event.property_id, field=event.field, created_at=created_at, actor=actor, reverts=event.id, **reverse)
+            )
+
+        self.session.commit()
+        return [event.property_id for event in events]
+
+    def get_throughput(self, bucket: str = "day", since_ms: int | None = None) -> list[tuple[str, int]]:
+        """Count review status changes per day or hour (undos excluded).
+
+        Args:
+            bucket: "day" or "hour"
+            since_ms: Only count events at or after this Unix time in ms
+
+        Returns:
+            List of (bucket label in local time, count), oldest first
+        """
+        pattern = {"day": "%Y-%m-%d", "hour": "%Y-%m-%d %H:00"}[bucket]
+        label = func.strftime(pattern, ReviewEvent.created_at / 1000, "unixepoch", "localtime").label("bucket")
+        statement = (
+            select(label, func.count())
+            .where(ReviewEvent.field == FIELD_REVIEW_STATUS)
+            .where(ReviewEvent.reverts.is_(None))
+            .group_by(label)
+            .order_by(label)
+        )
+        if since_ms is not None:
+            statement = statement.where(ReviewEvent.created_at >= since_ms)
+        return [(row[0], row[1]) for row in self.session.execute(statement)]
+
+    def statuses_as_of(self, at_ms: int) -> dict[int, str]:
+        """Replay the log to get each property's review status at a point in time.
+
+        Properties whose status had not changed by then are omitted.
+
+        Args:
+            at_ms: Unix time in milliseconds
+
+        Returns:
+            Dictionary mapping property ID to review status
+        """
+        latest = (
+            select(func.max(ReviewEvent.id))
+            .where(ReviewEvent.field == FIELD_REVIEW_STATUS)
+            .where(ReviewEvent.created_at <= at_ms)
+            .group_by(ReviewEvent.property_id)
+        )
+        statement = select(ReviewEvent.property_id, ReviewEvent.new_value, ReviewEvent.new_text).where(ReviewEvent.id.in_(latest))
+        return {property_id: logged_value(FIELD_REVIEW_STATUS, code, text) for property_id, code, text in self.session.execute(statement)}
+
+    def rebuild_property_columns(self) -> int:
+        """Rewrite the review and interaction columns from the latest logged events.
+
+        Columns without any logged event keep their current value;
+        ``reviewed_date`` is set from the latest status event.
+
+        Returns:
+            Number of column values written
+        """
+        latest = select(func.max(ReviewEvent.id).label("id")).group_by(ReviewEvent.property_id, ReviewEvent.field).subquery()
+        events = self.session.exec(select(ReviewEvent).join(latest, ReviewEvent.id == latest.c.id)).all()
+
+        table = Property.__table__
+        written = 0
+        for field, column in FIELD_COLUMNS.items():
+            rows = []
+            for event in events:
+                if event.field != field:
+                    continue
+                value = logged_value(field, event.new_value, event.new_text)
+                row = {"_id": event.property_id, "_value": value}
+                if field == FIELD_REVIEW_STATUS:
+                    row["_reviewed_date"] = datetime.fromtimestamp(event.created_at / 1000).isoformat()
+                rows.append(row)
+            if not rows:
+                continue
+            values = {column: bindparam("_value")}
+            if field == FIELD_REVIEW_STATUS:
+                values["reviewed_date"] = bindparam("_reviewed_date")
+            self.session.connection().execute(update(table).where(table.c.id == bindparam("_id")).values(values), rows)
+            written += len(rows)
+
+        self.session.commit()
+        return written
@@ -0,0 +1,177 @@
+"""Service layer for location-based property queries.
+
+Uses the ``property_rtree`` R*Tree index to fetch only the properties inside
+a map viewport or within a radius, instead of loading every row and
+filtering coordinates in pandas.
+"""
+
+import math
+
+from sqlalchemy import Float, cast
+from sqlmodel import Session, func, select
+
+from property_tracker.database.rtree import property_rtree
+from property_tracker.models.property import Property
+
+KM_PER_DEGREE_LAT = 111.32
+
+
+def bbox_around(lat: float, lon: float, radius_km: float) -> tuple[float, float, float, float]:
+    """Bounding box that fully contains a circle around a point.
+
+    Args:
+        lat: Centre latitude in decimal degrees
+        lon: Centre longitude in decimal degrees
+        radius_km: Circle radius in kilometers
+
+    Returns:
+        Tuple of (min_lat, max_lat, min_lon, max_lon)
+    """
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    # Guard against the poles, where a degree of longitude shrinks to nothing
+    cos_lat = max(math.cos(math.radians(lat)), 1e-6)
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    return lat - d_lat, lat + d_lat, lon - d_lon, lon + d_lon
+
+
+class SpatialService:
+    """Handles bounding-box and radius queries over property coordinates."""
+
+    def __init__(self, session: Session):
+        """Initialize the spatial service.
+
+        Args:
+            session: SQLModel database session
+        """
+        self.session = session
+
+    def _bbox_statement(self, min_lat: float, max_lat: float, min_lon: float, max_lon: float, include_sold: bool):
+        """Build a SELECT over Property prefiltered by the R*Tree index."""
+        latitude = cast(Property.latitude, Float)
+        longitude = cast(Property.longitude, Float)
+        statement = (
+            select(Property)
+            .join(property_rtree, property_rtree.c.id == Property.id)
+            # R*Tree overlap test (index stores float32, so bounds are slightly widened)...
+            .where(property_rtree.c.max_lat >= min_lat, property_rtree.c.min_lat <= max_lat)
+            .where(property_rtree.c.max_lon >= min_lon, property_rtree.c.min_lon <= max_lon)
+            # ...then an exact check against the stored coordinates
+            .where(latitude.between(min_lat, max_lat), longitude.between(min_lon, max_lon))
+        )
+        if not include_sold:
+            statement = statement.where(Property.sold == 0)
+        return statement
+
+    def properties_in_bbox(
+        self,
+        min_lat: float,
+        max_lat: float,
+        min_lon: float,
+        max_lon: float,
+        include_sold: bool = False,
+        limit: int | None = None,
+    ) -> list[Property]:
+        """Get properties whose coordinates fall inside a bounding box.
+
+        Args:
+            min_lat: Southern edge in decimal degrees
+            max_lat: Northern edge in decimal degrees
+            min_lon: Western edge in decimal degrees
+            max_lon: Eastern edge in decimal degrees
+            include_sold: If True, also return sold properties
+            limit: Maximum number of properties to return
+
+        Returns:
+            List of Property objects inside the box
+        """
+        statement = self._bbox_statement(min_lat, max_lat, min_lon, max_lon, include_sold)
+        if limit:
+            statement = statement.limit(limit)
+        return self.session.exec(statement).all()
+
+    def properties_within_km(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        include_sold: bool = False,
+        limit: int | None = None,
+    ) -> list[tuple[Property, float]]:
+        """Get properties within a great-circle radius of a point.
+
+        The R*Tree narrows candidates to the enclosing bounding box; the
+        ``haversine_km`` SQL function then keeps only those truly in range.
+
+        Args:
+            lat: Centre latitude in decimal degrees
+            lon: Centre longitude in decimal degrees
+            radius_km: Search radius in kilometers
+            include_sold: If True, also return sold properties
+            limit: Maximum number of properties to return
+
+        Returns:
+            List of (Property, distance_km) tuples, nearest first
+        """
+        statement = self._within_km_statement(lat, lon, radius_km, include_sold, limit)
+        # execute() rather than exec(): the statement yields (Property, float) rows, not scalars
+        return [(prop, dist) for prop, dist in self.session.execute(statement).all()]
+
+    def ids_within_km(
+        self,
+        lat: float,
+        lon: float,
+        radius_km: float,
+        include_sold: bool = False,
+        limit: int | None = None,
+    ) -> list[tuple[int, float]]:
+        """Get the IDs of properties within a great-circle radius of a point.
+
+        Same query as ``properties_within_km`` without loading ORM objects;
+        pair it with ``PropertyRepository`` to fetch the columns you need.
+
+        Args:
+            lat: Centre latitude in decimal degrees
+            lon: Centre longitude in decimal degrees
+            radius_km: Search radius in kilometers
+            include_sold: If True, also return sold properties
+            limit: Maximum number of properties to return
+
+        Returns:
+            List of (property ID, distance_km) tuples, nearest first
+        """
+        statement = self._within_km_statement(lat, lon, radius_km, include_sold, limit)
+        distance = statement.selected_columns.distance_km
+        return [(pid, dist) for pid, dist in self.session.execute(statement.with_only_columns(Property.id, distance)).all()]
+
+    def within_km_subquery(self, lat: float, lon: float, radius_km: float, include_sold: bool = False):
+        """Subquery of the properties within a great-circle radius of a point.
+
+        Has every property column plus ``distance_km``. Pass it as the
+        ``table`` of a ``PropertyRepository`` to read a projection of the
+        properties in range in one joined query, however many there are.
+
+        Args:
+            lat: Centre latitude in decimal degrees
+            lon: Centre longitude in decimal degrees
+            radius_km: Search radius in kilometers
+            include_sold: If True, also include sold properties
+
+        Returns:
+            SQLAlchemy Subquery (unordered)
+        """
+        return self._within_km_statement(lat, lon, radius_km, include_sold, None).order_by(None).subquery("within_km")
+
+    def _within_km_statement(self, lat: float, lon: float, radius_km: float, include_sold: bool, limit: int | None):
+        """Build a SELECT of (Property, distance_km) within a radius, nearest first."""
+        min_lat, max_lat, min_lon, max_lon = bbox_around(lat, lon, radius_km)
+        distance = func.haversine_km(lat, lon, cast(Property.latitude, Float), cast(Property.longitude, Float), type_=Float).label("distance_km")
+
+        statement = (
+            self._bbox_statement(min_lat, max_lat, min_lon, max_lon, include_sold)
+            .add_columns(distance)
+            .where(distance <= radius_km)
+            .order_by(distance)
+        )
+        if limit:
+            statement = statement.limit(limit)
+        return statement
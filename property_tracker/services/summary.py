@@ -0,0 +1,122 @@
+"""Service layer for dashboard aggregates.
+
+Reads the trigger-maintained ``property_summary`` cube, so metrics, charts
+and dropdowns cost O(buckets) instead of a scan over every property.
+"""
+
+from sqlmodel import Session, func, select
+
+from property_tracker.config.settings import REVIEW_STATUSES
+from property_tracker.models.summary import MAX_ROOMS_BUCKET, PRICE_BUCKET_SIZE, UNKNOWN_BUCKET, PropertySummary
+
+
+def price_bucket_label(bucket: int) -> str:
+    """Human-readable label for a price bucket, e.g. "€50k-75k"."""
+    if bucket == UNKNOWN_BUCKET:
+        return "Unknown"
+    return f"€{bucket // 1000}k-{(bucket + PRICE_BUCKET_SIZE) // 1000}k"
+
+
+def rooms_bucket_label(bucket: int) -> str:
+    """Human-readable label for a rooms bucket, e.g. "4" or "10+"."""
+    if bucket == UNKNOWN_BUCKET:
+        return "Unknown"
+    return f"{bucket}+" if bucket >= MAX_ROOMS_BUCKET else str(bucket)
+
+
+class SummaryService:
+    """Handles aggregate queries over the property summary cube."""
+
+    def __init__(self, session: Session):
+        """Initialize the summary service.
+
+        Args:
+            session: SQLModel database session
+        """
+        self.session = session
+
+    def _unsold(self, statement, region: str | None = None, status: str | None = None):
+        """Restrict a cube query to unsold cells, optionally by region and status."""
+        statement = statement.where(PropertySummary.sold == 0)
+        if region and region != "All":
+            statement = statement.where(PropertySummary.region == region)
+        if status and status != "All":
+            statement = statement.where(PropertySummary.review_status == status)
+        return statement
+
+    def get_status_counts(self, region: str | None = None) -> dict[str, int]:
+        """Get counts of unsold properties for each review status.
+
+        Args:
+            region: Filter by region (None or "All" for all regions)
+
+        Returns:
+            Dictionary mapping every review status to its count
+        """
+        statement = self._unsold(
+            select(PropertySummary.review_status, func.sum(PropertySummary.property_count)).group_by(PropertySummary.review_status),
+            region=region,
+        )
+        counts = {status: 0 for status in REVIEW_STATUSES}
+        for status, count in self.session.exec(statement).all():
+            counts[status] = int(count)
+        return counts
+
+    def get_regions(self) -> list[str]:
+        """Get the sorted list of regions that have unsold properties."""
+        statement = self._unsold(select(PropertySummary.region).distinct()).order_by(PropertySummary.region)
+        return list(self.session.exec(statement).all())
+
+    def get_price_distribution(self, region: str | None = None, status: str | None = None) -> dict[int, int]:
+        """Get unsold property counts per price bucket.
+
+        Args:
+            region: Filter by region (None or "All" for all regions)
+            status: Filter by review status (None or "All" for all statuses)
+
+        Returns:
+            Dictionary mapping price bucket lower bound (EUR) to count, in bucket order
+        """
+        statement = self._unsold(
+            select(PropertySummary.price_bucket, func.sum(PropertySummary.property_count)).group_by(PropertySummary.price_bucket),
+            region=region,
+            status=status,
+        ).order_by(PropertySummary.price_bucket)
+        return {bucket: int(count) for bucket, count in self.session.exec(statement).all()}
+
+    def get_rooms_distribution(self, region: str | None = None, status: str | None = None) -> dict[int, int]:
+        """Get unsold property counts per rooms bucket.
+
+        Args:
+            region: Filter by region (None or "All" for all regions)
+            status: Filter by review status (None or "All" for all statuses)
+
+        Returns:
+            Dictionary mapping rooms bucket to count, in bucket order
+        """
+        statement = self._unsold(
+            select(PropertySummary.rooms_bucket, func.sum(PropertySummary.property_count)).group_by(PropertySummary.rooms_bucket),
+            region=region,
+            status=status,
+        ).order_by(PropertySummary.rooms_bucket)
+        return {bucket: int(count) for bucket, count in self.session.exec(statement).all()}
+
+    def get_average_price(self, region: str | None = None, status: str | None = None) -> float | None:
+        """Get the average price of unsold properties with a known price.
+
+        Args:
+            region: Filter by region (None or "All" for all regions)
+            status: Filter by review status (None or "All" for all statuses)
+
+        Returns:
+            Average price in EUR, or None if no prices are known
+        """
+        statement = self._unsold(
+            select(func.sum(PropertySummary.price_sum), func.sum(PropertySummary.price_count)),
+            region=region,
+            status=status,
+        )
+        price_sum, price_count = self.session.exec(statement).one()
+        if not price_count:
+            return None
+        return price_sum / price_count
@@ -0,0 +1,314 @@
+"""Write-behind queue for review and interaction updates.
+
+Review clicks are queued in memory and written in one transaction every
+``flush_interval`` seconds instead of one UPDATE and commit per click.
+Repeated writes to the same property are coalesced, so only the latest
+value per column reaches the property table, while every click is still
+appended to the review event log in the same transaction. Each submitted write is appended to
+a journal file and fsynced before ``submit()`` returns; a batch that cannot
+be written (e.g. while the scraper holds the write lock) is retried on the
+next tick, and journaled writes are replayed when a new queue starts after
+a crash.
+
+Writes may carry the ``row_version`` the session read. Such a write is
+only applied if the row is still at that version when its batch is
+written (or if the only change since was the same session's own earlier
+write); otherwise it is dropped and reported to its session by
+``take_conflicts()``, so concurrent reviewers never silently overwrite
+each other.
+"""
+
+import atexit
+import json
+import os
+import threading
+from collections import defaultdict
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from sqlalchemy import Engine, bindparam, select, update
+
+from property_tracker.config.settings import REVIEW_STATUSES, WRITE_QUEUE_FLUSH_SECONDS
+from property_tracker.models.property import Property
+from property_tracker.services.review import claim_versions
+from property_tracker.services.review_log import ReviewWrite, now_ms, record_review_writes
+
+# Columns the queue may write; everything else goes through the services directly
+QUEUED_FIELDS = frozenset({"review_status", "reviewed_date", "favorite", "viewed", "hidden", "notes"})
+
+
+class ReviewWriteQueue:
+    """Coalescing, journaled write-behind queue for review and interaction fields."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        journal_path: Path | str | None = None,
+        flush_interval: float | None = WRITE_QUEUE_FLUSH_SECONDS,
+        on_flush: Callable[[list[int]], None] | None = None,
+    ):
+        """Initialize the queue and start its flush thread.
+
+        Args:
+            engine: Engine of the database to write to
+            journal_path: Journal file for durability; None keeps writes in memory only
+            flush_interval: Seconds between background flushes; None disables the
+                flush thread (call ``flush()`` yourself)
+            on_flush: Called with the written property IDs after each committed batch
+        """
+        self.engine = engine
+        self.journal_path = Path(journal_path) if journal_path is not None else None
+        self.flush_interval = flush_interval
+        self.on_flush = on_flush
+
+        self._pending: dict[int, dict[str, Any]] = {}
+        self._inflight: dict[int, dict[str, Any]] = {}  # Batch being written by flush()
+        self._writes: list[ReviewWrite] = []  # Every submit, in order, for the event log
+        self._expected: dict[int, tuple[str | None, int]] = {}  # Property ID -> (actor, row_version it read)
+        self._produced: dict[tuple[str | None, int], int] = {}  # (actor, property ID) -> row_version its last write produced
+        self._conflicts: dict[str | None, dict[int, int | None]] = {}  # Actor -> rejected property ID -> current row_version
+        self._lock = threading.Lock()  # Guards _pending and the journal
+        self._flush_lock = threading.Lock()  # One flush at a time
+        self._stopped = threading.Event()
+        self._closed = False
+
+        if self.journal_path is not None:
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._replay_journal()
+
+        self._thread = None
+        if flush_interval is not None:
+            self._thread = threading.Thread(target=self._run, name="review-write-queue", daemon=True)
+            self._thread.start()
+        atexit.register(self.close)
+
+    @property
+    def _flushing_path(self) -> Path:
+        """Journal of the batch currently being written."""
+        return self.journal_path.with_name(self.journal_path.name + ".flushing")
+
+    def submit(self, property_id: int, actor: str | None = None, expected_version: int | None = None, **values: Any) -> bool:
+        """Queue a write of review/interaction columns for a property.
+
+        Args:
+            property_id: ID of the property to update
+            actor: User/session tag recorded in the review event log
+            expected_version: ``row_version`` the session read; the write is
+                dropped as a conflict if the row has changed since (None writes blindly)
+            **values: Column values, limited to ``QUEUED_FIELDS``
+
+        Returns:
+            False if the write was rejected at once because another session
+            has an unwritten conditional write queued for the property
+
+        Raises:
+            ValueError: If a column is not in ``QUEUED_FIELDS`` or the status is unknown
+            RuntimeError: If the queue has been closed
+        """
+        unknown = set(values) - QUEUED_FIELDS
+        if unknown:
+            raise ValueError(f"Cannot queue writes to: {', '.join(sorted(unknown))}")
+        if "review_status" in values and values["review_status"] not in REVIEW_STATUSES:
+            raise ValueError(f"Unknown review status: {values['review_status']}")
+
+        created_at = now_ms()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Write queue is closed")
+            if expected_version is not None:
+                # The session's view may not show its own last write yet
+                expected_version = max(expected_version, self._produced.get((actor, property_id), expected_version))
+                claim = self._expected.get(property_id)
+                if claim is not None and claim[0] != actor:
+                    self._conflicts.setdefault(actor, {})[property_id] = None
+                    return False
+                self._expected.setdefault(property_id, (actor, expected_version))
+            if self.journal_path is not None:
+                entry = {"id": property_id, "values": values, "actor": actor, "at": created_at}
+                if expected_version is not None:
+                    entry["expected"] = expected_version
+                with open(self.journal_path, "a", encoding="utf-8") as journal:
+                    journal.write(json.dumps(entry) + "\n")
+                    journal.flush()
+                    os.fsync(journal.fileno())
+            self._pending.setdefault(property_id, {}).update(values)
+            self._writes.append((property_id, values, actor, created_at))
+        return True
+
+    def update_status(self, property_id: int, new_status: str, actor: str | None = None, expected_version: int | None = None) -> bool:
+        """Queue a review status change, stamping ``reviewed_date`` like ``ReviewService``.
+
+        Args:
+            property_id: ID of the property to update
+            new_status: New status ("To Review", "Rejected", or "Interested")
+            actor: User/session tag recorded in the review event log
+            expected_version: ``row_version`` the session read (None writes blindly)
+
+        Returns:
+            False if the write was rejected at once as a conflict
+        """
+        return self.submit(
+            property_id, actor=actor, expected_version=expected_version, review_status=new_status, reviewed_date=datetime.now().isoformat()
+        )
+
+    def take_conflicts(self, actor: str | None) -> dict[int, int | None]:
+        """Get and clear a session's writes that were dropped because another session changed the row first.
+
+        Args:
+            actor: User/session tag the writes were submitted with
+
+        Returns:
+            Dictionary mapping property ID to its current ``row_version`` (None if not known)
+        """
+        with self._lock:
+            return self._conflicts.pop(actor, {})
+
+    def pending(self) -> dict[int, dict[str, Any]]:
+        """Get queued values not yet committed, for optimistic display.
+
+        Returns:
+            Dictionary mapping property ID to its queued column values
+        """
+        with self._lock:
+            pending = {property_id: dict(values) for property_id, values in self._inflight.items()}
+            for property_id, values in self._pending.items():
+                pending.setdefault(property_id, {}).update(values)
+            return pending
+
+    def flush(self) -> int:
+        """Write all queued values in one transaction.
+
+        If the write fails, for whatever reason, the batch is put back (newer
+        queued values win) and stays journaled for the next attempt. An
+        error from ``on_flush`` is reported and does not undo the write.
+
+        Returns:
+            Number of properties written (0 if nothing was queued or the write failed)
+        """
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, {}
+                writes, self._writes = self._writes, []
+                expected, self._expected = self._expected, {}
+                if not batch:
+                    return 0
+                self._inflight = batch
+                self._rotate_journal()
+
+            try:
+                conflicts, versions = self._write(batch, writes, expected)
+            except Exception as e:
+                print(f"Error flushing {len(batch)} queued review writes, will retry: {e}")
+                with self._lock:
+                    for property_id, values in batch.items():
+                        self._pending[property_id] = {**values, **self._pending.get(property_id, {})}
+                    self._writes = writes + self._writes
+                    self._expected = {**expected, **self._expected}
+                    self._inflight = {}
+                return 0
+
+            batch = {property_id: values for property_id, values in batch.items() if property_id not in conflicts}
+            with self._lock:
+                self._inflight = {}
+                for property_id, current in conflicts.items():
+                    self._conflicts.setdefault(expected[property_id][0], {})[property_id] = current
+                for property_id, _, actor, _ in writes:
+                    if property_id in versions:
+                        self._produced[(actor, property_id)] = versions[property_id]
+            if self.journal_path is not None:
+                self._flushing_path.unlink(missing_ok=True)
+
+        if self.on_flush is not None and batch:
+            try:
+                self.on_flush(sorted(batch))
+            except Exception as e:
+                print(f"Error in review write queue flush callback: {e}")
+        return len(batch)
+
+    def close(self) -> None:
+        """Stop the flush thread and write everything still queued.
+
+        Called automatically at interpreter exit. Writes that still cannot
+        be flushed remain in the journal and are replayed by the next queue.
+        """
+        if self._closed:
+            return
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush()
+        with self._lock:
+            self._closed = True
+        atexit.unregister(self.close)
+
+    def _run(self) -> None:
+        """Flush thread: write the queue every ``flush_interval`` seconds until closed."""
+        while not self._stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"Error in review write queue: {e}")
+
+    def _write(
+        self, batch: dict[int, dict[str, Any]], writes: list[ReviewWrite], expected: dict[int, tuple[str | None, int]]
+    ) -> tuple[dict[int, int | None], dict[int, int]]:
+        """Log and write a batch in one transaction, one executemany per distinct column set.
+
+        Conditional writes are checked first (taking the write lock), and
+        those whose row has moved on are left out of the batch and the log.
+
+        Returns:
+            Tuple of (conflicting property ID -> current row_version, written property ID -> new row_version)
+        """
+        table = Property.__table__
+        with self.engine.begin() as connection:
+            conflicts = claim_versions(connection, {property_id: version for property_id, (_, version) in expected.items()})
+            if conflicts:
+                batch = {property_id: values for property_id, values in batch.items() if property_id not in conflicts}
+                writes = [write for write in writes if write[0] not in conflicts]
+
+            groups: dict[tuple[str, ...], list[dict[str, Any]]] = defaultdict(list)
+            for property_id, values in batch.items():
+                groups[tuple(sorted(values))].append({"_id": property_id, **{f"_{name}": value for name, value in values.items()}})
+
+            record_review_writes(connection, writes)
+            for columns, rows in groups.items():
+                statement = update(table).where(table.c.id == bindparam("_id")).values({name: bindparam(f"_{name}") for name in columns})
+                connection.execute(statement, rows)
+            versions = dict(connection.execute(select(table.c.id, table.c.row_version).where(table.c.id.in_(list(batch)))).all()) if batch else {}
+        return conflicts, versions
+
+    def _rotate_journal(self) -> None:
+        """Move the live journal aside as the in-flight batch journal (caller holds ``_lock``).
+
+        If a previous batch failed, its journal is still there; the live
+        entries are appended to it so the file stays in submission order.
+        """
+        if self.journal_path is None or not self.journal_path.exists():
+            return
+        if self._flushing_path.exists():
+            with open(self._flushing_path, "a", encoding="utf-8") as flushing:
+                flushing.write(self.journal_path.read_text(encoding="utf-8"))
+                flushing.flush()
+                os.fsync(flushing.fileno())
+            self.journal_path.unlink()
+        else:
+            os.replace(self.journal_path, self._flushing_path)
+
+    def _replay_journal(self) -> None:
+        """Queue writes journaled by a previous process that were never committed."""
+        for path in (self._flushing_path, self.journal_path):
+            if not path.exists():
+                continue
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # A torn final line from a crash mid-write was never acknowledged
+                    continue
+                self._pending.setdefault(int(entry["id"]), {}).update(entry["values"])
+                if entry.get("expected") is not None:
+                    self._expected.setdefault(int(entry["id"]), (entry.get("actor"), entry["expected"]))
+                self._writes.append((int(entry["id"]), entry["values"], entry.get("actor"), entry.get("at", now_ms())))
@@ -0,0 +1,150 @@
+"""Offline reverse geocoding of listings to comune, province and region.
+
+Listings only carry coordinates and the name of the search that found
+them (``region`` is e.g. ``NORTHERN_ITALY``). ``AdminBoundaries`` answers
+which comune a point lies in from an ISTAT-style comuni GeoJSON in
+``COMUNI_PATH``: one (Multi)Polygon feature per comune, with the comune
+name, the province abbreviation and the region name as properties (the
+ISTAT ``COMUNE``/``SIGLA``/``DEN_REG`` fields, or the openpolis
+``name``/``prov_acr``/``reg_name`` ones).
+
+The comuni are split into their polygon parts, which are prepared and
+indexed in an STRtree. A batch lookup takes the bounding-box candidates
+of every point from the tree in one call and tests them against the
+prepared polygons in one vectorised ``intersects`` call. Points that fall
+in no comune (just off a generalised shoreline, or in a sliver between
+two borders) take the nearest comune within ``SNAP_DEGREES``. The parsed
+polygons are kept in the geometry cache, so later processes skip the
+GeoJSON.
+"""
+
+import json
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+from property_tracker.config import settings
+from property_tracker.utils.geometry_cache import file_digest, load_geometry_arrays
+
+# Bump when the lookup changes in a way that changes its answers
+ADMIN_ENRICHER_VERSION = 1
+
+# Property columns filled from the boundaries, with the feature properties each is read from (first present wins)
+ADMIN_FIELDS = {
+    "city": ("COMUNE", "name"),
+    "province": ("SIGLA", "prov_acr"),
+    "admin_region": ("DEN_REG", "reg_name"),
+}
+
+# Unmatched points snap to a comune at most this far away (~500 m)
+SNAP_DEGREES = 0.005
+
+
+class AdminBoundaries:
+    """Point-in-polygon lookups against the comuni of Italy."""
+
+    def __init__(self, path: Path | str | None = None):
+        """Prepare lookups against a comuni GeoJSON; the file is read on first use.
+
+        Args:
+            path: Comuni GeoJSON (defaults to ``COMUNI_PATH``)
+        """
+        self.path = Path(settings.COMUNI_PATH if path is None else path)
+        self._parts: np.ndarray | None = None  # Polygon parts of every comune, prepared
+        self._part_comune: np.ndarray | None = None  # Comune index of each part
+        self._tree: STRtree | None = None
+        self._names: dict[str, np.ndarray] = {}  # Column -> name per comune
+
+    def load(self) -> None:
+        """Load the boundaries now instead of on first lookup (before forking workers)."""
+        if self._tree is not None:
+            return
+        arrays = load_geometry_arrays(self.path, self._parse)
+        parts = shapely.from_ragged_array(shapely.GeometryType.POLYGON, arrays["coords"], (arrays["ring_offsets"], arrays["part_offsets"]))
+        shapely.prepare(parts)
+        self._parts = parts
+        self._part_comune = arrays["part_comune"]
+        self._tree = STRtree(parts)
+        self._names = {column: arrays[column] for column in ADMIN_FIELDS}
+
+    def _parse(self) -> dict[str, np.ndarray]:
+        """Parse the GeoJSON into flat polygon part arrays and the names of each comune."""
+        with open(self.path) as f:
+            features = json.load(f)["features"]
+
+        geometries = shapely.from_geojson([json.dumps(feature["geometry"]) for feature in features])
+        parts, part_comune = shapely.get_parts(geometries, return_index=True)
+        _, coords, (ring_offsets, part_offsets) = shapely.to_ragged_array(parts)
+
+        arrays = {"coords": coords, "ring_offsets": ring_offsets, "part_offsets": part_offsets, "part_comune": part_comune}
+        for column, keys in ADMIN_FIELDS.items():
+            names = []
+            for feature in features:
+                properties = feature.get("properties") or {}
+                names.append(next((str(properties[key]) for key in keys if properties.get(key) is not None), ""))
+            arrays[column] = np.array(names, dtype=str)
+        return arrays
+
+    def lookup(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> dict[str, np.ndarray]:
+        """Comune, province and region of many points.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Dictionary mapping column (``city``/``province``/``admin_region``) to
+            object arrays of names; None where a coordinate is missing or outside every comune
+        """
+        self.load()
+        assert self._tree is not None  # Type narrowing for mypy
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        result = {column: np.full(lats.shape, None, dtype=object) for column in ADMIN_FIELDS}
+        valid = np.flatnonzero(np.isfinite(lats) & np.isfinite(lons))
+        if not len(valid):
+            return result
+
+        points = shapely.points(lons[valid], lats[valid])
+        comune = np.full(len(points), -1)
+        point_idx, part_idx = self._tree.query(points)  # Bounding-box candidates
+        inside = shapely.intersects(self._parts[part_idx], points[point_idx])  # Against the prepared polygons
+        # A point on a shared border lies in both comuni: the first one wins
+        matched, first = np.unique(point_idx[inside], return_index=True)
+        comune[matched] = self._part_comune[part_idx[inside][first]]
+
+        missing = np.flatnonzero(comune < 0)
+        if len(missing):
+            near_idx, near_part = self._tree.query_nearest(points[missing], max_distance=SNAP_DEGREES, all_matches=False)
+            comune[missing[near_idx]] = self._part_comune[near_part]
+
+        found = comune >= 0
+        for column, names in self._names.items():
+            values = names[comune[found]].astype(object)
+            values[values == ""] = None  # Property missing from the feature
+            result[column][valid[found]] = values
+        return result
+
+
+_default_boundaries: AdminBoundaries | None = None
+
+
+def get_admin_boundaries() -> AdminBoundaries:
+    """The shared AdminBoundaries of ``COMUNI_PATH``, reloaded if the setting points elsewhere."""
+    global _default_boundaries
+
+    if _default_boundaries is None or _default_boundaries.path != Path(settings.COMUNI_PATH):
+        _default_boundaries = AdminBoundaries()
+    return _default_boundaries
+
+
+def admin_boundaries_available() -> bool:
+    """True when the comuni GeoJSON is present."""
+    return Path(settings.COMUNI_PATH).exists()
+
+
+def admin_version() -> str:
+    """Version of the names ``lookup()`` returns: the enricher version and the comuni file's digest."""
+    return f"{ADMIN_ENRICHER_VERSION}:{file_digest(settings.COMUNI_PATH)[:12]}"
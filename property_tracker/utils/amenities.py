@@ -0,0 +1,205 @@
+"""Distances to the nearest amenity of each class, from an offline extract.
+
+The only other route to amenity data is an Overpass query per listing.
+``import_amenities()`` (run by ``utils/import_amenities.py``) instead
+reads a local OSM-derived extract once: a GeoJSON of OSM features with
+their tags as properties, or a CSV with ``class``, ``lat`` and ``lon``
+columns. It sorts the features into ``AMENITY_CLASSES``, projects them to
+UTM and stores one compact float32 coordinate array per class in
+``AMENITY_INDEX_PATH``.
+
+``AmenityIndex`` indexes each class's points in an STRtree and answers
+the nearest distance of every class for a batch of listings with one
+``query_nearest`` call per class, next to the coast and water distances
+of ``DistanceCalculator``.
+"""
+
+import json
+import os
+from collections.abc import Sequence
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import shapely
+from shapely.strtree import STRtree
+
+from property_tracker.config import settings
+from property_tracker.utils.distance import DistanceCalculator, get_calculator
+from property_tracker.utils.geometry_cache import file_digest
+
+AMENITY_CLASSES = ("station", "hospital", "motorway_exit", "airport", "town_centre")
+
+# Bump when the classification or the distances change
+AMENITY_ENRICHER_VERSION = 1
+
+# Stations on these networks are not train stations
+_NON_TRAIN_STATIONS = {"subway", "light_rail", "monorail", "funicular"}
+
+
+def amenity_column(amenity_class: str) -> str:
+    """Property column of a class, e.g. ``station`` -> ``dist_station``."""
+    return f"dist_{amenity_class}"
+
+
+def classify(tags: dict) -> str | None:
+    """Amenity class of an OSM feature from its tags, or None if it is not one.
+
+    Args:
+        tags: OSM tags (e.g. ``{"railway": "station"}``)
+
+    Returns:
+        One of ``AMENITY_CLASSES``, or None
+    """
+    if tags.get("railway") in ("station", "halt") and tags.get("station") not in _NON_TRAIN_STATIONS:
+        return "station"
+    if tags.get("amenity") == "hospital" or tags.get("healthcare") == "hospital":
+        return "hospital"
+    if tags.get("highway") == "motorway_junction":
+        return "motorway_exit"
+    # Commercial airports carry an IATA code; airfields and heliports do not
+    if tags.get("aeroway") == "aerodrome" and tags.get("iata"):
+        return "airport"
+    if tags.get("place") in ("city", "town"):
+        return "town_centre"
+    return None
+
+
+def _read_extract(source: Path) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Classes, latitudes and longitudes of the amenities in a GeoJSON or CSV extract."""
+    if source.suffix.lower() == ".csv":
+        frame = pd.read_csv(source, usecols=["class", "lat", "lon"])
+        frame = frame[frame["class"].isin(AMENITY_CLASSES)]
+        return frame["class"].to_numpy(dtype=str), frame["lat"].to_numpy(dtype=float), frame["lon"].to_numpy(dtype=float)
+
+    with open(source) as f:
+        features = json.load(f)["features"]
+    classes, geometries = [], []
+    for feature in features:
+        properties = feature.get("properties") or {}
+        # Overpass-style exports nest the tags; osmium exports them as properties
+        amenity_class = classify(properties.get("tags") or properties)
+        if amenity_class is not None and feature.get("geometry"):
+            classes.append(amenity_class)
+            geometries.append(json.dumps(feature["geometry"]))
+    # Areas (hospital grounds, airports) are represented by a point inside them
+    points = shapely.point_on_surface(shapely.from_geojson(geometries)) if geometries else np.empty(0, dtype=object)
+    return np.array(classes, dtype=str), shapely.get_y(points), shapely.get_x(points)
+
+
+def import_amenities(source: Path | str, index_path: Path | str | None = None, calculator: DistanceCalculator | None = None) -> dict[str, int]:
+    """Import an OSM-derived extract into projected coordinate arrays per class.
+
+    Args:
+        source: GeoJSON of OSM features (tags as properties) or CSV with ``class``, ``lat``, ``lon``
+        index_path: Output ``.npz`` (defaults to ``AMENITY_INDEX_PATH``)
+        calculator: DistanceCalculator whose projection is used (defaults to the shared one)
+
+    Returns:
+        Number of amenities imported per class
+    """
+    source = Path(source)
+    index_path = Path(settings.AMENITY_INDEX_PATH if index_path is None else index_path)
+    classes, lats, lons = _read_extract(source)
+    valid, points = (calculator or get_calculator()).project_points(lats, lons)
+    classes = classes[valid]
+    # float32 keeps UTM coordinates to within half a metre at half the size
+    coords = shapely.get_coordinates(points).astype(np.float32)
+
+    arrays = {amenity_class: coords[classes == amenity_class] for amenity_class in AMENITY_CLASSES}
+    meta = {"source_digest": file_digest(source), "built": datetime.now().isoformat(timespec="seconds")}
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(f"{index_path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **arrays, meta=np.array(json.dumps(meta)))
+    os.replace(tmp_path, index_path)
+    return {amenity_class: len(points) for amenity_class, points in arrays.items()}
+
+
+class AmenityIndex:
+    """Nearest-amenity distances per class for batches of listings."""
+
+    def __init__(self, index_path: Path | str | None = None, calculator: DistanceCalculator | None = None):
+        """Open an index written by ``import_amenities()``.
+
+        Args:
+            index_path: Amenity ``.npz`` (defaults to ``AMENITY_INDEX_PATH``)
+            calculator: DistanceCalculator whose projection is used (defaults to the shared one)
+
+        Raises:
+            FileNotFoundError: If the index has not been imported
+        """
+        self.path = Path(settings.AMENITY_INDEX_PATH if index_path is None else index_path)
+        self.calculator = calculator or get_calculator()
+        self._trees: dict[str, STRtree] = {}
+        with np.load(self.path) as arrays:
+            self.meta = json.loads(arrays["meta"].item())
+            for amenity_class in AMENITY_CLASSES:
+                coords = arrays[amenity_class] if amenity_class in arrays.files else np.empty((0, 2))
+                if len(coords):
+                    self._trees[amenity_class] = STRtree(shapely.points(coords.astype(float)))
+
+    @property
+    def counts(self) -> dict[str, int]:
+        """Number of amenities indexed per class."""
+        return {amenity_class: len(self._trees[amenity_class]) if amenity_class in self._trees else 0 for amenity_class in AMENITY_CLASSES}
+
+    def distances(
+        self,
+        lats: Sequence[float] | np.ndarray,
+        lons: Sequence[float] | np.ndarray,
+        classes: Sequence[str] = AMENITY_CLASSES,
+    ) -> dict[str, np.ndarray]:
+        """Distances from many points to the nearest amenity of each class.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+            classes: Amenity classes to measure
+
+        Returns:
+            Dictionary mapping column (e.g. ``dist_station``) to distances in kilometers;
+            NaN where a coordinate is missing or the class has no amenities
+        """
+        valid, points = self.calculator.project_points(lats, lons)
+        result = {}
+        for amenity_class in classes:
+            distances = np.full(valid.shape, np.nan)
+            tree = self._trees.get(amenity_class)
+            if tree is not None and len(points):
+                (point_idx, _), nearest_m = tree.query_nearest(points, return_distance=True, all_matches=False)
+                valid_distances = np.empty(len(points))
+                valid_distances[point_idx] = nearest_m / 1000.0
+                distances[valid] = valid_distances
+            result[amenity_column(amenity_class)] = distances
+        return result
+
+
+# Opened indexes by path, with the file's modification time when opened
+_indexes: dict[Path, tuple[float, AmenityIndex]] = {}
+
+
+def get_amenity_index() -> AmenityIndex:
+    """The index of ``AMENITY_INDEX_PATH``, opened once per process and reopened when reimported.
+
+    Raises:
+        FileNotFoundError: If no extract has been imported
+    """
+    path = Path(settings.AMENITY_INDEX_PATH)
+    mtime = path.stat().st_mtime
+    cached = _indexes.get(path)
+    if cached is None or cached[0] != mtime:
+        cached = (mtime, AmenityIndex(path))
+        _indexes[path] = cached
+    return cached[1]
+
+
+def amenities_available() -> bool:
+    """True when an amenity extract has been imported."""
+    return Path(settings.AMENITY_INDEX_PATH).exists()
+
+
+def amenity_version() -> str:
+    """Version of the distances ``AmenityIndex`` returns: the enricher version and the imported extract's digest."""
+    return f"{AMENITY_ENRICHER_VERSION}:{get_amenity_index().meta['source_digest'][:12]}"
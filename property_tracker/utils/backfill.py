@@ -0,0 +1,282 @@
+"""Parallel recomputation of enrichment columns for the whole property table.
+
+``backfill()`` streams located listings (id, latitude, longitude) in
+chunks by ascending id and hands each chunk to a pool of worker
+processes, which calculate the distance columns and, when their data is
+present, look up ``city``/``province``/``admin_region`` and the nearest
+amenity distances.
+Workers load their geometry once: forked workers inherit the geometry
+the parent loaded before starting the pool, and spawned workers read it
+from the binary geometry cache. Results come back in order and are
+written one chunk per transaction with an ``executemany`` UPDATE that
+skips rows whose values did not change, so unchanged listings do not
+enter the change feed.
+
+With ``DISTANCE_MEMO`` on, the parent answers water distances from the
+distance memo before handing a chunk out; workers calculate only the
+misses, at the memo's rounded coordinates like ``main.py``, and the
+parent stores them.
+
+After each chunk the last written id is saved to a state file; an
+interrupted run resumes after it unless the enricher version changed in
+the meantime. The state file is removed when a run completes.
+"""
+
+import json
+import os
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Connection, Engine
+from sqlmodel import Session
+
+from property_tracker.config.settings import BACKFILL_CHUNK_SIZE, DISTANCE_MEMO
+from property_tracker.services.distance_memo import DistanceMemoService
+from property_tracker.utils.admin_boundaries import admin_boundaries_available, admin_version, get_admin_boundaries
+from property_tracker.utils.amenities import amenities_available, amenity_version, get_amenity_index
+from property_tracker.utils.distance import get_calculator, initial_bearing
+from property_tracker.utils.distance_raster import LAYERS, distance_layers, enricher_version, raster_distances
+
+# Chunks queued per worker, so reading stays only a little ahead of the pool
+CHUNKS_IN_FLIGHT_PER_WORKER = 2
+
+
+@dataclass
+class BackfillResult:
+    """Outcome of a backfill run."""
+
+    rows: int = 0  # Listings enriched by this run
+    updated: int = 0  # Listings whose stored values changed
+    last_id: int | None = None
+    resumed_after: int | None = None
+    seconds: float = 0.0
+    complete: bool = False
+    memo_hits: int = 0  # Distances answered from the distance memo
+    memo_misses: int = 0
+
+
+def enrich_distances(lats: np.ndarray, lons: np.ndarray, layers: tuple[str, ...]) -> dict[str, np.ndarray]:
+    """Distances for a chunk of listings, rounded like ``main.py`` stores them.
+
+    Returns:
+        Dictionary mapping column (``dist_coast``/``dist_water``) to values; NaN where not calculable
+    """
+    return {f"dist_{layer}": np.round(raster_distances(layer, lats, lons), 2) for layer in layers}
+
+
+def enrich_coast_points(lats: np.ndarray, lons: np.ndarray) -> dict[str, np.ndarray]:
+    """Coast distance, nearest coast point and the bearing to it, from one query and rounded like ``main.py`` stores them.
+
+    Returns:
+        Dictionary mapping column (``dist_coast``/``coast_lat``/``coast_lon``/``coast_bearing``) to values; NaN where not calculable
+    """
+    distances, coast_lats, coast_lons = get_calculator().nearest_coast_points(lats, lons)
+    return {
+        "dist_coast": np.round(distances, 2),
+        "coast_lat": np.round(coast_lats, 6),
+        "coast_lon": np.round(coast_lons, 6),
+        "coast_bearing": np.round(initial_bearing(lats, lons, coast_lats, coast_lons), 1),
+    }
+
+
+def enrichers() -> dict[str, str]:
+    """Versions of the enrichers whose data is present: the distance layers, ``admin`` and ``amenities``."""
+    # The coast distance is measured exactly together with the nearest coast point, never from the raster
+    versions = {layer: enricher_version(layer, exact=layer == "coast") for layer in distance_layers()}
+    if admin_boundaries_available():
+        versions["admin"] = admin_version()
+    if amenities_available():
+        versions["amenities"] = amenity_version()
+    return versions
+
+
+def _init_worker(names: tuple[str, ...]) -> None:
+    """Load the geometry once per worker (a no-op when inherited through fork)."""
+    get_calculator().load(water="water" in names)
+    if "admin" in names:
+        get_admin_boundaries().load()
+    if "amenities" in names:
+        get_amenity_index()
+
+
+def _enrich_chunk(task: tuple) -> tuple[np.ndarray, dict[str, np.ndarray], dict[str, tuple[np.ndarray, np.ndarray, np.ndarray]]]:
+    """Enrich a chunk; memoised layers are calculated only for the memo misses.
+
+    Returns:
+        Tuple of (ids, column values, layer to (rounded lats, rounded lons, distances) calculated for the memo)
+    """
+    ids, lats, lons, names, memoised = task
+    values = enrich_distances(lats, lons, tuple(name for name in names if name in LAYERS and name != "coast" and name not in memoised))
+    calculated = {}
+    for layer, (distances, missing, key_lats, key_lons) in memoised.items():
+        if len(missing):
+            calculated[layer] = (key_lats, key_lons, raster_distances(layer, key_lats, key_lons))
+            distances = distances.copy()
+            distances[missing] = calculated[layer][2]
+        values[f"dist_{layer}"] = np.round(distances, 2)
+    if "coast" in names:
+        values.update(enrich_coast_points(lats, lons))
+    if "admin" in names:
+        values.update(get_admin_boundaries().lookup(lats, lons))
+    if "amenities" in names:
+        values.update({column: np.round(distances, 2) for column, distances in get_amenity_index().distances(lats, lons).items()})
+    return ids, values, calculated
+
+
+def _memo_lookups(
+    memo: DistanceMemoService, versions: dict[str, str], layers: tuple[str, ...], lats: np.ndarray, lons: np.ndarray
+) -> dict[str, tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]]:
+    """Memoised distances of a chunk, with the positions and rounded coordinates of the misses."""
+    lookups = {}
+    for layer in layers:
+        distances = memo.lookup(layer, versions[layer], lats, lons)
+        missing = np.flatnonzero(np.isnan(distances) & np.isfinite(lats) & np.isfinite(lons))
+        lookups[layer] = (distances, missing, *memo.rounded(lats[missing], lons[missing]))
+    return lookups
+
+
+def _read_chunks(engine: Engine, after_id: int | None, chunk_size: int) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Located listings by ascending id, one short read per chunk.
+
+    Each chunk is read on a connection of its own, so no read transaction
+    stays open while the chunks are written.
+    """
+    while True:
+        with engine.connect() as connection:
+            rows = connection.exec_driver_sql(
+                "SELECT id, latitude, longitude FROM property WHERE id > ? AND latitude IS NOT NULL AND longitude IS NOT NULL ORDER BY id LIMIT ?",
+                (-1 if after_id is None else after_id, chunk_size),
+            ).fetchall()
+        if not rows:
+            return
+        ids, lats, lons = zip(*rows, strict=True)
+        # TEXT coordinates: parse in C; unparseable values become NaN and are skipped when writing
+        yield (
+            np.array(ids, dtype=np.int64),
+            pd.to_numeric(pd.Series(lats, dtype=object), errors="coerce").to_numpy(dtype=float),
+            pd.to_numeric(pd.Series(lons, dtype=object), errors="coerce").to_numpy(dtype=float),
+        )
+        after_id = int(ids[-1])
+
+
+def _ordered_results(executor: Executor, tasks: Iterator, window: int) -> Iterator:
+    """Map tasks over an executor in order, with at most ``window`` tasks submitted ahead."""
+    pending: deque = deque()
+    for task in tasks:
+        pending.append(executor.submit(_enrich_chunk, task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def write_chunk(connection: Connection, ids: np.ndarray, values: dict[str, np.ndarray]) -> int:
+    """Write enriched values for a chunk, skipping unchanged rows and keeping stored values where one is missing.
+
+    Args:
+        connection: Open connection (caller commits)
+        ids: Property IDs of the chunk
+        values: Column name to values (distances with NaN, or names with None, where missing)
+
+    Returns:
+        Number of rows whose values changed
+    """
+    columns = list(values)
+    assignments = ", ".join(f"{column} = COALESCE(?, {column})" for column in columns)
+    changed = " OR ".join(f"(? IS NOT NULL AND {column} IS NOT ?)" for column in columns)
+    statement = f"UPDATE property SET {assignments} WHERE id = ? AND ({changed})"
+
+    frame = pd.DataFrame(values).astype(object)
+    frame = frame.where(frame.notna(), None)
+    present = frame.notna().any(axis=1).to_numpy()
+    rows = frame[present].to_numpy().tolist()
+    params = [(*row, property_id, *(value for value in row for _ in range(2))) for property_id, row in zip(ids[present].tolist(), rows, strict=True)]
+    if not params:
+        return 0
+    return connection.exec_driver_sql(statement, params).rowcount
+
+
+def backfill(
+    engine: Engine,
+    workers: int | None = None,
+    chunk_size: int = BACKFILL_CHUNK_SIZE,
+    state_path: Path | str | None = None,
+    restart: bool = False,
+    progress: Callable[[int, int], None] | None = None,
+    memo: bool = DISTANCE_MEMO,
+) -> BackfillResult:
+    """Recompute the enriched columns of every located listing.
+
+    Args:
+        engine: Engine of the database to backfill
+        workers: Worker processes (defaults to the CPU count; 1 runs in this process)
+        chunk_size: Listings per chunk (one worker task and one write transaction)
+        state_path: Resume state file (None to neither resume nor record progress)
+        restart: Ignore saved state and start from the first listing
+        progress: Called with (rows done, rows in this run) after each chunk
+        memo: Answer water distances from the distance memo and store the new ones
+
+    Returns:
+        BackfillResult of this run
+    """
+    started = time.monotonic()
+    workers = workers or os.cpu_count() or 1
+    versions = enrichers()
+    names = tuple(versions)
+    state_path = Path(state_path) if state_path else None
+
+    result = BackfillResult()
+    if state_path and state_path.exists() and not restart:
+        state = json.loads(state_path.read_text())
+        if state.get("versions") == versions:
+            result.resumed_after = result.last_id = state["last_id"]
+
+    with engine.connect() as connection:
+        total = connection.exec_driver_sql(
+            "SELECT COUNT(*) FROM property WHERE id > ? AND latitude IS NOT NULL AND longitude IS NOT NULL",
+            (-1 if result.resumed_after is None else result.resumed_after,),
+        ).scalar_one()
+
+    # The coast distance is always exact, so only the water distance is memoised, as in main.py
+    memo_layers = ("water",) if memo and "water" in names else ()
+    memo_session = Session(engine)
+    distance_memo = DistanceMemoService(memo_session)
+    tasks = (
+        (ids, lats, lons, names, _memo_lookups(distance_memo, versions, memo_layers, lats, lons))
+        for ids, lats, lons in _read_chunks(engine, result.resumed_after, chunk_size)
+    )
+    # Loaded before the pool starts, so forked workers inherit it
+    _init_worker(names)
+    executor = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(names,)) if workers > 1 else None
+    try:
+        results = _ordered_results(executor, tasks, workers * CHUNKS_IN_FLIGHT_PER_WORKER) if executor else map(_enrich_chunk, tasks)
+        for ids, values, calculated in results:
+            for layer, (key_lats, key_lons, distances) in calculated.items():
+                distance_memo.store(layer, versions[layer], key_lats, key_lons, distances)
+            with engine.begin() as connection:
+                result.updated += write_chunk(connection, ids, values)
+            result.rows += len(ids)
+            result.last_id = int(ids[-1])
+            if state_path:
+                tmp_path = state_path.with_name(state_path.name + ".tmp")
+                tmp_path.write_text(json.dumps({"versions": versions, "last_id": result.last_id}))
+                os.replace(tmp_path, state_path)
+            if progress:
+                progress(result.rows, total)
+    finally:
+        if executor:
+            executor.shutdown(cancel_futures=True)
+        memo_session.close()
+
+    result.complete = True
+    result.memo_hits, result.memo_misses = distance_memo.hits, distance_memo.misses
+    if state_path:
+        state_path.unlink(missing_ok=True)
+    result.seconds = time.monotonic() - started
+    return result
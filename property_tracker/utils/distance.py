@@ -3,19 +3,63 @@
 This module provides distance calculations to coastlines and water bodies
 using GeoJSON data. Data files are loaded lazily only when first needed,
 avoiding the 8.7MB import-time overhead of the original implementation.
+
+``calculate_many()`` and the ``calculate_*_distances()`` methods take
+arrays of coordinates and answer them in a few vectorised shapely and
+pyproj calls (nearest coastline segment and nearest water line via
+``STRtree.query_nearest``), so a scraped page or a full-table backfill
+is one call. The single-point methods are thin wrappers around them.
+
+Both data sets are projected to UTM once when parsed and kept in the
+binary geometry cache (``geometry_cache``) for later processes, so nearest
+features are found and measured in metres. The coastline is indexed
+segment by segment, and ``nearest_coast_points()`` also returns where on
+the coast the nearest point lies.
 """
 
 import json
+from collections.abc import Sequence
+from pathlib import Path
 from typing import Any
 
+import numpy as np
 import pyproj
+import shapely
 from pyproj import Transformer
 from shapely import wkt
-from shapely.geometry import LineString
-from shapely.ops import nearest_points, transform
 from shapely.strtree import STRtree
 
 from property_tracker.config.settings import COASTLINE_PATH, WATERLINES_PATH
+from property_tracker.utils.geodesy import haversine_km  # noqa: F401 (re-exported)
+from property_tracker.utils.geometry_cache import load_geometry_arrays
+from property_tracker.utils.water_tiles import WaterTileIndex, water_tiles_available
+
+# Bump when a change to the calculation changes its results (invalidates memoised distances)
+DISTANCE_ENRICHER_VERSION = 2
+
+# Longest coastline segment before projection, in degrees (~1 km)
+COAST_SEGMENT_MAX_DEGREES = 0.01
+
+
+def initial_bearing(
+    lats1: Sequence[float] | np.ndarray, lons1: Sequence[float] | np.ndarray, lats2: Sequence[float] | np.ndarray, lons2: Sequence[float] | np.ndarray
+) -> np.ndarray:
+    """Initial great-circle bearing from the first points towards the second.
+
+    Args:
+        lats1: Latitudes of the start points in decimal degrees
+        lons1: Longitudes of the start points in decimal degrees
+        lats2: Latitudes of the end points in decimal degrees
+        lons2: Longitudes of the end points in decimal degrees
+
+    Returns:
+        Bearings in degrees clockwise from north, in [0, 360); NaN where a coordinate is missing
+    """
+    phi1, phi2 = np.radians(np.asarray(lats1, dtype=float)), np.radians(np.asarray(lats2, dtype=float))
+    d_lambda = np.radians(np.asarray(lons2, dtype=float) - np.asarray(lons1, dtype=float))
+    y = np.sin(d_lambda) * np.cos(phi2)
+    x = np.cos(phi1) * np.sin(phi2) - np.sin(phi1) * np.cos(phi2) * np.cos(d_lambda)
+    return np.degrees(np.arctan2(y, x)) % 360.0
 
 
 class DistanceCalculator:
@@ -37,23 +81,36 @@ class DistanceCalculator:
         """
         # Lazy-loaded data (None until first use)
         self._coastline: Any | None = None
-        self._water_lines: list[Any] | None = None  # Store the actual geometries
+        self._coast_segments: np.ndarray | None = None  # Coastline boundary as two-point lines projected to UTM
+        self._coast_tree: STRtree | None = None  # Spatial index over the segments
+        self._water_lines: np.ndarray | None = None  # Water lines projected to UTM
         self._water_tree: STRtree | None = None  # Store the spatial index
+        self._water_tiles: WaterTileIndex | None = None  # On-demand water tiles, when built
 
         # Coordinate transformers
         self._wgs_proj = pyproj.CRS("EPSG:4326")  # WGS84 (lat/lon)
         self._utm_proj = pyproj.CRS("EPSG:32633")  # UTM Zone 33N (meters)
         self._transformer = Transformer.from_crs(self._wgs_proj, self._utm_proj, always_xy=True)
+        self._inverse_transformer = Transformer.from_crs(self._utm_proj, self._wgs_proj, always_xy=True)
 
     def _load_coastline(self) -> None:
         """Lazy-load Italian coastline geometry from GeoJSON.
 
         This method is called automatically on first distance calculation.
-        The coastline data is cached after first load.
+        The coastline data is cached after first load, and the parsed,
+        projected geometry in the geometry cache for later processes.
         """
         if self._coastline is not None:
             return  # Already loaded
 
+        params = f"{self._utm_proj.to_string()}:{COAST_SEGMENT_MAX_DEGREES}"
+        arrays = load_geometry_arrays(COASTLINE_PATH, self._parse_coastline, params)
+        self._coastline = shapely.from_wkb(arrays["polygon_wkb"].tobytes())
+        self._coast_segments = shapely.linestrings(arrays["segments"])
+        self._coast_tree = STRtree(self._coast_segments)
+
+    def _parse_coastline(self) -> dict[str, np.ndarray]:
+        """Parse the coastline GeoJSON into the polygon (WKB) and its projected boundary segments."""
         with open(COASTLINE_PATH) as f:
             geojson_data = json.load(f)
 
@@ -65,32 +122,180 @@ class DistanceCalculator:
         wkt_polygon = f"POLYGON (({coords_str}))"
 
         # Load as Shapely geometry
-        self._coastline = wkt.loads(wkt_polygon)
+        coastline = wkt.loads(wkt_polygon)
+
+        # Project the boundary once and index it segment by segment, so each point only measures against its nearest few
+        # (densified first: the polygon's long straight border edges are straight in degrees, not in UTM)
+        segments = []
+        for part in shapely.get_parts(shapely.segmentize(coastline.boundary, COAST_SEGMENT_MAX_DEGREES)):
+            part_coords = shapely.get_coordinates(part)
+            x, y = self._transformer.transform(part_coords[:, 0], part_coords[:, 1])
+            projected = np.column_stack([x, y])
+            segments.append(np.stack([projected[:-1], projected[1:]], axis=1))
+        return {"polygon_wkb": np.frombuffer(shapely.to_wkb(coastline), dtype=np.uint8), "segments": np.concatenate(segments)}
 
     def _load_water_tree(self) -> None:
         """Lazy-load Italian water lines as spatial index tree.
 
         This method is called automatically on first water distance calculation.
-        The spatial tree is cached after first load.
+        The spatial tree is cached after first load, and the projected
+        vertices in the geometry cache for later processes.
         """
         if self._water_tree is not None:
             return  # Already loaded
 
-        with open(WATERLINES_PATH) as f:
+        arrays = load_geometry_arrays(WATERLINES_PATH, self.read_water_lines, self._utm_proj.to_string())
+
+        # Store the geometries and build spatial index
+        self._water_lines = shapely.linestrings(arrays["vertices"], indices=arrays["line_index"])
+        self._water_tree = STRtree(self._water_lines)
+
+    def read_water_lines(self, path: Path | str | None = None) -> dict[str, np.ndarray]:
+        """Parse a water lines GeoJSON into projected vertices and the line each belongs to.
+
+        Args:
+            path: GeoJSON file of LineString features (defaults to ``WATERLINES_PATH``)
+
+        Returns:
+            Dictionary with UTM ``vertices`` (n, 2) and their ``line_index``
+        """
+        with open(WATERLINES_PATH if path is None else path) as f:
             geojson_data = json.load(f)
 
-        # Extract all water line geometries and project to UTM
-        water_lines = []
-        for feature in geojson_data["features"]:
-            coords = feature["geometry"]["coordinates"]
-            line_geom = LineString(coords)
-            # Project to UTM for accurate distance calculations
-            projected_line = transform(self._transformer.transform, line_geom)
-            water_lines.append(projected_line)
+        # Project every vertex to UTM in one call
+        coords = [np.asarray(feature["geometry"]["coordinates"], dtype=float)[:, :2] for feature in geojson_data["features"]]
+        vertices = np.concatenate(coords)
+        x, y = self._transformer.transform(vertices[:, 0], vertices[:, 1])
+        line_index = np.repeat(np.arange(len(coords)), [len(c) for c in coords])
+        return {"vertices": np.column_stack([x, y]), "line_index": line_index}
+
+    def _water_tile_index(self) -> WaterTileIndex | None:
+        """The water tile index, opened on first use, or None when no tiles are built."""
+        if self._water_tiles is None and water_tiles_available():
+            self._water_tiles = WaterTileIndex()
+        return self._water_tiles
 
-        # Store the geometries list and build spatial index
-        self._water_lines = water_lines
-        self._water_tree = STRtree(water_lines)
+    def load(self, water: bool = True) -> None:
+        """Load the coastline and, if requested and present, the water lines now instead of on first use.
+
+        Called before forking worker processes, so they inherit the loaded
+        geometry. Water tiles are always loaded on demand.
+        """
+        self._load_coastline()
+        if water and WATERLINES_PATH.exists() and self._water_tile_index() is None:
+            self._load_water_tree()
+
+    def project_points(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Project the valid coordinates to UTM points.
+
+        Returns:
+            Tuple of (mask of inputs with both coordinates, UTM points for those inputs)
+        """
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        valid = np.isfinite(lats) & np.isfinite(lons)
+        x, y = self._transformer.transform(lons[valid], lats[valid])
+        return valid, shapely.points(np.asarray(x), np.asarray(y))
+
+    def calculate_coast_distances(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> np.ndarray:
+        """Calculate distances from many points to the nearest coastline.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Distances in kilometers; NaN where a coordinate is missing
+        """
+        self._load_coastline()
+        assert self._coast_tree is not None  # Type narrowing for mypy
+
+        valid, points = self.project_points(lats, lons)
+        distances = np.full(valid.shape, np.nan)
+        if not valid.any():
+            return distances
+
+        (point_idx, _), nearest_m = self._coast_tree.query_nearest(points, return_distance=True, all_matches=False)
+        valid_distances = np.empty(len(points))
+        valid_distances[point_idx] = nearest_m / 1000.0
+        distances[valid] = valid_distances
+        return distances
+
+    def nearest_coast_points(
+        self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Find the nearest coastline point for many points.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Tuple of (distances_km, coast_lats, coast_lons) arrays; NaN where a coordinate is missing
+        """
+        self._load_coastline()
+        assert self._coast_tree is not None  # Type narrowing for mypy
+
+        valid, points = self.project_points(lats, lons)
+        distances = np.full(valid.shape, np.nan)
+        coast_lats, coast_lons = distances.copy(), distances.copy()
+        if not valid.any():
+            return distances, coast_lats, coast_lons
+
+        (point_idx, segment_idx), nearest_m = self._coast_tree.query_nearest(points, return_distance=True, all_matches=False)
+        # The first point of the shortest line lies on the coast
+        coast_xy = shapely.get_coordinates(shapely.shortest_line(self._coast_segments[segment_idx], points[point_idx]))[::2]
+        lon, lat = self._inverse_transformer.transform(coast_xy[:, 0], coast_xy[:, 1])
+
+        for target, values in ((distances, nearest_m / 1000.0), (coast_lats, lat), (coast_lons, lon)):
+            valid_values = np.empty(len(points))
+            valid_values[point_idx] = values
+            target[valid] = valid_values
+        return distances, coast_lats, coast_lons
+
+    def calculate_water_distances(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> np.ndarray:
+        """Calculate distances from many points to the nearest water body.
+
+        Uses the water tiles when they are built, and the whole water
+        network from ``WATERLINES_PATH`` otherwise.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Distances in kilometers; NaN where a coordinate is missing
+        """
+        # Project all points to UTM in one call, then measure against the pre-projected lines
+        valid, points = self.project_points(lats, lons)
+        distances = np.full(valid.shape, np.nan)
+        if not valid.any():
+            return distances
+
+        tiles = self._water_tile_index()
+        if tiles is not None:
+            distances[valid] = tiles.distances(shapely.get_x(points), shapely.get_y(points)) / 1000.0
+            return distances
+
+        self._load_water_tree()
+        assert self._water_tree is not None  # Type narrowing for mypy
+        (point_idx, _), nearest_m = self._water_tree.query_nearest(points, return_distance=True, all_matches=False)
+
+        valid_distances = np.empty(len(points))
+        valid_distances[point_idx] = nearest_m / 1000.0
+        distances[valid] = valid_distances
+        return distances
+
+    def calculate_many(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Calculate coast and water distances for many points at once.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Tuple of (coast_distances_km, water_distances_km) arrays; NaN where a coordinate is missing
+        """
+        return self.calculate_coast_distances(lats, lons), self.calculate_water_distances(lats, lons)
 
     def calculate_coast_distance(self, lat: float, lon: float) -> float:
         """Calculate distance from a point to the nearest coastline.
@@ -106,24 +311,20 @@ class DistanceCalculator:
            On first call, this will load ~714KB of coastline data.
             Subsequent calls use the cached data.
         """
-        # Lazy-load coastline data on first use
-        self._load_coastline()
-        assert self._coastline is not None  # Type narrowing for mypy
+        return float(self.calculate_coast_distances([lat], [lon])[0])
 
-        # Create point from coordinates
-        point_wkt = f"POINT ({lon} {lat})"
-        point = wkt.loads(point_wkt)
+    def nearest_coast_point(self, lat: float, lon: float) -> tuple[float, float, float]:
+        """Find the nearest coastline point for one point.
 
-        # Find nearest point on coastline boundary
-        p_coast, p_query = nearest_points(self._coastline.boundary, point)
-
-        # Project both points to UTM for accurate distance calculation
-        p_coast_utm = transform(self._transformer.transform, p_coast)
-        p_query_utm = transform(self._transformer.transform, p_query)
+        Args:
+            lat: Latitude in decimal degrees (WGS84)
+            lon: Longitude in decimal degrees (WGS84)
 
-        # Calculate distance in meters, convert to kilometers
-        distance_m: float = p_coast_utm.distance(p_query_utm)
-        return distance_m / 1000.0
+        Returns:
+            Tuple of (distance_km, coast_lat, coast_lon)
+        """
+        distance, coast_lat, coast_lon = self.nearest_coast_points([lat], [lon])
+        return float(distance[0]), float(coast_lat[0]), float(coast_lon[0])
 
     def calculate_water_distance(self, lat: float, lon: float) -> float:
         """Calculate distance from a point to the nearest water body.
@@ -139,25 +340,7 @@ class DistanceCalculator:
             On first call, this will load ~8MB of water line data.
             Subsequent calls use the cached spatial tree.
         """
-        # Lazy-load water tree on first use
-        self._load_water_tree()
-        assert self._water_tree is not None  # Type narrowing for mypy
-        assert self._water_lines is not None  # Type narrowing for mypy
-
-        # Create point from coordinates
-        point_wkt = f"POINT ({lon} {lat})"
-        point = wkt.loads(point_wkt)
-
-        # Project point to UTM for accurate distance calculation
-        point_utm = transform(self._transformer.transform, point)
-
-        # Find nearest water feature using spatial index (returns index)
-        nearest_idx = self._water_tree.nearest(point_utm)
-        nearest_water = self._water_lines[nearest_idx]
-
-        # Calculate distance in meters, convert to kilometers
-        distance_m: float = point_utm.distance(nearest_water)
-        return distance_m / 1000.0
+        return float(self.calculate_water_distances([lat], [lon])[0])
 
     def calculate_both_distances(self, lat: float, lon: float) -> tuple[float, float]:
         """Calculate both coast and water distances in one call.
@@ -168,14 +351,9 @@ class DistanceCalculator:
 
         Returns:
             Tuple of (coast_distance_km, water_distance_km)
-
-        Note:
-            This is more efficient than calling both methods separately
-            if you need both distances.
         """
-        coast_dist = self.calculate_coast_distance(lat, lon)
-        water_dist = self.calculate_water_distance(lat, lon)
-        return coast_dist, water_dist
+        coast, water = self.calculate_many([lat], [lon])
+        return float(coast[0]), float(water[0])
 
 
 # Module-level convenience instance (lazy-loaded)
@@ -0,0 +1,289 @@
+"""Precomputed distance rasters with memory-mapped lookups.
+
+Listings cluster inside the search box of ``main.py``, so distances to the
+coast and to water can be computed once for a regular lat/lon grid over
+that box (``build_distance_raster()``, run by
+``utils/build_distance_raster.py``) and stored as a ``.npy`` file per
+layer, with a JSON sidecar describing the grid.
+
+``DistanceRaster`` memory-maps the file, so a lookup reads the four
+surrounding grid cells and interpolates bilinearly; processes sharing a
+raster share its pages through the OS page cache. ``raster_distances()``
+answers from the raster where one is built and falls back to the exact
+``DistanceCalculator`` for points outside it, and for points within
+``DISTANCE_RASTER_REFINE_KM`` of a feature, where the distance field has
+its kinks and interpolation is least accurate.
+
+The sidecar records the geometry the raster was computed from. A raster
+whose boundary file (or water tiles) has since changed is ignored until
+it is rebuilt, so its distances are never stored under the new version.
+"""
+
+import json
+import math
+import os
+from collections.abc import Callable, Sequence
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from property_tracker.config import settings
+from property_tracker.config.settings import (
+    COASTLINE_PATH,
+    DISTANCE_RASTER_BOX,
+    DISTANCE_RASTER_REFINE_KM,
+    DISTANCE_RASTER_RESOLUTION_M,
+    WATERLINES_PATH,
+)
+from property_tracker.utils.distance import DISTANCE_ENRICHER_VERSION, DistanceCalculator, get_calculator
+from property_tracker.utils.geometry_cache import file_digest
+from property_tracker.utils.water_tiles import tile_index_path, water_tiles_available
+
+LAYERS = ("coast", "water")
+
+SOURCES = {"coast": COASTLINE_PATH, "water": WATERLINES_PATH}
+
+METRES_PER_DEGREE_LAT = 111_320.0
+
+# Grid rows computed per batch call while building
+BUILD_CHUNK_ROWS = 64
+
+# Loaded rasters by path, with the file's modification time when loaded
+_rasters: dict[Path, tuple[float, "DistanceRaster"]] = {}
+
+
+def distance_layers() -> tuple[str, ...]:
+    """Layers whose geometry is present: the boundary file, or for water the water tiles."""
+    return tuple(layer for layer, source in SOURCES.items() if source.exists() or (layer == "water" and water_tiles_available()))
+
+
+def raster_path(layer: str, raster_dir: Path | str | None = None) -> Path:
+    """Path of a layer's raster, e.g. ``data/rasters/coast_distance.npy``."""
+    if layer not in LAYERS:
+        raise ValueError(f"Unknown raster layer: {layer!r} (expected one of {', '.join(LAYERS)})")
+    return Path(settings.DISTANCE_RASTER_DIR if raster_dir is None else raster_dir) / f"{layer}_distance.npy"
+
+
+def _measure(calculator: DistanceCalculator, layer: str) -> Callable[[np.ndarray, np.ndarray], np.ndarray]:
+    """The calculator's exact batch method for a layer."""
+    return calculator.calculate_coast_distances if layer == "coast" else calculator.calculate_water_distances
+
+
+def build_distance_raster(
+    layer: str,
+    resolution_m: float = DISTANCE_RASTER_RESOLUTION_M,
+    box: tuple[float, float, float, float] = DISTANCE_RASTER_BOX,
+    raster_dir: Path | str | None = None,
+    calculator: DistanceCalculator | None = None,
+    progress: Callable[[int, int], None] | None = None,
+) -> Path:
+    """Compute a layer's distances over a grid and store them as a raster.
+
+    The grid spacing is ``resolution_m`` in both directions at the box's
+    middle latitude. Rows are computed a chunk at a time into a
+    memory-mapped temporary file, which replaces the raster when complete.
+
+    Args:
+        layer: "coast" or "water"
+        resolution_m: Grid spacing in metres
+        box: (min_lat, max_lat, min_lon, max_lon) covered by the grid
+        raster_dir: Output directory (defaults to ``DISTANCE_RASTER_DIR``)
+        calculator: Calculator for the exact distances (defaults to the shared one)
+        progress: Called with (rows done, total rows) after each chunk
+
+    Returns:
+        Path of the written raster
+    """
+    path = raster_path(layer, raster_dir)
+    measure = _measure(calculator or get_calculator(), layer)
+    min_lat, max_lat, min_lon, max_lon = box
+    lat_step = resolution_m / METRES_PER_DEGREE_LAT
+    lon_step = resolution_m / (METRES_PER_DEGREE_LAT * math.cos(math.radians((min_lat + max_lat) / 2)))
+    rows = math.ceil((max_lat - min_lat) / lat_step) + 1
+    cols = math.ceil((max_lon - min_lon) / lon_step) + 1
+    lats = min_lat + np.arange(rows) * lat_step
+    lons = min_lon + np.arange(cols) * lon_step
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    grid = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.float32, shape=(rows, cols))
+    for start in range(0, rows, BUILD_CHUNK_ROWS):
+        block_lats, block_lons = np.meshgrid(lats[start : start + BUILD_CHUNK_ROWS], lons, indexing="ij")
+        grid[start : start + len(block_lats)] = measure(block_lats.ravel(), block_lons.ravel()).reshape(block_lats.shape)
+        if progress:
+            progress(min(start + BUILD_CHUNK_ROWS, rows), rows)
+    grid.flush()
+    del grid
+
+    meta = {
+        "layer": layer,
+        "source_digest": source_version(layer),
+        "min_lat": min_lat,
+        "min_lon": min_lon,
+        "lat_step": lat_step,
+        "lon_step": lon_step,
+        "rows": rows,
+        "cols": cols,
+        "resolution_m": resolution_m,
+        "built": datetime.now().isoformat(timespec="seconds"),
+    }
+    # Sidecar first: an open raster stays cached until the grid's mtime changes, and a reader
+    # that opens one in between sees a shape mismatch and calculates exactly instead
+    meta_path = path.with_suffix(".json")
+    tmp_meta_path = meta_path.with_name(meta_path.name + ".tmp")
+    tmp_meta_path.write_text(json.dumps(meta, indent=2))
+    os.replace(tmp_meta_path, meta_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+class DistanceRaster:
+    """Memory-mapped distance grid of one layer with bilinear lookups."""
+
+    def __init__(self, path: Path | str):
+        """Open a raster written by ``build_distance_raster()``.
+
+        Args:
+            path: Raster ``.npy`` file; its grid is described by the ``.json`` next to it
+
+        Raises:
+            FileNotFoundError: If the raster or its sidecar is missing
+            ValueError: If the raster does not match its sidecar
+        """
+        self.path = Path(path)
+        self.meta = json.loads(self.path.with_suffix(".json").read_text())
+        self.grid = np.load(self.path, mmap_mode="r")
+        if self.grid.shape != (self.meta["rows"], self.meta["cols"]):
+            raise ValueError(f"Raster {self.path} has shape {self.grid.shape}, expected {(self.meta['rows'], self.meta['cols'])}")
+
+    def lookup(self, lats: Sequence[float] | np.ndarray, lons: Sequence[float] | np.ndarray) -> np.ndarray:
+        """Interpolate distances bilinearly between the four surrounding grid points.
+
+        Args:
+            lats: Latitudes in decimal degrees (WGS84)
+            lons: Longitudes in decimal degrees (WGS84)
+
+        Returns:
+            Distances in kilometers; NaN where a coordinate is missing or outside the grid
+        """
+        meta = self.meta
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        row = (lats - meta["min_lat"]) / meta["lat_step"]
+        col = (lons - meta["min_lon"]) / meta["lon_step"]
+        inside = (row >= 0) & (row <= meta["rows"] - 1) & (col >= 0) & (col <= meta["cols"] - 1)
+
+        distances = np.full(lats.shape, np.nan)
+        row, col = row[inside], col[inside]
+        # The last row/column interpolates from the cell before it
+        r0 = np.minimum(np.floor(row).astype(np.intp), meta["rows"] - 2)
+        c0 = np.minimum(np.floor(col).astype(np.intp), meta["cols"] - 2)
+        fr, fc = row - r0, col - c0
+        grid = self.grid
+        top = grid[r0, c0] * (1 - fc) + grid[r0, c0 + 1] * fc
+        bottom = grid[r0 + 1, c0] * (1 - fc) + grid[r0 + 1, c0 + 1] * fc
+        distances[inside] = top * (1 - fr) + bottom * fr
+        return distances
+
+
+def load_distance_raster(layer: str, raster_dir: Path | str | None = None) -> DistanceRaster | None:
+    """The layer's raster, opened once per process and reopened when rebuilt.
+
+    Returns:
+        DistanceRaster, or None if the layer has not been built, is being
+        replaced, or was built from a boundary file that has since changed
+    """
+    path = raster_path(layer, raster_dir)
+    if not path.exists():
+        return None
+    mtime = path.stat().st_mtime
+    cached = _rasters.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            cached = (mtime, DistanceRaster(path))
+        except ValueError:
+            # Sidecar already replaced by a rebuild, grid not yet
+            return None
+        _rasters[path] = cached
+    try:
+        current = source_version(layer)
+    except FileNotFoundError:
+        return None
+    return cached[1] if cached[1].meta.get("source_digest") == current else None
+
+
+def raster_distances(
+    layer: str,
+    lats: Sequence[float] | np.ndarray,
+    lons: Sequence[float] | np.ndarray,
+    refine_km: float | None = DISTANCE_RASTER_REFINE_KM,
+    raster_dir: Path | str | None = None,
+    calculator: DistanceCalculator | None = None,
+) -> np.ndarray:
+    """Distances to a layer from its raster, calculated exactly where the raster cannot answer well.
+
+    Args:
+        layer: "coast" or "water"
+        lats: Latitudes in decimal degrees (WGS84)
+        lons: Longitudes in decimal degrees (WGS84)
+        refine_km: Recalculate exactly where the raster gives less than this (None to never refine)
+        raster_dir: Raster directory (defaults to ``DISTANCE_RASTER_DIR``)
+        calculator: Calculator for exact distances (defaults to the shared one)
+
+    Returns:
+        Distances in kilometers; NaN where a coordinate is missing
+    """
+    lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+    raster = load_distance_raster(layer, raster_dir)
+    measure = _measure(calculator or get_calculator(), layer)
+    if raster is None:
+        return measure(lats, lons)
+
+    distances = raster.lookup(lats, lons)
+    exact = np.isfinite(lats) & np.isfinite(lons) & ~np.isfinite(distances)
+    if refine_km is not None:
+        exact |= distances < refine_km
+    if exact.any():
+        distances[exact] = measure(lats[exact], lons[exact])
+    return distances
+
+
+@lru_cache(maxsize=8)
+def _source_digest(path: Path, mtime_ns: int, size: int) -> str:
+    """Digest of a boundary file, hashed once per file version."""
+    return file_digest(path)[:12]
+
+
+def source_version(layer: str) -> str:
+    """Identity of the geometry a layer is measured against.
+
+    The boundary file's digest, or for water tiles the digest of the file
+    they were cut from and their tiling.
+
+    Raises:
+        FileNotFoundError: If the layer's boundary file is missing
+    """
+    if layer == "water" and water_tiles_available():
+        index = json.loads(tile_index_path().read_text())
+        return f"{index['source_digest'][:12]}:tiles-{index['tile_size_m']:g}-{index['tolerance_m']:g}"
+    source = SOURCES[layer]
+    stat = source.stat()
+    return _source_digest(source, stat.st_mtime_ns, stat.st_size)
+
+
+def enricher_version(layer: str, raster_dir: Path | str | None = None, exact: bool = False) -> str:
+    """Version of the distances ``raster_distances()`` returns for a layer.
+
+    Combines ``DISTANCE_ENRICHER_VERSION``, the boundary file's contents
+    (for water tiles, the digest of the file they were cut from and their
+    tiling) and, when a raster answers lookups, its resolution; a change to
+    any of them changes the version. With ``exact``, the version of the
+    exact calculation, whether or not a raster is built.
+
+    Raises:
+        FileNotFoundError: If the layer's boundary file is missing
+    """
+    version = f"{DISTANCE_ENRICHER_VERSION}:{source_version(layer)}"
+    raster = None if exact else load_distance_raster(layer, raster_dir)
+    return f"{version}:raster-{raster.meta['resolution_m']:g}m" if raster is not None else version
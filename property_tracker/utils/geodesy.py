@@ -0,0 +1,35 @@
+"""Great-circle distance on the WGS84 mean sphere.
+
+Kept free of numpy, shapely and pyproj so the database layer can register
+``haversine_km`` as a SQLite function without loading the geometry stack.
+"""
+
+import math
+
+EARTH_RADIUS_KM = 6371.0088  # Mean Earth radius (IUGG)
+
+
+def haversine_km(lat1: float | None, lon1: float | None, lat2: float | None, lon2: float | None) -> float | None:
+    """Great-circle distance between two WGS84 points.
+
+    Args:
+        lat1: Latitude of the first point in decimal degrees
+        lon1: Longitude of the first point in decimal degrees
+        lat2: Latitude of the second point in decimal degrees
+        lon2: Longitude of the second point in decimal degrees
+
+    Returns:
+        Distance in kilometers, or None if any coordinate is missing
+
+    Note:
+        Registered as the ``haversine_km`` SQLite function, so it must
+        tolerate NULL inputs and string-typed coordinates.
+    """
+    if lat1 is None or lon1 is None or lat2 is None or lon2 is None:
+        return None
+    phi1 = math.radians(float(lat1))
+    phi2 = math.radians(float(lat2))
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(float(lon2) - float(lon1))
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
@@ -0,0 +1,79 @@
+"""Binary cache of geometry parsed from the GeoJSON boundary files.
+
+Parsing the boundary GeoJSON (``json.load``, then a Python loop per
+feature) and projecting it to UTM is repeated by every process that
+calculates distances. ``load_geometry_arrays()`` stores the result of a
+build function as an uncompressed ``.npz`` in ``GEOMETRY_CACHE_DIR``
+(polygons as WKB, lines as projected vertex arrays), keyed by the SHA-256
+of the source file and a parameter string. The next load reads the arrays
+back directly; editing or replacing the source file, or changing the
+parameters, rebuilds the entry automatically.
+"""
+
+import hashlib
+import os
+from collections.abc import Callable
+from pathlib import Path
+
+import numpy as np
+
+from property_tracker.config import settings
+
+# Bump when the layout of cached arrays changes
+CACHE_FORMAT = 1
+
+_KEY = "_cache_key"
+
+
+def file_digest(path: Path | str) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_path(source: Path | str, cache_dir: Path | str | None = None) -> Path:
+    """Cache file of a source file, e.g. ``ITA_coastline.json`` -> ``<cache dir>/ITA_coastline.npz``."""
+    return Path(settings.GEOMETRY_CACHE_DIR if cache_dir is None else cache_dir) / f"{Path(source).stem}.npz"
+
+
+def load_geometry_arrays(
+    source: Path | str,
+    build: Callable[[], dict[str, np.ndarray]],
+    params: str = "",
+    cache_dir: Path | str | None = None,
+) -> dict[str, np.ndarray]:
+    """Load arrays derived from a source file, building and caching them when stale.
+
+    Args:
+        source: GeoJSON file the arrays are derived from
+        build: Parses the source and returns the arrays to cache
+        params: Build parameters (e.g. the projection); a change invalidates the cache
+        cache_dir: Cache directory (defaults to ``GEOMETRY_CACHE_DIR``)
+
+    Returns:
+        Dictionary of arrays, as returned by ``build``
+    """
+    key = f"{CACHE_FORMAT}:{file_digest(source)}:{params}"
+    path = cache_path(source, cache_dir)
+    if path.exists():
+        try:
+            with np.load(path) as cached:
+                if cached[_KEY].item() == key:
+                    return {name: cached[name] for name in cached.files if name != _KEY}
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Rebuilding unreadable geometry cache {path}: {e}")
+
+    arrays = build()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Written under a temporary name, so concurrent readers never see a partial file
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.savez(f, **arrays, **{_KEY: np.array(key)})
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Could not write geometry cache {path}: {e}")
+    return arrays
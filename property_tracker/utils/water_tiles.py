@@ -0,0 +1,253 @@
+"""Tiled, simplified water network loaded on demand.
+
+The water lines GeoJSON covers all of Italy; loading it whole means
+parsing ~8 MB and holding every projected line in one STRtree, even to
+enrich a handful of listings in one valley. ``build_water_tiles()``
+(run by ``utils/build_water_tiles.py``) instead cuts the projected
+network into square UTM tiles of ``WATER_TILE_SIZE_M``, simplifies each
+tile's lines to ``WATER_TILE_SIMPLIFY_M`` and writes one ``.npz`` per
+tile into a new build directory. Replacing ``index.json``, which names
+the build directory, switches readers over atomically; the build before
+the replaced one is removed then, so a reader still on the replaced
+index keeps its tiles.
+
+``WaterTileIndex`` answers nearest-water queries ring by ring: it loads
+the tile under each point, then the ring of tiles around it, and so on,
+until the nearest line found is closer than anything in the next ring
+can be. Loaded tiles (lines and their STRtree) are kept in an LRU of
+``WATER_TILE_CACHE_SIZE`` tiles, so memory and first-query latency follow
+the area being enriched rather than the whole country.
+"""
+
+import json
+import math
+import os
+import shutil
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+from property_tracker.config import settings
+from property_tracker.config.settings import WATER_TILE_CACHE_SIZE, WATER_TILE_SIMPLIFY_M, WATER_TILE_SIZE_M, WATERLINES_PATH
+from property_tracker.utils.geometry_cache import file_digest
+
+INDEX_FILE = "index.json"
+
+# Tile column offset in tile codes, so western (negative) columns encode as positive numbers
+_COLUMN_OFFSET = 1 << 20
+
+
+def _encode(keys: np.ndarray) -> np.ndarray:
+    """Pack (column, row) tile keys into one int64 per tile."""
+    keys = np.asarray(keys, dtype=np.int64).reshape(-1, 2)
+    return ((keys[:, 0] + _COLUMN_OFFSET) << 32) + keys[:, 1]
+
+
+def _decode(code: int) -> tuple[int, int]:
+    return (code >> 32) - _COLUMN_OFFSET, code & 0xFFFFFFFF
+
+
+def _ring_offsets(ring: int) -> list[tuple[int, int]]:
+    """Tile offsets at Chebyshev distance ``ring`` (the tile itself for 0)."""
+    span = range(-ring, ring + 1)
+    return [(dx, dy) for dx in span for dy in span if max(abs(dx), abs(dy)) == ring]
+
+
+def tile_index_path(tile_dir: Path | str | None = None) -> Path:
+    """Path of the tile index, e.g. ``data/water_tiles/index.json``."""
+    return Path(settings.WATER_TILE_DIR if tile_dir is None else tile_dir) / INDEX_FILE
+
+
+def _tile_file(tile_dir: Path, key: str) -> Path:
+    return tile_dir / f"{key}.npz"
+
+
+def _remove_build(tile_dir: Path, build: str | None) -> None:
+    """Delete a build's tiles; ``""`` is the tile directory itself, where builds before build directories wrote them."""
+    if build is None:
+        return
+    if build:
+        shutil.rmtree(tile_dir / build, ignore_errors=True)
+    else:
+        for tile in tile_dir.glob("*.npz"):
+            tile.unlink(missing_ok=True)
+
+
+def build_water_tiles(
+    source: Path | str = WATERLINES_PATH,
+    tile_dir: Path | str | None = None,
+    tile_size_m: float = WATER_TILE_SIZE_M,
+    tolerance_m: float = WATER_TILE_SIMPLIFY_M,
+    calculator=None,
+) -> dict:
+    """Cut a water lines GeoJSON into simplified UTM tiles.
+
+    Lines are clipped to each tile they cross, so the nearest clipped piece
+    of a line is as near as the line itself.
+
+    Args:
+        source: Water lines GeoJSON
+        tile_dir: Output directory (defaults to ``WATER_TILE_DIR``)
+        tile_size_m: Tile edge in metres
+        tolerance_m: Simplification tolerance in metres (0 to keep every vertex)
+        calculator: DistanceCalculator whose projection is used (defaults to the shared one)
+
+    Returns:
+        The written tile index
+    """
+    from property_tracker.utils.distance import get_calculator
+
+    tile_dir = Path(settings.WATER_TILE_DIR if tile_dir is None else tile_dir)
+    arrays = (calculator or get_calculator()).read_water_lines(source)
+    lines = shapely.linestrings(arrays["vertices"], indices=arrays["line_index"])
+    tree = STRtree(lines)
+
+    min_x, min_y, max_x, max_y = shapely.total_bounds(lines)
+    build = f"build-{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+    build_dir = tile_dir / build
+    build_dir.mkdir(parents=True)
+
+    tiles = {}
+    try:
+        for ix in range(math.floor(min_x / tile_size_m), math.floor(max_x / tile_size_m) + 1):
+            for iy in range(math.floor(min_y / tile_size_m), math.floor(max_y / tile_size_m) + 1):
+                bounds = (ix * tile_size_m, iy * tile_size_m, (ix + 1) * tile_size_m, (iy + 1) * tile_size_m)
+                crossing = tree.query(shapely.box(*bounds))
+                if not len(crossing):
+                    continue
+                clipped = shapely.clip_by_rect(lines[crossing], *bounds)
+                if tolerance_m:
+                    clipped = shapely.simplify(clipped, tolerance_m)
+                parts = shapely.get_parts(clipped[~shapely.is_empty(clipped)])
+                parts = parts[shapely.get_type_id(parts) == shapely.GeometryType.LINESTRING]
+                if not len(parts):
+                    continue
+                vertices, line_index = shapely.get_coordinates(parts, return_index=True)
+                key = f"{ix}_{iy}"
+                np.savez(_tile_file(build_dir, key), vertices=vertices, line_index=line_index)
+                tiles[key] = len(vertices)
+    except BaseException:
+        # The current index still points at the previous build, which is untouched
+        shutil.rmtree(build_dir, ignore_errors=True)
+        raise
+
+    index_path = tile_index_path(tile_dir)
+    replaced = json.loads(index_path.read_text()) if index_path.exists() else None
+    index = {
+        "source_digest": file_digest(source),
+        "tile_size_m": tile_size_m,
+        "tolerance_m": tolerance_m,
+        "tiles": tiles,
+        "build": build,
+        "previous_build": replaced.get("build", "") if replaced else None,
+        "built": datetime.now().isoformat(timespec="seconds"),
+    }
+    # Switches readers to the new build in one rename
+    tmp_path = index_path.with_name(f"{INDEX_FILE}.{uuid.uuid4().hex}.tmp")
+    tmp_path.write_text(json.dumps(index, indent=2))
+    os.replace(tmp_path, index_path)
+    # Readers may still be on the replaced index, so only the build before it goes
+    if replaced:
+        _remove_build(tile_dir, replaced.get("previous_build"))
+    return index
+
+
+class WaterTileIndex:
+    """Nearest-water queries against on-demand tiles with LRU eviction."""
+
+    def __init__(self, tile_dir: Path | str | None = None, max_tiles: int = WATER_TILE_CACHE_SIZE):
+        """Open a tile index written by ``build_water_tiles()``.
+
+        Args:
+            tile_dir: Tile directory (defaults to ``WATER_TILE_DIR``)
+            max_tiles: Tiles kept loaded before the least recently used is evicted
+
+        Raises:
+            FileNotFoundError: If the directory has no tile index
+        """
+        self.tile_dir = Path(settings.WATER_TILE_DIR if tile_dir is None else tile_dir)
+        self.index = json.loads(tile_index_path(self.tile_dir).read_text())
+        self.build_dir = self.tile_dir / self.index.get("build", "")
+        self.tile_size = float(self.index["tile_size_m"])
+        self.max_tiles = max_tiles
+        self._tiles: OrderedDict[tuple[int, int], tuple[np.ndarray, STRtree]] = OrderedDict()
+        self.loads = 0
+        self.evictions = 0
+
+        keys = np.array([[int(part) for part in key.split("_")] for key in self.index["tiles"]], dtype=np.int64).reshape(-1, 2)
+        self._codes = np.sort(_encode(keys))
+        self._key_min = keys.min(axis=0) if len(keys) else np.zeros(2, dtype=np.int64)
+        self._key_max = keys.max(axis=0) if len(keys) else np.full(2, -1, dtype=np.int64)
+
+    @property
+    def loaded_tiles(self) -> int:
+        """Number of tiles currently in memory."""
+        return len(self._tiles)
+
+    def _tile(self, key: tuple[int, int]) -> tuple[np.ndarray, STRtree]:
+        """A tile's lines and tree, loading it and evicting the least recently used tile if needed."""
+        tile = self._tiles.get(key)
+        if tile is not None:
+            self._tiles.move_to_end(key)
+            return tile
+        with np.load(_tile_file(self.build_dir, f"{key[0]}_{key[1]}")) as arrays:
+            lines = shapely.linestrings(arrays["vertices"], indices=arrays["line_index"])
+        tile = (lines, STRtree(lines))
+        self._tiles[key] = tile
+        self.loads += 1
+        if len(self._tiles) > self.max_tiles:
+            self._tiles.popitem(last=False)
+            self.evictions += 1
+        return tile
+
+    def distances(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """Distances from projected points to the nearest water line.
+
+        Args:
+            x: UTM eastings in metres
+            y: UTM northings in metres
+
+        Returns:
+            Distances in metres; NaN if the index has no tiles
+        """
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        points = shapely.points(x, y)
+        tiles = np.column_stack([np.floor(x / self.tile_size), np.floor(y / self.tile_size)]).astype(np.int64)
+        best = np.full(len(points), np.inf)
+        # Rings beyond this hold no tiles for a point
+        last_ring = np.maximum(np.abs(tiles - self._key_min), np.abs(tiles - self._key_max)).max(axis=1)
+
+        ring = 0
+        pending = np.arange(len(points))
+        while len(pending) and len(self._codes):
+            # Pair every pending point with the existing tiles of this ring, grouped by tile
+            codes, members = [], []
+            for offset in _ring_offsets(ring):
+                neighbour_codes = _encode(tiles[pending] + offset)
+                present = np.isin(neighbour_codes, self._codes)
+                codes.append(neighbour_codes[present])
+                members.append(pending[present])
+            codes, members = np.concatenate(codes), np.concatenate(members)
+            order = np.argsort(codes, kind="stable")
+            tile_codes, starts = np.unique(codes[order], return_index=True)
+            for code, group in zip(tile_codes.tolist(), np.split(members[order], starts[1:]), strict=True):
+                _lines, tree = self._tile(_decode(code))
+                (point_idx, _), nearest = tree.query_nearest(points[group], return_distance=True, all_matches=False)
+                selected = group[point_idx]
+                best[selected] = np.minimum(best[selected], nearest)
+            # Anything in the next ring is at least ring * tile_size away
+            pending = pending[(best[pending] > ring * self.tile_size) & (last_ring[pending] > ring)]
+            ring += 1
+
+        best[np.isinf(best)] = np.nan
+        return best
+
+
+def water_tiles_available(tile_dir: Path | str | None = None) -> bool:
+    """True when a water tile index has been built."""
+    return tile_index_path(tile_dir).exists()
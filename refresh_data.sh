@@ -1,16 +1,26 @@
 #!/bin/bash
 
 # Script to refresh property data
-# Clears the database and fetches fresh data based on current search criteria
+# Snapshots the database, clears it and fetches fresh data based on current search criteria
 
 echo "======================================================================"
 echo "Property Data Refresh Script"
 echo "======================================================================"
 echo ""
 
+# Step 0: Snapshot the database before clearing it
+echo "Step 0: Taking a verified snapshot of the test database..."
+uv run python utils/backup_database.py snapshot
+if [ $? -ne 0 ]; then
+    echo "Snapshot failed. Exiting without clearing the database."
+    exit 1
+fi
+
+echo ""
+
 # Step 1: Clear the database
 echo "Step 1: Clearing test database..."
-uv run python clear_database.py
+uv run python utils/clear_database.py
 if [ $? -ne 0 ]; then
     echo "Failed to clear database. Exiting."
     exit 1
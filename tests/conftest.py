@@ -6,32 +6,66 @@ for the Property Tracker test suite.
 
 import json
 import os
+import shutil
+import tempfile
 from pathlib import Path
 
-import pytest
-from sqlmodel import Session, SQLModel, create_engine
+# Run against a scratch copy so the committed test.db is never rewritten; set before settings reads it
+COMMITTED_TEST_DATABASE = Path(__file__).resolve().parent.parent / "test.db"
+SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="property-tracker-tests-"))
+os.environ["TEST_DATABASE_PATH"] = str(SCRATCH_DIR / "test.db")
 
-from property_tracker.config.settings import TEST_DATABASE_PATH
-from property_tracker.models.property import Property
+import pytest  # noqa: E402
+from sqlmodel import Session, SQLModel, create_engine  # noqa: E402
+
+from property_tracker.config.settings import TEST_DATABASE_PATH  # noqa: E402
+from property_tracker.database.connection import create_database_tables, install_database_hooks  # noqa: E402
+from property_tracker.models.property import Property  # noqa: E402
+
+# Test engines are created directly, so attach the property triggers and SQL functions up front
+install_database_hooks()
+
+
+def _prepare_test_database() -> None:
+    """Copy the committed test database to the scratch directory and migrate the copy.
+
+    ``create_database_tables()`` brings it up to the current schema, as an
+    upgrade of an existing database would. Runs at import, since modules
+    collected as tests (e.g. ``test_load.py``) query it while being collected.
+    """
+    if COMMITTED_TEST_DATABASE.exists():
+        shutil.copyfile(COMMITTED_TEST_DATABASE, TEST_DATABASE_PATH)
+    engine = create_engine(f"sqlite:///{TEST_DATABASE_PATH}", echo=False)
+    create_database_tables(engine)
+    engine.dispose()
+
+
+_prepare_test_database()
 
 
 @pytest.fixture(scope="session", autouse=True)
 def setup_test_database():
     """Set up test database once before all tests.
 
-    This fixture automatically runs before any tests and ensures
-    the test database file exists with proper schema.
+    The scratch copy is prepared when this module is imported; it is
+    removed with its directory after the session.
     """
-    # Remove old test database if it exists
-    if os.path.exists(TEST_DATABASE_PATH):
-        os.remove(TEST_DATABASE_PATH)
-
     yield
 
-    # Optional: Clean up after all tests complete
-    # Commented out to allow inspection of test data
-    # if os.path.exists(TEST_DATABASE_PATH):
-    #     os.remove(TEST_DATABASE_PATH)
+    shutil.rmtree(SCRATCH_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session", autouse=True)
+def isolated_geometry_files(tmp_path_factory):
+    """Keep tests away from the geometry cache, distance rasters, water tiles and amenities in the project's data directory."""
+    from property_tracker.config import settings
+
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(settings, "GEOMETRY_CACHE_DIR", tmp_path_factory.mktemp("geometry_cache"))
+        mp.setattr(settings, "DISTANCE_RASTER_DIR", tmp_path_factory.mktemp("rasters"))
+        mp.setattr(settings, "WATER_TILE_DIR", tmp_path_factory.mktemp("water_tiles"))
+        mp.setattr(settings, "AMENITY_INDEX_PATH", tmp_path_factory.mktemp("amenities") / "amenities.npz")
+        yield
 
 
 @pytest.fixture(scope="function", autouse=True)
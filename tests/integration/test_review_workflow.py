@@ -4,7 +4,7 @@ Tests complete review workflow including database operations,
 status updates, and multi-step processes.
 """
 
-from sqlmodel import select
+from sqlmodel import Session, select
 
 from property_tracker.database.connection import get_session
 from property_tracker.models.property import Property
@@ -365,3 +365,89 @@ def test_property_lifecycle_integration(db_engine):
         assert prop.viewed == 1
         assert prop.notes == "Great location, good price!"
         assert prop.reviewed_date is not None
+
+
+def test_undo_last_review_refreshes_snapshot(db_engine, sample_properties_list, tmp_path, monkeypatch):
+    """The dashboard's undo reverts the last queued review and refreshes its snapshot row."""
+    from functools import partial
+    from pathlib import Path
+
+    import pytest
+
+    pytest.importorskip("streamlit")
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[2] / "ui"))
+    from components import listings
+
+    from property_tracker.database.snapshot import ListingSnapshot
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+
+    snapshot_path = tmp_path / "test.active.arrow"
+    with db_engine.connect() as connection:
+        ListingSnapshot(snapshot_path).rebuild(connection)
+    queue = ReviewWriteQueue(db_engine, flush_interval=None)
+    monkeypatch.setattr(listings, "ListingSnapshot", partial(ListingSnapshot, snapshot_path))
+    monkeypatch.setattr(listings, "_get_engine", lambda: db_engine)
+    monkeypatch.setattr(listings, "get_write_queue", lambda: queue)
+    monkeypatch.setattr(listings, "review_actor", lambda: "alice")
+
+    queue.update_status(1, "Interested", actor="alice")
+    assert listings.undo_last_review() == [1]
+
+    df = ListingSnapshot(snapshot_path).load_df(["id", "review_status"])
+    assert df.loc[df["id"] == 1, "review_status"].iloc[0] == "To Review"
+    queue.close()
+
+
+def test_map_pages_load_only_the_listings_in_view(db_engine, monkeypatch):
+    """A map's reported viewport selects the listings loaded through the spatial index."""
+    from pathlib import Path
+
+    import pytest
+
+    st = pytest.importorskip("streamlit")
+    monkeypatch.syspath_prepend(str(Path(__file__).resolve().parents[2] / "ui"))
+    from components import listings
+
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    with Session(db_engine) as session:
+        for property_id, lat, lon in [(1, "43.8438", "10.5077"), (2, "43.7696", "11.2558"), (3, "45.4408", "12.3155")]:
+            session.add(
+                Property(
+                    id=property_id,
+                    region="TUSCANY",
+                    category="Residenziale",
+                    latitude=lat,
+                    longitude=lon,
+                    discription="",
+                    discription_dk="",
+                    photo_list="[]",
+                )
+            )
+        session.commit()
+    queue = ReviewWriteQueue(db_engine, flush_interval=None)
+    monkeypatch.setattr(listings, "_get_engine", lambda: db_engine)
+    monkeypatch.setattr(listings, "get_write_queue", lambda: queue)
+    map_state = {
+        "bounds": {"_southWest": {"lat": 43.5, "lng": 10.0}, "_northEast": {"lat": 44.0, "lng": 11.5}},
+        "center": {"lat": 43.75, "lng": 10.75},
+        "zoom": 9,
+    }
+    # Outside a running app, stand in a plain dict for the session state st_folium writes to
+    monkeypatch.setattr(st, "session_state", {"coast_map": map_state})
+    queue.update_status(2, "Interested")
+
+    viewport = listings.map_viewport("coast_map")
+    assert viewport == (43.5, 44.0, 10.0, 11.5)
+    assert listings.map_view("coast_map") == ([43.75, 10.75], 9)
+    assert listings.map_viewport("property_map") is None
+
+    df = listings.get_listings_in_view(*viewport)
+    assert sorted(df["id"]) == [1, 2]
+    assert df["latitude"].dtype == "float64"
+    assert df.loc[df["id"] == 2, "review_status"].iloc[0] == "Interested"
+    queue.close()
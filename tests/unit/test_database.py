@@ -5,7 +5,8 @@ Tests database connection management, engine creation, and context managers.
 
 import os
 
-from sqlmodel import Session, SQLModel
+import pytest
+from sqlmodel import Session, SQLModel, select
 
 from property_tracker.database.connection import create_database_tables, get_engine, get_session, reset_engine
 from property_tracker.models.property import Property
@@ -214,3 +215,705 @@ def test_engine_disposal():
     reset_engine()
     new_engine = get_engine(use_test_db=True)
     assert new_engine is not None
+
+
+def test_rtree_index_maintained_by_triggers(db_session, sample_property):
+    """Insert, coordinate update and delete keep the R*Tree index in sync."""
+    from sqlmodel import text
+
+    db_session.add(sample_property)
+    db_session.commit()
+
+    row = db_session.exec(text("SELECT min_lat, min_lon FROM property_rtree WHERE id = 12345")).one()
+    assert row[0] == pytest.approx(43.8438, abs=1e-4)
+    assert row[1] == pytest.approx(10.5077, abs=1e-4)
+
+    sample_property.latitude = "45.0"
+    db_session.commit()
+    row = db_session.exec(text("SELECT min_lat FROM property_rtree WHERE id = 12345")).one()
+    assert row[0] == pytest.approx(45.0, abs=1e-4)
+
+    db_session.delete(sample_property)
+    db_session.commit()
+    assert db_session.exec(text("SELECT COUNT(*) FROM property_rtree")).one()[0] == 0
+
+
+def test_rtree_index_skips_rows_without_coordinates(db_session):
+    """Properties without coordinates are not indexed."""
+    from sqlmodel import text
+
+    db_session.add(Property(id=1, region="TEST", category="Residenziale", discription="", discription_dk="", photo_list="[]"))
+    db_session.commit()
+
+    assert db_session.exec(text("SELECT COUNT(*) FROM property_rtree")).one()[0] == 0
+
+
+def test_ensure_rtree_index_backfills_existing_rows(db_engine, sample_property):
+    """Installing the index on an existing database indexes rows already present."""
+    from sqlmodel import text
+
+    from property_tracker.database.rtree import ensure_rtree_index
+
+    with Session(db_engine) as session:
+        session.add(sample_property)
+        session.commit()
+        session.exec(text("DELETE FROM property_rtree"))
+        session.commit()
+
+    with db_engine.begin() as connection:
+        ensure_rtree_index(connection)
+        ensure_rtree_index(connection)  # Idempotent
+
+    with Session(db_engine) as session:
+        assert session.exec(text("SELECT COUNT(*) FROM property_rtree")).one()[0] == 1
+
+
+def test_haversine_sql_function_registered(db_engine):
+    """Every SQLite connection exposes the haversine_km SQL function."""
+    from sqlmodel import text
+
+    with Session(db_engine) as session:
+        distance = session.exec(text("SELECT haversine_km(43.8438, 10.5077, 43.7696, 11.2558)")).one()[0]
+        null_distance = session.exec(text("SELECT haversine_km(NULL, 10.5077, 43.7696, 11.2558)")).one()[0]
+
+    assert 60 < distance < 62
+    assert null_distance is None
+
+
+def test_summary_cube_rebuild_matches_triggers(db_session, sample_properties_list):
+    """A full rebuild produces the same cube the triggers maintained."""
+    from sqlmodel import select
+
+    from property_tracker.database.summary import rebuild_summary
+    from property_tracker.models.summary import PropertySummary
+
+    db_session.add_all(sample_properties_list)
+    db_session.commit()
+    sample_properties_list[0].review_status = "Rejected"
+    sample_properties_list[1].price = 90000
+    db_session.commit()
+
+    def cube():
+        return sorted(tuple(row.model_dump().values()) for row in db_session.exec(select(PropertySummary)).all())
+
+    maintained = cube()
+    rebuild_summary(db_session.connection())
+    db_session.commit()
+
+    assert cube() == maintained
+    assert len(maintained) == 4
+
+
+def test_ensure_summary_cube_only_rebuilds_without_triggers(db_engine, sample_properties_list):
+    """With the triggers installed startup leaves the cube alone; a database missing one is rebuilt."""
+    from property_tracker.database.summary import ensure_summary_cube
+
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+
+    def cube_rows(connection) -> int:
+        return connection.exec_driver_sql("SELECT COUNT(*) FROM property_summary").scalar()
+
+    with db_engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM property_summary")
+        ensure_summary_cube(connection)
+        assert cube_rows(connection) == 0
+
+        connection.exec_driver_sql("DROP TRIGGER property_summary_update")
+        ensure_summary_cube(connection)
+        assert cube_rows(connection) == 4
+
+
+def test_listing_snapshot_rebuild_and_load(db_engine, sample_properties_list, tmp_path):
+    """Rebuilding writes unsold listings with typed columns."""
+    from property_tracker.database.snapshot import ListingSnapshot
+
+    sample_properties_list[3].sold = 1
+    sample_properties_list[0].latitude = "43.8438"
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+
+    snapshot = ListingSnapshot(tmp_path / "test.active.arrow")
+    with db_engine.connect() as connection:
+        assert snapshot.rebuild(connection) == 3
+
+    table = snapshot.load_table(["id", "latitude", "price"])
+    assert sorted(table.column("id").to_pylist()) == [1, 2, 3]
+    assert str(table.schema.field("latitude").type) == "double"
+
+    df = snapshot.load_df()
+    assert df.loc[df["id"] == 1, "latitude"].iloc[0] == pytest.approx(43.8438)
+
+
+def test_listing_snapshot_refresh_rows_overlays_delta(db_engine, sample_properties_list, tmp_path, monkeypatch):
+    """Refreshing rows updates, removes and compacts without a full rebuild."""
+    from sqlmodel import update
+
+    from property_tracker.database import snapshot as snapshot_module
+    from property_tracker.database.snapshot import ListingSnapshot
+
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+
+    snapshot = ListingSnapshot(tmp_path / "test.active.arrow")
+    with db_engine.connect() as connection:
+        snapshot.rebuild(connection)
+
+    with Session(db_engine) as session:
+        session.exec(update(Property).where(Property.id == 1).values(review_status="Interested"))
+        session.exec(update(Property).where(Property.id == 2).values(sold=1))
+        session.delete(session.get(Property, 3))
+        session.commit()
+
+    with db_engine.connect() as connection:
+        snapshot.refresh_rows(connection, [1, 2, 3])
+
+    assert snapshot.delta_path.exists()
+    df = snapshot.load_df(["id", "review_status"])
+    assert sorted(df["id"]) == [1, 4]
+    assert df.loc[df["id"] == 1, "review_status"].iloc[0] == "Interested"
+
+    # Past the compaction threshold the delta is folded into the base file
+    monkeypatch.setattr(snapshot_module, "SNAPSHOT_COMPACT_ROWS", 0)
+    with db_engine.connect() as connection:
+        snapshot.refresh_rows(connection, [4])
+
+    assert not snapshot.delta_path.exists()
+    assert sorted(snapshot.load_df(["id"])["id"]) == [1, 4]
+
+    # A base written before the table gained columns is rebuilt instead of overlaid
+    monkeypatch.setattr(snapshot_module, "LISTING_COLUMNS", (*snapshot_module.LISTING_COLUMNS, "added_column"))
+    assert not snapshot.schema_current()
+
+
+def test_change_feed_records_inserts_updates_and_deletes(db_session, sample_property):
+    """Triggers log each write with the columns that actually changed."""
+    from sqlmodel import select
+
+    from property_tracker.models.change import CHANGE_DELETE, CHANGE_INSERT, CHANGE_UPDATE, PropertyChange
+
+    db_session.add(sample_property)
+    db_session.commit()
+
+    sample_property.review_status = "Interested"
+    sample_property.price = 175000
+    db_session.commit()
+
+    # A no-op write does not produce an entry
+    db_session.connection().exec_driver_sql("UPDATE property SET region = region")
+    db_session.delete(sample_property)
+    db_session.commit()
+
+    changes = db_session.exec(select(PropertyChange).order_by(PropertyChange.version)).all()
+    assert [c.operation for c in changes] == [CHANGE_INSERT, CHANGE_UPDATE, CHANGE_DELETE]
+    assert {c.property_id for c in changes} == {sample_property.id}
+    assert set(changes[1].changed_columns.split(",")) == {"price", "review_status"}
+    assert [c.version for c in changes] == sorted(c.version for c in changes)
+
+
+def test_listing_snapshot_concurrent_refreshes_keep_every_row(db_engine, sample_properties_list, tmp_path):
+    """Refreshes from several threads merge into the delta without losing each other's rows."""
+    from concurrent.futures import ThreadPoolExecutor
+
+    from sqlmodel import update
+
+    from property_tracker.database.snapshot import ListingSnapshot
+
+    ids = [prop.id for prop in sample_properties_list]
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+    snapshot = ListingSnapshot(tmp_path / "test.active.arrow")
+    with db_engine.connect() as connection:
+        snapshot.rebuild(connection)
+    with Session(db_engine) as session:
+        session.exec(update(Property).values(review_status="Interested"))
+        session.commit()
+
+    def refresh(property_id: int) -> None:
+        with db_engine.connect() as connection:
+            for _ in range(5):
+                snapshot.refresh_rows(connection, [property_id])
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        list(pool.map(refresh, ids))
+
+    assert sorted(snapshot.load_df(["id"])["id"]) == sorted(ids)
+    assert sorted(_read_delta_ids(snapshot)) == sorted(ids)
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def _read_delta_ids(snapshot) -> list[int]:
+    """IDs in a snapshot's delta file."""
+    from property_tracker.database.snapshot import _read_mapped
+
+    return _read_mapped(snapshot.delta_path).column("id").to_pylist()
+
+
+def test_listing_snapshot_records_feed_version(db_engine, sample_properties_list, tmp_path):
+    """The snapshot remembers the change feed version it was built at."""
+    from property_tracker.database.snapshot import ListingSnapshot
+
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+
+    snapshot = ListingSnapshot(tmp_path / "test.active.arrow")
+    with db_engine.connect() as connection:
+        snapshot.rebuild(connection)
+
+    assert snapshot.feed_version() == len(sample_properties_list)
+
+
+def test_sold_date_set_on_sale_and_cleared_on_relisting(db_session, sample_property):
+    """Triggers stamp sold_date when a listing sells and clear it when relisted."""
+    from datetime import date
+
+    db_session.add(sample_property)
+    db_session.commit()
+    assert sample_property.sold_date is None
+
+    sample_property.sold = 1
+    db_session.commit()
+    db_session.refresh(sample_property)
+    assert sample_property.sold_date == date.today().isoformat()
+
+    sample_property.sold = 0
+    db_session.commit()
+    db_session.refresh(sample_property)
+    assert sample_property.sold_date is None
+
+
+def test_ensure_archive_upgrades_existing_database(tmp_path):
+    """Databases without sold_date get the column, triggers and archive table."""
+    from sqlalchemy import create_engine as sa_create_engine
+    from sqlalchemy import inspect
+
+    from property_tracker.database.archive import ensure_archive
+
+    engine = sa_create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE property (id INTEGER PRIMARY KEY, sold INTEGER)")
+        connection.exec_driver_sql("INSERT INTO property (id, sold) VALUES (1, 1), (2, 0)")
+        ensure_archive(connection)
+        ensure_archive(connection)
+
+        sold_dates = dict(connection.exec_driver_sql("SELECT id, sold_date FROM property").all())
+    assert sold_dates[1] is not None
+    assert sold_dates[2] is None
+    assert "archived_at" in {column["name"] for column in inspect(engine).get_columns("property_archive")}
+    engine.dispose()
+
+
+def test_ensure_archive_converts_legacy_zlib_rows(db_engine):
+    """Values the archive stored as plain zlib are re-encoded so they read through CompressedText."""
+    import zlib
+
+    from sqlalchemy import select
+
+    from property_tracker.database.archive import ensure_archive
+    from property_tracker.models.archive import property_archive
+
+    description = "Rustico da ristrutturare con terreno agricolo e uliveto. " * 3
+    with db_engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO property_archive (id, region, category, discription, discription_dk, photo_list, archived_at) VALUES (1, 'R', 'C', ?, NULL, ?, '2026-01-01')",
+            (zlib.compress(description.encode(), 9), zlib.compress(b"[]", 9)),
+        )
+        ensure_archive(connection)
+        ensure_archive(connection)
+        row = connection.execute(select(property_archive).where(property_archive.c.id == 1)).mappings().one()
+    assert (row["discription"], row["discription_dk"], row["photo_list"]) == (description, None, "[]")
+
+
+def test_ensure_property_columns_adds_missing_columns(tmp_path):
+    """Databases from before a column existed get it added, leaving row_version to the change feed."""
+    from sqlalchemy import create_engine as sa_create_engine
+
+    from property_tracker.database.connection import ensure_property_columns
+
+    engine = sa_create_engine(f"sqlite:///{tmp_path / 'old.db'}")
+    with engine.begin() as connection:
+        connection.exec_driver_sql("CREATE TABLE property (id INTEGER PRIMARY KEY, region VARCHAR, city VARCHAR)")
+        ensure_property_columns(connection)
+        ensure_property_columns(connection)
+        columns = {row[1] for row in connection.exec_driver_sql("PRAGMA table_info(property)")}
+    assert {"admin_region", "province", "sold_date"} <= columns
+    assert "row_version" not in columns
+    engine.dispose()
+
+
+def _backup_source(path):
+    """Create a small database to snapshot."""
+    import sqlite3
+
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE listing (id INTEGER PRIMARY KEY, name TEXT)")
+    connection.executemany("INSERT INTO listing (name) VALUES (?)", [(f"house {i}",) for i in range(50)])
+    connection.commit()
+    connection.close()
+
+
+def test_snapshot_database_compresses_verifies_and_rotates(tmp_path):
+    """Snapshots are gzipped, described by a manifest, and rotated."""
+    import json
+
+    from property_tracker.database.backup import list_backups, manifest_path, snapshot_database, verify_backup
+
+    source = tmp_path / "live.db"
+    _backup_source(source)
+    backup_dir = tmp_path / "backups"
+
+    result = snapshot_database(source, backup_dir, compress=True, keep=2, step_sleep=0)
+    assert result.path.name.endswith(".db.gz")
+    assert result.row_counts == {"listing": 50}
+    assert json.loads(manifest_path(result.path).read_text())["row_counts"] == {"listing": 50}
+    assert verify_backup(result.path) == {"listing": 50}
+
+    # Older snapshots (older timestamps in the name) are rotated out
+    for stamp in ("20200101-000000", "20200102-000000"):
+        (backup_dir / f"live-{stamp}.db").write_bytes(b"")
+    snapshot_database(source, backup_dir, compress=False, keep=2, step_sleep=0)
+    names = [path.name for path in list_backups(backup_dir, "live")]
+    assert len(names) == 2
+    assert not any(name.startswith("live-2020") for name in names)
+
+    # Snapshots within the same second get their own files
+    first = snapshot_database(source, backup_dir, compress=False, keep=None, step_sleep=0)
+    second = snapshot_database(source, backup_dir, compress=False, keep=None, step_sleep=0)
+    assert first.path != second.path and first.path.exists()
+
+
+def test_snapshot_database_refuses_missing_source(tmp_path):
+    """A missing database is reported instead of being created empty and snapshotted."""
+    from property_tracker.database.backup import snapshot_database
+
+    with pytest.raises(FileNotFoundError):
+        snapshot_database(tmp_path / "missing.db", tmp_path / "backups", keep=None, step_sleep=0)
+    assert not (tmp_path / "missing.db").exists()
+    assert not list((tmp_path / "backups").iterdir())
+
+
+def test_snapshot_database_while_writer_holds_lock(tmp_path):
+    """A snapshot completes while another connection has an open write transaction."""
+    import sqlite3
+
+    from property_tracker.database.backup import snapshot_database
+
+    source = tmp_path / "live.db"
+    _backup_source(source)
+    writer = sqlite3.connect(source)
+    writer.execute("BEGIN IMMEDIATE")
+    writer.execute("INSERT INTO listing (name) VALUES ('uncommitted')")
+    try:
+        result = snapshot_database(source, tmp_path / "backups", keep=None, step_sleep=0)
+    finally:
+        writer.rollback()
+        writer.close()
+    # The snapshot is the last committed state
+    assert result.row_counts == {"listing": 50}
+
+
+def test_restore_database_rejects_mismatched_manifest(tmp_path):
+    """Restores verify the snapshot first and leave the target alone if it fails."""
+    import json
+    import sqlite3
+
+    from property_tracker.database.backup import BackupVerificationError, manifest_path, restore_database, snapshot_database
+
+    source = tmp_path / "live.db"
+    _backup_source(source)
+    result = snapshot_database(source, tmp_path / "backups", keep=None, step_sleep=0)
+
+    target = tmp_path / "restored.db"
+    assert restore_database(result.path, target, step_sleep=0) == {"listing": 50}
+    connection = sqlite3.connect(target)
+    assert connection.execute("SELECT COUNT(*) FROM listing").fetchone()[0] == 50
+    connection.close()
+
+    manifest = json.loads(manifest_path(result.path).read_text())
+    manifest["row_counts"]["listing"] = 49
+    manifest_path(result.path).write_text(json.dumps(manifest))
+    untouched = tmp_path / "untouched.db"
+    with pytest.raises(BackupVerificationError):
+        restore_database(result.path, untouched, step_sleep=0)
+    assert not untouched.exists()
+
+
+def test_property_repository_projects_columns_without_orm(db_session, sample_properties_list):
+    """Repository rows are plain named tuples holding only the requested columns."""
+    from property_tracker.database.repository import PropertyRepository
+
+    db_session.add_all(sample_properties_list)
+    db_session.commit()
+
+    rows = PropertyRepository(db_session).fetch_rows(["id", "region"], region="TUSCANY")
+    assert sorted(row.id for row in rows) == [1, 4]
+    assert rows[0]._fields == ("id", "region")
+    assert not hasattr(rows[0], "__dict__")
+
+
+def test_property_repository_arrow_and_numpy_types(db_session, sample_property):
+    """Text coordinates become floats; unparseable and legacy values are coerced."""
+    import numpy as np
+    import pyarrow as pa
+
+    from property_tracker.database.repository import PropertyRepository
+
+    db_session.add(sample_property)
+    db_session.commit()
+    db_session.connection().exec_driver_sql(
+        f"UPDATE property SET longitude = 'n/a', bathrooms = 2, price = '150000.0' WHERE id = {sample_property.id}"
+    )
+
+    repository = PropertyRepository(db_session)
+    table = repository.fetch_arrow(["latitude", "longitude", "bathrooms", "price"])
+    assert table.schema.field("latitude").type == pa.float64()
+    assert table.column("latitude")[0].as_py() == pytest.approx(float(sample_property.latitude))
+    assert table.column("longitude")[0].as_py() is None
+    assert table.column("bathrooms")[0].as_py() == "2"
+    assert table.column("price")[0].as_py() == 150000
+
+    arrays = repository.fetch_arrays(["id", "longitude"])
+    assert arrays["id"].dtype == np.int64
+    assert np.isnan(arrays["longitude"][0])
+    assert repository.fetch_arrow(["id"], active_only=True, ids=[]).num_rows == 0
+
+
+def test_compressed_text_columns_round_trip(db_session, sample_property):
+    """Description and photo columns are stored compressed and read back as text."""
+    photos = '["' + '", "'.join(f"https://pwm.im-cdn.it/image/{1143904616 + i}/xxl.jpg" for i in range(10)) + '"]'
+    sample_property.photo_list = photos
+    sample_property.discription_dk = ""
+    db_session.add(sample_property)
+    db_session.commit()
+
+    stored = db_session.connection().exec_driver_sql("SELECT typeof(photo_list), length(photo_list), typeof(discription_dk) FROM property").one()
+    assert stored[0] == "blob"
+    assert stored[1] < len(photos) / 4
+    # Empty values stay plain, so "untranslated" filters keep working
+    assert stored[2] == "text"
+    assert db_session.exec(select(Property.id).where(Property.discription_dk == "")).all() == [sample_property.id]
+
+    db_session.expire_all()
+    assert db_session.get(Property, sample_property.id).photo_list == photos
+
+
+def test_compress_existing_rows_converts_plain_text(db_session, sample_property):
+    """Rows written before compression are readable as-is and converted in place."""
+    from property_tracker.database.compression import COMPRESSED_COLUMNS, compress_existing_rows
+
+    db_session.add(sample_property)
+    db_session.commit()
+    text = "Casale in pietra con vista sulle colline, a pochi chilometri dal mare. " * 3
+    connection = db_session.connection()
+    connection.exec_driver_sql("UPDATE property SET discription = ?", (text,))
+
+    assert db_session.exec(select(Property.discription)).one() == text
+    assert compress_existing_rows(connection, "property", COMPRESSED_COLUMNS) >= 1
+    assert compress_existing_rows(connection, "property", COMPRESSED_COLUMNS) == 0
+    assert connection.exec_driver_sql("SELECT typeof(discription) FROM property").scalar() == "blob"
+    assert db_session.exec(select(Property.discription)).one() == text
+
+
+def test_property_photos_backfilled_and_removed_with_listing(db_engine, sample_property):
+    """ensure_photos fills an empty photo table; deleting a listing deletes its photos."""
+    import json
+
+    from property_tracker.database.photos import ensure_photos
+
+    sample_property.photo_list = json.dumps([f"https://pwm.im-cdn.it/image/{i}/xxl.jpg" for i in range(4)])
+    property_id = sample_property.id
+    with Session(db_engine) as session:
+        session.add(sample_property)
+        session.commit()
+
+    with db_engine.begin() as connection:
+        ensure_photos(connection)
+        ensure_photos(connection)
+        rows = connection.exec_driver_sql("SELECT ordinal, variant FROM property_photo ORDER BY ordinal").all()
+        assert rows == [(0, "xxl"), (1, "xxl"), (2, "xxl"), (3, "xxl")]
+
+        connection.exec_driver_sql(f"DELETE FROM property WHERE id = {property_id}")
+        assert connection.exec_driver_sql("SELECT COUNT(*) FROM property_photo").scalar() == 0
+
+
+def _fill_shards(shard_dir, properties):
+    """Write properties into the shard of their region."""
+    from property_tracker.database.shards import create_shard
+
+    engines = {}
+    for prop in properties:
+        engine = engines.setdefault(prop.region, create_shard(prop.region, shard_dir))
+        with Session(engine, expire_on_commit=False) as session:
+            session.add(prop)
+            session.commit()
+    for engine in engines.values():
+        engine.dispose()
+
+
+def test_shard_federation_unions_and_routes_regions(tmp_path, sample_properties_list):
+    """The federation reads all shards as one table, or a single region's shard."""
+    from property_tracker.database.shards import ShardFederation, list_shards
+
+    _fill_shards(tmp_path, sample_properties_list)
+    assert set(list_shards(tmp_path)) == {prop.region.lower() for prop in sample_properties_list}
+
+    federation = ShardFederation(tmp_path)
+    with federation.engine.connect() as connection:
+        every = federation.repository(connection).fetch_rows(("id", "region", "discription"), active_only=False)
+        tuscany = federation.repository(connection, region="TUSCANY").fetch_df(("id", "price"), active_only=False)
+    federation.dispose()
+
+    assert sorted(row.id for row in every) == sorted(prop.id for prop in sample_properties_list)
+    assert {row.discription for row in every} == {prop.discription for prop in sample_properties_list}
+    assert tuscany["id"].tolist() == [prop.id for prop in sample_properties_list if prop.region == "TUSCANY"]
+
+
+def test_merge_shards_keeps_review_columns(tmp_path, db_engine, sample_property):
+    """Merging refreshes listing columns but not the review state of the main database."""
+    from sqlmodel import create_engine
+
+    from property_tracker.database.shards import merge_shards
+    from property_tracker.services.photos import PhotoService
+
+    property_id = sample_property.id
+    with Session(db_engine) as session:
+        session.add(
+            Property(
+                **{
+                    **sample_property.model_dump(),
+                    "review_status": "Interested",
+                    "notes": "Call agent",
+                    "price": 250000,
+                    "sold": 1,
+                    "sold_date": "2020-01-01",
+                }
+            )
+        )
+        session.commit()
+
+    shard_dir = tmp_path / "shards"
+    photos = '["https://pwm.im-cdn.it/image/1/xxl.jpg"]'
+    crawled = Property(**{**sample_property.model_dump(), "review_status": "To Review", "price": 199000, "discription_dk": "", "photo_list": photos})
+    new_listing = Property(**{**sample_property.model_dump(), "id": property_id + 1, "region": "LIGURIA"})
+    _fill_shards(shard_dir, [crawled, new_listing])
+    with Session(create_engine(f"sqlite:///{shard_dir / 'tuscany.db'}")) as session:
+        PhotoService(session).set_photos(property_id, photos)
+        session.commit()
+
+    assert merge_shards(db_engine, shard_dir) == {"liguria": 1, "tuscany": 1}
+    with Session(db_engine) as session:
+        merged = session.get(Property, property_id)
+        assert (merged.price, merged.review_status, merged.notes) == (199000, "Interested", "Call agent")
+        # Sold marking belongs to the main database, so sold_date survives the merge
+        assert (merged.sold, merged.sold_date) == (1, "2020-01-01")
+        assert merged.discription_dk == sample_property.discription_dk
+        assert session.get(Property, property_id + 1).region == "LIGURIA"
+        assert PhotoService(session).gallery(property_id) == ["https://pwm.im-cdn.it/image/1/xxl.jpg"]
+
+
+def test_prune_shards_drops_archived_listings(tmp_path, db_engine, sample_property):
+    """Archived listings leave the shards, so the next merge does not insert them again."""
+    from property_tracker.database.shards import merge_shards, prune_shards
+    from property_tracker.services.archive import ArchiveService
+
+    shard_dir = tmp_path / "shards"
+    _fill_shards(shard_dir, [Property(**sample_property.model_dump())])
+    merge_shards(db_engine, shard_dir)
+    with Session(db_engine) as session:
+        session.get(Property, sample_property.id).sold = 1
+        session.commit()
+        assert ArchiveService(session).archive_sold(0) == 1
+
+    assert prune_shards(db_engine, shard_dir) == {"tuscany": 1}
+    assert merge_shards(db_engine, shard_dir) == {"tuscany": 0}
+    with Session(db_engine) as session:
+        assert session.get(Property, sample_property.id) is None
+
+
+def test_slow_query_log_records_plan_and_call_site(db_engine, sample_properties_list, tmp_path):
+    """Logged statements carry their plan, parameter shape and call site, and are ranked by time."""
+    from property_tracker.database.querylog import disable_query_log, enable_query_log, read_query_log, summarize
+
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+
+    log_path = tmp_path / "slow.log"
+    enable_query_log(threshold_ms=0, path=log_path)
+    try:
+        with Session(db_engine) as session:
+            for _ in range(3):
+                session.exec(select(Property).where(Property.id.in_([1, 2]))).all()
+    finally:
+        disable_query_log()
+
+    records = [record for record in read_query_log(log_path) if "FROM property" in record["statement"]]
+    assert len(records) == 3
+    assert "IN (?, ...)" in records[0]["statement"]
+    assert records[0]["parameters"] == {"rows": 1, "types": ["int", "int"]}
+    assert any("property" in line for line in records[0]["plan"])
+    assert records[0]["call_site"].startswith("tests/unit/test_database.py:")
+
+    top = summarize(records)[0]
+    assert top["count"] == 3
+    assert top["p95_ms"] <= top["max_ms"] <= top["total_ms"]
+
+
+def test_run_maintenance_converts_then_vacuums_incrementally(tmp_path):
+    """The first run switches to incremental auto_vacuum; later runs release free pages within the budget."""
+    import sqlite3
+
+    from property_tracker.database.maintenance import run_maintenance
+
+    db_path = tmp_path / "maintained.db"
+    connection = sqlite3.connect(db_path)
+    connection.execute("CREATE TABLE listing (id INTEGER PRIMARY KEY, body TEXT)")
+    connection.executemany("INSERT INTO listing (body) VALUES (?)", [("x" * 2000,) for _ in range(500)])
+    connection.commit()
+    connection.close()
+
+    first = run_maintenance(db_path)
+    assert [step.status for step in first.steps] == ["ok", "ok", "skipped", "ok"]
+
+    connection = sqlite3.connect(db_path)
+    assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    connection.execute("DELETE FROM listing WHERE id > 50")
+    connection.commit()
+    connection.close()
+
+    second = run_maintenance(db_path)
+    vacuum = second.steps[1]
+    assert second.ok
+    assert vacuum.reclaimed_bytes > 500_000
+    assert vacuum.detail.endswith(", 0 left")
+    assert second.size_after < second.size_before
+
+    skipped = run_maintenance(db_path, budget_seconds=0)
+    assert {step.status for step in skipped.steps} == {"skipped"}
+
+
+def test_auto_vacuum_conversion_is_not_cut_off_by_the_deadline(tmp_path):
+    """The one-off conversion VACUUM completes even when the budget has run out."""
+    import sqlite3
+    import time
+
+    from property_tracker.database.maintenance import _limit_to, _vacuum
+
+    db_path = tmp_path / "large.db"
+    connection = sqlite3.connect(db_path, isolation_level=None)
+    connection.execute("CREATE TABLE listing (id INTEGER PRIMARY KEY, body TEXT)")
+    connection.executemany("INSERT INTO listing (body) VALUES (?)", [("x" * 2000,) for _ in range(500)])
+
+    deadline = time.monotonic() - 1
+    _limit_to(connection, deadline)
+    assert _vacuum(connection, deadline, db_path).startswith("converted")
+    assert connection.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+    # The deadline applies again afterwards
+    with pytest.raises(sqlite3.OperationalError):
+        connection.execute("SELECT COUNT(*) FROM listing a, listing b").fetchone()
+    connection.close()
@@ -183,3 +183,15 @@ def test_property_with_sold_flag():
     )
 
     assert prop.sold == 1
+
+
+def test_property_import_leaves_geometry_and_database_hooks_unloaded():
+    """Importing the model loads neither the geometry stack nor the database hooks."""
+    import subprocess
+    import sys
+
+    modules = ["pyproj", "shapely", "property_tracker.database.rtree", "property_tracker.database.querylog"]
+    code = f"import sys, property_tracker.models.property; print([m for m in {modules!r} if m in sys.modules])"
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+    assert result.stdout.strip() == "[]"
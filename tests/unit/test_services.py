@@ -45,6 +45,15 @@ def test_review_service_update_status_invalid_id(db_session):
     assert success is True
 
 
+def test_review_service_update_status_unknown_status(populated_db_session):
+    """A status outside REVIEW_STATUSES is still written, as before the review log; it is just not logged."""
+    service = ReviewService(populated_db_session)
+
+    assert service.update_status(1, "Maybe") is True
+    assert populated_db_session.get(Property, 1).review_status == "Maybe"
+    assert _events(populated_db_session) == []
+
+
 def test_review_service_get_status_counts(populated_db_session):
     """Test getting status counts."""
     service = ReviewService(populated_db_session)
@@ -73,7 +82,7 @@ def test_review_service_get_properties_by_status(populated_db_session):
     # Get "To Review" properties
     to_review = service.get_properties_by_status("To Review")
     assert len(to_review) == 2
-    assert all(p.review_status == "To Review" for p in to_review)
+    assert all(isinstance(p, Property) and p.review_status == "To Review" for p in to_review)
 
     # Get "Interested" properties
     interested = service.get_properties_by_status("Interested")
@@ -109,6 +118,17 @@ def test_review_service_get_properties_with_limit(populated_db_session):
     assert len(results) == 2
 
 
+def test_review_service_get_property_rows_by_status(populated_db_session):
+    """The row variant applies the same filters without building ORM objects."""
+    service = ReviewService(populated_db_session)
+
+    rows = service.get_property_rows_by_status("To Review", "TUSCANY", columns=["id", "review_status"])
+
+    assert sorted(row.id for row in rows) == sorted(p.id for p in service.get_properties_by_status("To Review", "TUSCANY"))
+    assert not any(isinstance(row, Property) for row in rows)
+    assert rows[0]._fields == ("id", "review_status")
+
+
 def test_review_service_bulk_update_status(populated_db_session):
     """Test bulk status updates."""
     service = ReviewService(populated_db_session)
@@ -238,3 +258,787 @@ def test_poi_service_fetch_pois():
     assert isinstance(pois, dict)
     # Should have counts for different POI types
     assert "shopping_count" in pois or len(pois) >= 0
+
+
+# ============================================================================
+# SpatialService Tests
+# ============================================================================
+
+
+def _located_property(property_id: int, lat: float, lon: float, sold: int = 0) -> Property:
+    return Property(
+        id=property_id,
+        region="TEST",
+        category="Residenziale",
+        latitude=str(lat),
+        longitude=str(lon),
+        sold=sold,
+        discription="Test",
+        discription_dk="Test",
+        photo_list="[]",
+    )
+
+
+@pytest.fixture
+def located_db_session(db_session):
+    """Session with properties around Lucca, Florence and Venice."""
+    db_session.add_all(
+        [
+            _located_property(1, 43.8438, 10.5077),  # Lucca
+            _located_property(2, 43.8667, 10.2500),  # Viareggio (~21 km from Lucca)
+            _located_property(3, 43.7696, 11.2558),  # Florence (~61 km from Lucca)
+            _located_property(4, 45.4408, 12.3155),  # Venice
+            _located_property(5, 43.8440, 10.5080, sold=1),  # Sold, next door to Lucca
+        ]
+    )
+    db_session.commit()
+    return db_session
+
+
+def test_spatial_service_properties_in_bbox(located_db_session):
+    """Bounding box query returns only unsold properties inside the box."""
+    from property_tracker.services.spatial import SpatialService
+
+    service = SpatialService(located_db_session)
+    results = service.properties_in_bbox(43.5, 44.0, 10.0, 11.5)
+
+    assert {p.id for p in results} == {1, 2, 3}
+
+
+def test_spatial_service_properties_in_bbox_include_sold(located_db_session):
+    """Sold properties are returned only when requested."""
+    from property_tracker.services.spatial import SpatialService
+
+    service = SpatialService(located_db_session)
+    results = service.properties_in_bbox(43.8, 43.9, 10.4, 10.6, include_sold=True)
+
+    assert {p.id for p in results} == {1, 5}
+
+
+def test_spatial_service_within_km_include_sold(located_db_session):
+    """Sold properties are returned only when requested."""
+    from property_tracker.services.spatial import SpatialService
+
+    service = SpatialService(located_db_session)
+
+    assert [p.id for p, _ in service.properties_within_km(43.8438, 10.5077, 1)] == [1]
+    assert [p.id for p, _ in service.properties_within_km(43.8438, 10.5077, 1, include_sold=True)] == [1, 5]
+
+
+def test_spatial_service_properties_within_km(located_db_session):
+    """Radius query refines the bbox with exact haversine distances, nearest first."""
+    from property_tracker.services.spatial import SpatialService
+
+    service = SpatialService(located_db_session)
+    results = service.properties_within_km(43.8438, 10.5077, 30)
+
+    assert [p.id for p, _ in results] == [1, 2]
+    assert results[0][1] == pytest.approx(0.0, abs=1e-6)
+    assert 20 < results[1][1] < 22
+
+
+def test_spatial_service_ids_within_km(located_db_session):
+    """The ID-only radius query matches the ORM one."""
+    from property_tracker.services.spatial import SpatialService
+
+    service = SpatialService(located_db_session)
+    ids = service.ids_within_km(43.8438, 10.5077, 30)
+
+    assert ids == [(p.id, dist) for p, dist in service.properties_within_km(43.8438, 10.5077, 30)]
+
+
+def test_spatial_service_within_km_subquery_feeds_repository(located_db_session):
+    """The radius subquery can be read as a repository table, with its distances."""
+    from property_tracker.database.repository import PropertyRepository
+    from property_tracker.services.spatial import SpatialService
+
+    service = SpatialService(located_db_session)
+    within = service.within_km_subquery(43.8438, 10.5077, 30)
+    df = PropertyRepository(located_db_session, table=within).fetch_df(["id", "price", "latitude", "distance_km"])
+
+    assert dict(zip(df["id"], df["distance_km"], strict=True)) == pytest.approx(dict(service.ids_within_km(43.8438, 10.5077, 30)))
+    assert df["distance_km"].dtype == "float64"
+    assert df["latitude"].dtype == "float64"
+
+
+def test_spatial_service_reflects_coordinate_updates(located_db_session):
+    """Moving a property updates its position in the index."""
+    from property_tracker.services.spatial import SpatialService
+
+    venice = located_db_session.get(Property, 4)
+    venice.latitude = "43.85"
+    venice.longitude = "10.51"
+    located_db_session.commit()
+
+    service = SpatialService(located_db_session)
+    results = service.properties_within_km(43.8438, 10.5077, 5)
+
+    assert {p.id for p, _ in results} == {1, 4}
+
+
+# ============================================================================
+# SummaryService Tests
+# ============================================================================
+
+
+def test_summary_service_get_regions(populated_db_session):
+    """Regions come from the cube, sorted and distinct."""
+    from property_tracker.services.summary import SummaryService
+
+    service = SummaryService(populated_db_session)
+    assert service.get_regions() == ["LOMBARDY", "TUSCANY", "VENETO"]
+
+
+def test_summary_service_status_counts_by_region(populated_db_session):
+    """Status counts can be restricted to one region."""
+    from property_tracker.services.summary import SummaryService
+
+    service = SummaryService(populated_db_session)
+    counts = service.get_status_counts(region="TUSCANY")
+
+    assert counts == {"To Review": 2, "Interested": 0, "Rejected": 0}
+
+
+def test_summary_service_price_distribution(populated_db_session):
+    """Prices are bucketed into 25k bands."""
+    from property_tracker.services.summary import SummaryService, price_bucket_label
+
+    service = SummaryService(populated_db_session)
+    distribution = service.get_price_distribution()
+
+    assert distribution == {175000: 1, 200000: 1, 350000: 1, 450000: 1}
+    assert price_bucket_label(175000) == "€175k-200k"
+    assert service.get_average_price() == pytest.approx(295000)
+    assert service.get_average_price(region="TUSCANY") == pytest.approx(325000)
+
+
+def test_summary_service_rooms_distribution(db_session):
+    """Room counts stored as text are bucketed, with unknowns kept apart."""
+    from property_tracker.services.summary import SummaryService, rooms_bucket_label
+
+    for property_id, rooms in [(1, "4"), (2, "5+"), (3, None), (4, "4")]:
+        db_session.add(Property(id=property_id, region="TEST", category="R", rooms=rooms, discription="", discription_dk="", photo_list="[]"))
+    db_session.commit()
+
+    distribution = SummaryService(db_session).get_rooms_distribution()
+
+    assert distribution == {-1: 1, 4: 2, 5: 1}
+    assert rooms_bucket_label(-1) == "Unknown"
+    assert rooms_bucket_label(12) == "12+"
+
+
+def test_summary_cube_tracks_updates_and_deletes(populated_db_session):
+    """Status changes, sales and deletes move counts between cells."""
+    from property_tracker.services.summary import SummaryService
+
+    service = SummaryService(populated_db_session)
+    ReviewService(populated_db_session).update_status(1, "Interested")
+
+    prop4 = populated_db_session.get(Property, 4)
+    prop4.sold = 1
+    populated_db_session.delete(populated_db_session.get(Property, 3))
+    populated_db_session.commit()
+
+    assert service.get_status_counts() == {"To Review": 0, "Interested": 2, "Rejected": 0}
+    assert service.get_regions() == ["LOMBARDY", "TUSCANY"]
+
+
+# ============================================================================
+# ChangeFeedService Tests
+# ============================================================================
+
+
+def test_change_feed_changed_ids_since(populated_db_session):
+    """Only properties written after a version are reported."""
+    from property_tracker.services.changes import ChangeFeedService
+
+    feed = ChangeFeedService(populated_db_session)
+    version = feed.current_version()
+    assert feed.changed_ids_since(version) == (version, set())
+
+    ReviewService(populated_db_session).update_status(2, "Rejected")
+    ReviewService(populated_db_session).update_status(3, "Rejected")
+
+    new_version, changed = feed.changed_ids_since(version)
+    assert changed == {2, 3}
+    assert new_version == feed.current_version() == version + 2
+    assert [c.property_id for c in feed.changes_since(version)] == [2, 3]
+
+
+def test_change_feed_prune_keeps_latest_entry(populated_db_session):
+    """Pruning drops old entries and makes older versions uncovered."""
+    from property_tracker.services.changes import ChangeFeedService
+
+    feed = ChangeFeedService(populated_db_session)
+    latest = feed.current_version()
+
+    assert feed.covers(0)
+    assert feed.prune(latest) == latest - 1
+    assert feed.current_version() == latest
+    assert not feed.covers(0)
+    assert feed.covers(latest - 1)
+
+
+def test_apply_changes_replaces_and_drops_rows(populated_db_session):
+    """Changed rows are re-read; sold rows leave the active frame."""
+    from property_tracker.database.snapshot import fetch_listing_frame
+    from property_tracker.services.changes import ChangeFeedService, apply_changes
+
+    version = ChangeFeedService(populated_db_session).current_version()
+    df = fetch_listing_frame(populated_db_session.connection(), [1, 2, 3, 4])
+
+    ReviewService(populated_db_session).update_status(2, "Rejected")
+    populated_db_session.get(Property, 3).sold = 1
+    populated_db_session.commit()
+
+    df, new_version = apply_changes(df, populated_db_session, version)
+
+    assert new_version == ChangeFeedService(populated_db_session).current_version()
+    assert sorted(df["id"]) == [1, 2, 4]
+    assert df.loc[df["id"] == 2, "review_status"].iloc[0] == "Rejected"
+
+
+def test_apply_changes_requires_reload_after_prune(populated_db_session):
+    """A frame older than the pruned feed must be reloaded from scratch."""
+    from property_tracker.database.snapshot import fetch_listing_frame
+    from property_tracker.services.changes import ChangeFeedService, apply_changes
+
+    df = fetch_listing_frame(populated_db_session.connection(), [1, 2, 3, 4])
+    ReviewService(populated_db_session).update_status(2, "Rejected")
+    feed = ChangeFeedService(populated_db_session)
+    feed.prune(feed.current_version())
+
+    assert apply_changes(df, populated_db_session, 0) is None
+
+
+# ============================================================================
+# ArchiveService Tests
+# ============================================================================
+
+
+def _sell(session, property_id: int, sold_date: str) -> None:
+    """Mark a property sold on a given date."""
+    prop = session.get(Property, property_id)
+    prop.sold = 1
+    session.commit()
+    prop.sold_date = sold_date
+    session.commit()
+
+
+def test_archive_service_moves_old_sold_listings(populated_db_session):
+    """Only listings sold before the cutoff leave the hot table, in batches."""
+    from datetime import date, timedelta
+
+    from property_tracker.database.compression import decompress_value
+    from property_tracker.services.archive import ArchiveService
+
+    long_ago = (date.today() - timedelta(days=200)).isoformat()
+    description = "Casa indipendente con giardino privato e vista sulle colline. " * 5
+    populated_db_session.get(Property, 3).discription = description
+    _sell(populated_db_session, 1, long_ago)
+    _sell(populated_db_session, 3, long_ago)
+    _sell(populated_db_session, 4, date.today().isoformat())
+
+    service = ArchiveService(populated_db_session)
+    assert service.archive_sold(older_than_days=90, batch_size=1) == 2
+
+    assert populated_db_session.get(Property, 1) is None
+    assert populated_db_session.get(Property, 4) is not None
+    assert service.get_counts() == {"hot": 2, "archived": 2}
+
+    archived = service.get_archived(1)
+    assert archived["discription"] == "Property 1"
+    assert archived["photo_list"] == "[]"
+    assert archived["sold_date"] == long_ago
+    assert service.get_archived(2) is None
+
+    # Archived text is stored in the CompressedText format of the hot table
+    stored = populated_db_session.connection().exec_driver_sql("SELECT discription FROM property_archive WHERE id = 3").scalar_one()
+    assert isinstance(stored, bytes) and decompress_value(stored) == description
+    assert service.get_archived(3)["discription"] == description
+
+
+def test_archive_service_history_spans_hot_and_archive(populated_db_session):
+    """History queries return hot and archived listings with an archived flag."""
+    from datetime import date, timedelta
+
+    from property_tracker.services.archive import ArchiveService
+
+    _sell(populated_db_session, 1, (date.today() - timedelta(days=200)).isoformat())
+    service = ArchiveService(populated_db_session)
+    service.archive_sold(older_than_days=90)
+
+    history = service.get_history(region="TUSCANY", columns=["id", "price"])
+    assert {(row["id"], row["archived"]) for row in history} == {(1, 1), (4, 0)}
+    assert {row["price"] for row in history} == {200000, 450000}
+    assert len(service.get_history()) == 4
+
+
+# ============================================================================
+# ReviewWriteQueue Tests
+# ============================================================================
+
+
+@pytest.fixture
+def queue_db_engine(db_engine, sample_properties_list):
+    """Engine over a database holding the sample properties."""
+    from sqlmodel import Session
+
+    with Session(db_engine) as session:
+        session.add_all(sample_properties_list)
+        session.commit()
+    return db_engine
+
+
+def _review_columns(engine, property_id: int) -> tuple:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("SELECT review_status, favorite, notes FROM property WHERE id = ?", (property_id,)).one()
+
+
+def test_write_queue_coalesces_writes_into_one_batch(queue_db_engine):
+    """Repeated writes to a property collapse to the latest values."""
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    flushed = []
+    queue = ReviewWriteQueue(queue_db_engine, flush_interval=None, on_flush=flushed.append)
+    queue.update_status(1, "Interested")
+    queue.update_status(1, "Rejected")
+    queue.submit(1, favorite=1)
+    queue.submit(2, notes="Call agent")
+
+    assert queue.pending()[1]["review_status"] == "Rejected"
+    assert _review_columns(queue_db_engine, 1)[0] == "To Review"
+
+    assert queue.flush() == 2
+    assert flushed == [[1, 2]]
+    assert queue.pending() == {}
+    assert _review_columns(queue_db_engine, 1) == ("Rejected", 1, None)
+    assert _review_columns(queue_db_engine, 2) == ("Interested", 0, "Call agent")
+    queue.close()
+
+
+def test_write_queue_rejects_non_review_columns(queue_db_engine):
+    """Only review and interaction columns can be queued."""
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    queue = ReviewWriteQueue(queue_db_engine, flush_interval=None)
+    with pytest.raises(ValueError, match="price"):
+        queue.submit(1, price=1)
+    queue.close()
+
+
+def test_write_queue_retries_while_database_is_locked(test_db_path, queue_db_engine, tmp_path):
+    """A locked database leaves the batch queued and journaled for the next flush."""
+    from sqlmodel import create_engine
+
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    engine = create_engine(f"sqlite:///{test_db_path}", connect_args={"timeout": 0.05})
+    journal = tmp_path / "test.writes.jsonl"
+    queue = ReviewWriteQueue(engine, journal_path=journal, flush_interval=None)
+    queue.update_status(3, "Interested")
+
+    blocker = queue_db_engine.raw_connection()
+    blocker.execute("BEGIN IMMEDIATE")
+    try:
+        assert queue.flush() == 0
+    finally:
+        blocker.rollback()
+        blocker.close()
+
+    assert 3 in queue.pending()
+    assert journal.with_name(journal.name + ".flushing").exists()
+
+    assert queue.flush() == 1
+    assert _review_columns(engine, 3)[0] == "Interested"
+    assert not journal.with_name(journal.name + ".flushing").exists()
+    queue.close()
+    engine.dispose()
+
+
+def test_write_queue_keeps_batch_after_unexpected_error(queue_db_engine, monkeypatch):
+    """Any failure while writing puts the batch back; a failing callback does not undo a write."""
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    def fail_write(*args):
+        raise TypeError("unexpected")
+
+    def fail_callback(property_ids):
+        raise RuntimeError("callback failed")
+
+    queue = ReviewWriteQueue(queue_db_engine, flush_interval=None, on_flush=fail_callback)
+    queue.update_status(3, "Interested")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(queue, "_write", fail_write)
+        assert queue.flush() == 0
+    assert queue.pending()[3]["review_status"] == "Interested"
+
+    assert queue.flush() == 1
+    assert queue.pending() == {}
+    assert _review_columns(queue_db_engine, 3)[0] == "Interested"
+    queue.close()
+
+
+def test_write_queue_replays_journal_after_crash(queue_db_engine, tmp_path):
+    """Journaled writes from a crashed process are written by the next queue."""
+    import json
+
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    journal = tmp_path / "test.writes.jsonl"
+    entries = [{"id": 4, "values": {"review_status": "Rejected"}}, {"id": 4, "values": {"hidden": 1}}]
+    # The torn last line was never acknowledged and is skipped
+    journal.write_text("".join(json.dumps(entry) + "\n" for entry in entries) + '{"id": 4, "val', encoding="utf-8")
+
+    queue = ReviewWriteQueue(queue_db_engine, journal_path=journal, flush_interval=None)
+    assert queue.pending() == {4: {"review_status": "Rejected", "hidden": 1}}
+    queue.close()
+
+    assert _review_columns(queue_db_engine, 4)[0] == "Rejected"
+    assert not journal.exists()
+
+
+def test_write_queue_background_flush_and_close(queue_db_engine):
+    """The flush thread writes queued values; close() flushes the rest."""
+    import time
+
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    queue = ReviewWriteQueue(queue_db_engine, flush_interval=0.01)
+    queue.update_status(1, "Interested")
+    deadline = time.monotonic() + 2
+    while queue.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert _review_columns(queue_db_engine, 1)[0] == "Interested"
+
+    queue.submit(2, favorite=1)
+    queue.close()
+    assert _review_columns(queue_db_engine, 2)[1] == 1
+    with pytest.raises(RuntimeError):
+        queue.submit(2, favorite=0)
+
+
+# ============================================================================
+# Optimistic Concurrency Tests
+# ============================================================================
+
+
+def _row_version(engine, property_id: int) -> int:
+    with engine.connect() as connection:
+        return connection.exec_driver_sql("SELECT row_version FROM property WHERE id = ?", (property_id,)).scalar_one()
+
+
+def test_review_service_conditional_update_detects_conflict(queue_db_engine):
+    """A write based on a stale row_version is refused; changed rows are found by version."""
+    from sqlmodel import Session
+
+    from property_tracker.services.review import ReviewService, VersionConflictError
+
+    seen = _row_version(queue_db_engine, 1)
+    with Session(queue_db_engine) as session:
+        service = ReviewService(session)
+        before = service.current_version()
+        version = service.update_status_if_unchanged(1, "Interested", seen, actor="a")
+        assert version > seen
+        assert version == _row_version(queue_db_engine, 1) == service.current_version()
+
+        with pytest.raises(VersionConflictError) as conflict:
+            service.update_status_if_unchanged(1, "Rejected", seen, actor="b")
+        assert (conflict.value.expected_version, conflict.value.current_version) == (seen, version)
+
+        latest, rows = service.get_changed_since(before, columns=["review_status"])
+        assert latest == version
+        assert [(row.id, row.review_status) for row in rows] == [(1, "Interested")]
+        assert service.get_changed_since(latest) == (latest, [])
+
+
+def test_review_service_conditional_updates_under_thread_contention(queue_db_engine):
+    """Of many sessions writing from the same version, exactly one wins; retrying on conflict serialises the rest."""
+    import threading
+
+    from sqlmodel import Session
+
+    from property_tracker.services.review import ReviewService, VersionConflictError
+
+    threads_count = 12
+    seen = _row_version(queue_db_engine, 1)
+    barrier = threading.Barrier(threads_count)
+    outcomes = []
+
+    def race(index: int) -> None:
+        with Session(queue_db_engine) as session:
+            barrier.wait()
+            try:
+                ReviewService(session).update_status_if_unchanged(1, "Interested" if index % 2 else "Rejected", seen, actor=f"s{index}")
+                outcomes.append("won")
+            except VersionConflictError:
+                outcomes.append("conflict")
+
+    threads = [threading.Thread(target=race, args=(i,)) for i in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sorted(outcomes) == ["conflict"] * (threads_count - 1) + ["won"]
+
+    def retry(index: int) -> None:
+        with Session(queue_db_engine) as session:
+            service = ReviewService(session)
+            barrier.wait()
+            while True:
+                version = _row_version(queue_db_engine, 2)
+                try:
+                    service.update_status_if_unchanged(2, "Interested" if index % 2 else "Rejected", version, actor=f"s{index}")
+                    return
+                except VersionConflictError:
+                    continue
+
+    before = _row_version(queue_db_engine, 2)
+    threads = [threading.Thread(target=retry, args=(i,)) for i in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    with queue_db_engine.connect() as connection:
+        updates = connection.exec_driver_sql("SELECT COUNT(*) FROM property_change WHERE property_id = 2 AND version > ?", (before,)).scalar_one()
+    # Every thread got its write in; a write of the status already there changes nothing
+    assert 1 <= updates <= threads_count
+    assert _row_version(queue_db_engine, 2) > before
+
+
+def test_write_queue_drops_writes_from_stale_sessions(queue_db_engine):
+    """Conditional queued writes lose to other sessions' changes and are reported to their session only."""
+    from sqlmodel import Session
+
+    from property_tracker.services.review import ReviewService
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    queue = ReviewWriteQueue(queue_db_engine, flush_interval=None)
+    seen = _row_version(queue_db_engine, 1)
+    assert queue.update_status(1, "Interested", actor="a", expected_version=seen)
+    assert not queue.update_status(1, "Rejected", actor="b", expected_version=seen)
+    assert queue.take_conflicts("b") == {1: None}
+    assert queue.flush() == 1
+    assert _review_columns(queue_db_engine, 1)[0] == "Interested"
+
+    # Session a has not reloaded yet: its own write does not count as a conflict
+    assert queue.submit(1, actor="a", expected_version=seen, favorite=1)
+    assert queue.flush() == 1
+
+    # Another writer changes the row; a's next write from its stale view is dropped
+    with Session(queue_db_engine) as session:
+        current = ReviewService(session).update_status_if_unchanged(1, "Rejected", _row_version(queue_db_engine, 1))
+    assert queue.update_status(1, "To Review", actor="a", expected_version=seen)
+    assert queue.flush() == 0
+    assert queue.take_conflicts("a") == {1: current}
+    assert queue.take_conflicts("a") == {}
+    assert _review_columns(queue_db_engine, 1) == ("Rejected", 1, None)
+    queue.close()
+
+
+# ============================================================================
+# ReviewLogService Tests
+# ============================================================================
+
+
+def _events(session):
+    from sqlmodel import select
+
+    from property_tracker.models.review_event import ReviewEvent
+
+    return session.exec(select(ReviewEvent).order_by(ReviewEvent.id)).all()
+
+
+def test_review_log_records_status_changes(populated_db_session):
+    """Status updates append integer-coded events; no-op updates do not."""
+    from property_tracker.models.review_event import FIELD_REVIEW_STATUS
+
+    service = ReviewService(populated_db_session)
+    service.update_status(1, "Interested", actor="alice")
+    service.update_status(1, "Interested", actor="alice")
+    service.bulk_update_status([3, 4], "Rejected")  # Property 3 is already rejected
+
+    events = _events(populated_db_session)
+    assert [(e.property_id, e.field, e.old_value, e.new_value, e.actor) for e in events] == [
+        (1, FIELD_REVIEW_STATUS, 0, 1, "alice"),
+        (4, FIELD_REVIEW_STATUS, 0, 2, None),
+    ]
+
+
+def test_review_log_records_every_queued_click(queue_db_engine):
+    """Coalesced queue writes still log each click, chained in order."""
+    from sqlmodel import Session
+
+    from property_tracker.models.review_event import FIELD_FAVORITE, FIELD_NOTES
+    from property_tracker.services.write_queue import ReviewWriteQueue
+
+    queue = ReviewWriteQueue(queue_db_engine, flush_interval=None)
+    queue.update_status(1, "Interested", actor="bob")
+    queue.update_status(1, "Rejected", actor="bob")
+    queue.submit(1, actor="bob", favorite=1, notes="Nice garden")
+    queue.close()
+
+    with Session(queue_db_engine) as session:
+        events = _events(session)
+    assert [(e.old_value, e.new_value) for e in events[:2]] == [(0, 1), (1, 2)]
+    assert {(e.field, e.new_value, e.new_text) for e in events[2:]} == {(FIELD_FAVORITE, 1, None), (FIELD_NOTES, None, "Nice garden")}
+
+
+def test_review_log_undo_last_actions(populated_db_session):
+    """Undo restores old values for one actor and is itself logged."""
+    from sqlmodel import select
+
+    from property_tracker.services.review_log import ReviewLogService
+
+    service = ReviewService(populated_db_session)
+    service.update_status(1, "Interested", actor="alice")
+    service.update_status(1, "Rejected", actor="alice")
+    service.update_status(4, "Interested", actor="carol")
+    service.update_status(3, "To Review", actor="alice")
+
+    log = ReviewLogService(populated_db_session)
+    assert log.undo_last(2, actor="alice") == [3, 1]
+
+    status = {p.id: p.review_status for p in populated_db_session.exec(select(Property)).all()}
+    assert status == {1: "Interested", 2: "Interested", 3: "Rejected", 4: "Interested"}
+
+    # Undone actions are not undone twice; the next undo reaches further back
+    assert log.undo_last(1, actor="alice") == [1]
+    populated_db_session.expire_all()
+    assert populated_db_session.get(Property, 1).review_status == "To Review"
+    assert log.undo_last(5, actor="alice") == []
+
+
+def test_review_log_undo_restores_an_uncoded_status(populated_db_session):
+    """Undoing a change away from a status outside REVIEW_STATUSES puts that status back."""
+    from sqlmodel import text
+
+    from property_tracker.services.review_log import ReviewLogService
+
+    populated_db_session.get(Property, 1).review_status = "Legacy"
+    populated_db_session.commit()
+    ReviewService(populated_db_session).update_status(1, "Interested", actor="alice")
+
+    log = ReviewLogService(populated_db_session)
+    assert log.undo_last(1, actor="alice") == [1]
+    populated_db_session.expire_all()
+    assert populated_db_session.get(Property, 1).review_status == "Legacy"
+
+    # Rebuilding from the log keeps it too
+    log.rebuild_property_columns()
+    populated_db_session.expire_all()
+    assert populated_db_session.get(Property, 1).review_status == "Legacy"
+
+    # An event logged before the old status was kept has nothing to restore and is not undone
+    ReviewService(populated_db_session).update_status(1, "Rejected", actor="alice")
+    populated_db_session.exec(text("UPDATE review_event SET old_text = NULL WHERE reverts IS NULL AND new_value = 2"))
+    populated_db_session.commit()
+    assert log.undo_last(1, actor="alice") == []
+    assert populated_db_session.get(Property, 1).review_status == "Rejected"
+
+
+def test_review_log_throughput_replay_and_rebuild(populated_db_session):
+    """The log answers throughput and point-in-time queries and rebuilds the columns."""
+    import time
+
+    from sqlmodel import update
+
+    from property_tracker.services.review_log import ReviewLogService, now_ms
+
+    service = ReviewService(populated_db_session)
+    service.update_status(1, "Interested")
+    time.sleep(0.005)
+    checkpoint = now_ms()
+    time.sleep(0.005)
+    service.update_status(1, "Rejected")
+    service.update_status(4, "Interested")
+
+    log = ReviewLogService(populated_db_session)
+    [(_day, count)] = log.get_throughput()
+    assert count == 3
+    assert log.statuses_as_of(checkpoint) == {1: "Interested"}
+
+    # Clobber the columns, then rebuild them from the log
+    populated_db_session.execute(update(Property).values(review_status="To Review"))
+    populated_db_session.commit()
+    assert log.rebuild_property_columns() == 2
+
+    populated_db_session.expire_all()
+    assert populated_db_session.get(Property, 1).review_status == "Rejected"
+    assert populated_db_session.get(Property, 4).review_status == "Interested"
+    assert populated_db_session.get(Property, 2).review_status == "To Review"
+
+
+# ============================================================================
+# PhotoService Tests
+# ============================================================================
+
+
+def _photo_urls(first: int, count: int) -> list[str]:
+    """Immobiliare-style photo URLs."""
+    return [f"https://pwm.im-cdn.it/image/{first + i}/xxl.jpg" for i in range(count)]
+
+
+def test_photo_service_covers_and_gallery(populated_db_session):
+    """Covers come back for many listings at once; galleries keep listing order."""
+    import json
+
+    from property_tracker.services.photos import PhotoService
+
+    service = PhotoService(populated_db_session)
+    assert service.set_photos(1, json.dumps(_photo_urls(100, 3))) == 3
+    assert service.set_photos(2, _photo_urls(200, 2)) == 2
+    assert service.set_photos(3, "not json") == 0
+    populated_db_session.commit()
+
+    assert service.cover_photos([1, 2, 3]) == {1: _photo_urls(100, 1)[0], 2: _photo_urls(200, 1)[0]}
+    assert service.gallery(1) == _photo_urls(100, 3)
+    assert service.gallery(2, variant="xxs-c")[1] == "https://pwm.im-cdn.it/image/201/xxs-c.jpg"
+
+    # Re-ingesting replaces the gallery
+    service.set_photos(1, _photo_urls(300, 1))
+    populated_db_session.commit()
+    assert service.gallery(1) == _photo_urls(300, 1)
+
+
+# ============================================================================
+# DistanceMemoService Tests
+# ============================================================================
+
+
+def test_distance_memo_service_reuses_rounded_coordinates(db_engine):
+    """Repeated and nearby coordinates are answered from the memo; a new version recalculates."""
+    import numpy as np
+    from sqlmodel import Session, select
+
+    from property_tracker.models.distance_memo import DistanceMemo
+    from property_tracker.services.distance_memo import DistanceMemoService
+
+    DistanceMemo.__table__.create(db_engine, checkfirst=True)
+    calls = []
+
+    def calculate(lats, lons):
+        calls.append(len(lats))
+        return lats + lons
+
+    with Session(db_engine) as session:
+        memo = DistanceMemoService(session, decimals=3)
+        first = memo.distances("coast", "v1", [44.1, 44.2, np.nan], [10.1, 10.2, 10.0], calculate)
+        assert calls == [2]
+        assert first[:2] == pytest.approx([54.2, 54.4])
+        assert np.isnan(first[2])
+
+    with Session(db_engine) as session:
+        memo = DistanceMemoService(session, decimals=3)
+        # 44.10001 rounds to a stored key; 44.3 is new
+        again = memo.distances("coast", "v1", [44.10001, 44.2, 44.3], [10.1, 10.2, 10.3], calculate)
+        assert calls == [2, 1]
+        assert again == pytest.approx([54.2, 54.4, 54.6])
+        assert (memo.hits, memo.misses) == (2, 1)
+        assert memo.hit_rate == pytest.approx(2 / 3)
+
+        memo.distances("coast", "v2", [44.1], [10.1], calculate)
+        memo.distances("water", "v1", [44.1], [10.1], calculate)
+        assert calls == [2, 1, 1, 1]
+        assert len(session.exec(select(DistanceMemo)).all()) == 5
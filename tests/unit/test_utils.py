@@ -3,6 +3,8 @@
 Tests DistanceCalculator with lazy-loading and geospatial calculations.
 """
 
+import pytest
+
 from property_tracker.utils.distance import DistanceCalculator, get_calculator
 
 
@@ -160,3 +162,493 @@ def test_distance_calculator_performance():
 
     # Data only loads when needed (deferred cost)
     # This is the key performance improvement
+
+
+def test_haversine_km_known_distance(coordinates_italy):
+    """Haversine distance between Lucca and Florence is about 61 km."""
+    from property_tracker.utils.geodesy import haversine_km
+
+    lucca = coordinates_italy["lucca"]
+    florence = coordinates_italy["florence"]
+
+    assert 60 < haversine_km(lucca["lat"], lucca["lon"], florence["lat"], florence["lon"]) < 62
+    assert haversine_km(lucca["lat"], lucca["lon"], lucca["lat"], lucca["lon"]) == 0.0
+    assert haversine_km(None, lucca["lon"], florence["lat"], florence["lon"]) is None
+
+
+def test_initial_bearing_points_along_the_compass():
+    """Bearings run clockwise from north and are NaN for missing coordinates."""
+    import numpy as np
+
+    from property_tracker.utils.distance import initial_bearing
+
+    bearings = initial_bearing(
+        [44.0, 44.0, 44.0, 44.0, np.nan], [10.0, 10.0, 10.0, 10.0, 10.0], [45.0, 44.0, 43.0, 44.0, 44.0], [10.0, 11.0, 10.0, 9.0, 10.0]
+    )
+    np.testing.assert_allclose(bearings[:4], [0.0, 89.65, 180.0, 270.35], atol=0.01)
+    assert np.isnan(bearings[4])
+
+
+def test_calculate_coast_distances_are_metric(coordinates_italy):
+    """Coast distances are measured to the boundary in UTM metres, NaN for missing coordinates."""
+    import numpy as np
+    import shapely
+
+    calc = DistanceCalculator()
+    places = list(coordinates_italy.values())
+    lats = np.array([p["lat"] for p in places] + [np.nan])
+    lons = np.array([p["lon"] for p in places] + [10.0])
+
+    distances = calc.calculate_coast_distances(lats, lons)
+
+    # Reference: the whole boundary, densified further and projected to UTM, measured without the segment index
+    boundary_utm = shapely.transform(
+        shapely.segmentize(calc._coastline.boundary, 0.001), lambda xy: np.column_stack(calc._transformer.transform(xy[:, 0], xy[:, 1]))
+    )
+    for place, distance in zip(places, distances[:-1], strict=True):
+        x, y = calc._transformer.transform(place["lon"], place["lat"])
+        assert distance == pytest.approx(boundary_utm.distance(shapely.Point(x, y)) / 1000.0, abs=0.01)
+    assert np.isnan(distances[-1])
+    assert calc.calculate_coast_distance(lats[0], lons[0]) == pytest.approx(distances[0])
+
+
+def test_nearest_coast_points_lie_on_the_coast(coordinates_italy):
+    """The nearest coast point is on the boundary, at the reported distance from the query point."""
+    import numpy as np
+    import shapely
+
+    calc = DistanceCalculator()
+    places = list(coordinates_italy.values())
+    lats = np.array([p["lat"] for p in places] + [np.nan])
+    lons = np.array([p["lon"] for p in places] + [10.0])
+
+    distances, coast_lats, coast_lons = calc.nearest_coast_points(lats, lons)
+
+    np.testing.assert_allclose(distances, calc.calculate_coast_distances(lats, lons))
+    assert np.isnan(coast_lats[-1]) and np.isnan(coast_lons[-1])
+    for i in range(len(places)):
+        assert calc._coastline.boundary.distance(shapely.Point(coast_lons[i], coast_lats[i])) < 1e-6
+        (x1, x2), (y1, y2) = calc._transformer.transform([coast_lons[i], lons[i]], [coast_lats[i], lats[i]])
+        assert np.hypot(x2 - x1, y2 - y1) / 1000.0 == pytest.approx(distances[i], abs=1e-6)
+    assert calc.nearest_coast_point(lats[0], lons[0]) == pytest.approx((distances[0], coast_lats[0], coast_lons[0]))
+
+
+def test_calculate_many_water_distances(tmp_path, monkeypatch):
+    """Batch water distances come from the nearest projected line of the STRtree."""
+    import json
+
+    import numpy as np
+
+    from property_tracker.utils import distance as distance_module
+
+    water_path = tmp_path / "water.json"
+    features = [
+        {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[10.0, 44.0], [10.0, 45.0]]}},
+        {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[11.0, 44.0], [11.0, 45.0], [11.5, 45.5]]}},
+    ]
+    water_path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    monkeypatch.setattr(distance_module, "WATERLINES_PATH", water_path)
+
+    calc = DistanceCalculator()
+    coast, water = calc.calculate_many(np.array([44.5, 44.5, np.nan]), np.array([10.1, 10.9, 10.5]))
+
+    # ~0.1 degree of longitude at 44.5N is ~7.9 km
+    assert water[0] == pytest.approx(7.9, abs=0.2)
+    assert water[1] == pytest.approx(7.9, abs=0.2)
+    assert np.isnan(water[2]) and np.isnan(coast[2])
+    assert calc.calculate_water_distance(44.5, 10.1) == pytest.approx(water[0])
+    assert len(calc._water_lines) == 2
+
+
+def test_distance_raster_lookup_interpolates_and_refines(tmp_path, monkeypatch):
+    """Raster lookups match exact distances at grid points, stay close between them and are exact near the coast."""
+    import numpy as np
+
+    from property_tracker.utils import distance_raster
+    from property_tracker.utils.distance_raster import build_distance_raster, enricher_version, load_distance_raster, raster_distances
+
+    calc = DistanceCalculator()
+    box = (43.8, 44.2, 9.8, 10.4)  # Ligurian coast around La Spezia
+    path = build_distance_raster("coast", resolution_m=2000, box=box, raster_dir=tmp_path, calculator=calc)
+    raster = load_distance_raster("coast", tmp_path)
+    assert raster is not None and raster.path == path
+    assert load_distance_raster("coast", tmp_path) is raster
+    assert load_distance_raster("water", tmp_path) is None
+
+    meta = raster.meta
+    node_lats = meta["min_lat"] + np.arange(3) * meta["lat_step"]
+    node_lons = meta["min_lon"] + np.arange(3) * meta["lon_step"]
+    np.testing.assert_allclose(raster.lookup(node_lats, node_lons), calc.calculate_coast_distances(node_lats, node_lons), atol=1e-4)
+
+    rng = np.random.default_rng(0)
+    lats = rng.uniform(box[0], box[1], 500)
+    lons = rng.uniform(box[2], box[3], 500)
+    exact = calc.calculate_coast_distances(lats, lons)
+    # The distance field changes by at most the distance moved, so interpolation is off by under a grid cell
+    assert np.nanmax(np.abs(raster.lookup(lats, lons) - exact)) < 2.0
+
+    looked_up = raster_distances("coast", lats, lons, refine_km=3.0, raster_dir=tmp_path, calculator=calc)
+    near = exact < 2.0
+    assert near.any()
+    np.testing.assert_allclose(looked_up[near], exact[near])
+
+    # Outside the grid the exact calculation answers; missing coordinates stay NaN
+    outside = raster_distances("coast", [45.5, np.nan], [9.0, 10.0], raster_dir=tmp_path, calculator=calc)
+    assert outside[0] == pytest.approx(calc.calculate_coast_distance(45.5, 9.0))
+    assert np.isnan(outside[1])
+
+    # Once the boundary file changes, the raster no longer answers until it is rebuilt
+    assert enricher_version("coast", tmp_path).endswith(":raster-2000m")
+    changed = tmp_path / "coastline.json"
+    changed.write_text('{"type": "FeatureCollection", "features": []}')
+    monkeypatch.setitem(distance_raster.SOURCES, "coast", changed)
+    assert load_distance_raster("coast", tmp_path) is None
+    assert "raster" not in enricher_version("coast", tmp_path)
+
+
+def test_geometry_cache_rebuilds_when_source_changes(tmp_path):
+    """Cached arrays are reused while the source is unchanged and rebuilt when it or the parameters change."""
+    import numpy as np
+
+    from property_tracker.utils.geometry_cache import cache_path, load_geometry_arrays
+
+    source = tmp_path / "lines.json"
+    source.write_text('{"version": 1}')
+    builds = []
+
+    def build():
+        builds.append(source.read_text())
+        return {"vertices": np.arange(len(builds) * 4, dtype=float).reshape(-1, 2)}
+
+    first = load_geometry_arrays(source, build, cache_dir=tmp_path / "cache")
+    again = load_geometry_arrays(source, build, cache_dir=tmp_path / "cache")
+    assert len(builds) == 1
+    assert cache_path(source, tmp_path / "cache").exists()
+    np.testing.assert_array_equal(again["vertices"], first["vertices"])
+
+    source.write_text('{"version": 2}')
+    changed = load_geometry_arrays(source, build, cache_dir=tmp_path / "cache")
+    assert len(builds) == 2 and changed["vertices"].shape == (4, 2)
+
+    load_geometry_arrays(source, build, params="EPSG:32632", cache_dir=tmp_path / "cache")
+    assert len(builds) == 3
+
+
+def test_distance_calculator_reads_cached_coastline():
+    """A second calculator loads the coastline from the geometry cache with identical results."""
+    from property_tracker.config import settings
+    from property_tracker.config.settings import COASTLINE_PATH
+    from property_tracker.utils.geometry_cache import cache_path
+
+    first = DistanceCalculator()
+    distance = first.calculate_coast_distance(44.1, 9.9)
+    assert cache_path(COASTLINE_PATH).parent == settings.GEOMETRY_CACHE_DIR
+    assert cache_path(COASTLINE_PATH).exists()
+
+    second = DistanceCalculator()
+    second._parse_coastline = None  # Fails if the cache is not used
+    assert second.calculate_coast_distance(44.1, 9.9) == distance
+    assert second._coastline.equals(first._coastline)
+
+
+def test_backfill_writes_distances_in_chunks_and_resumes(db_engine, tmp_path):
+    """The backfill enriches located listings chunk by chunk, skips unchanged rows and resumes after the saved id."""
+    import json
+
+    from sqlmodel import Session, select
+
+    from property_tracker.models.property import Property
+    from property_tracker.utils.backfill import backfill
+    from property_tracker.utils.distance import initial_bearing
+    from property_tracker.utils.distance_raster import enricher_version
+
+    coordinates = {1: ("44.10", "9.90"), 2: ("45.46", "9.19"), 3: ("43.84", "10.51"), 4: ("abc", "10.0"), 5: (None, None), 6: ("44.49", "11.34")}
+    with Session(db_engine) as session:
+        for property_id, (lat, lon) in coordinates.items():
+            session.add(
+                Property(id=property_id, region="R", category="C", latitude=lat, longitude=lon, discription="", discription_dk="", photo_list="[]")
+            )
+        session.commit()
+
+    state_path = tmp_path / "test.backfill.json"
+    result = backfill(db_engine, workers=2, chunk_size=2, state_path=state_path)
+    assert result.complete and result.rows == 5 and result.updated == 4
+    assert not state_path.exists()
+
+    calc = DistanceCalculator()
+    with Session(db_engine) as session:
+        stored = {p.id: p for p in session.exec(select(Property))}
+    for property_id in (1, 2, 3, 6):
+        lat, lon = map(float, coordinates[property_id])
+        assert float(stored[property_id].dist_coast) == pytest.approx(round(calc.calculate_coast_distance(lat, lon), 2))
+        # The nearest coast point and bearing are stored with the distance
+        _, coast_lat, coast_lon = calc.nearest_coast_point(lat, lon)
+        assert (stored[property_id].coast_lat, stored[property_id].coast_lon) == pytest.approx((coast_lat, coast_lon), abs=1e-6)
+        assert stored[property_id].coast_bearing == pytest.approx(initial_bearing(lat, lon, coast_lat, coast_lon), abs=0.05)
+    assert stored[4].dist_coast is None and stored[5].dist_coast is None and stored[4].coast_lat is None
+
+    assert backfill(db_engine, workers=1, chunk_size=2, state_path=state_path).updated == 0
+
+    # Resume after id 3 of an interrupted run of the same enricher version
+    state_path.write_text(json.dumps({"versions": {"coast": enricher_version("coast", exact=True)}, "last_id": 3}))
+    resumed = backfill(db_engine, workers=1, chunk_size=2, state_path=state_path)
+    assert resumed.resumed_after == 3 and resumed.rows == 2 and resumed.last_id == 6
+
+
+def test_backfill_cli_migrates_an_old_database(tmp_path, monkeypatch):
+    """The backfill script adds the columns an old database lacks before writing them, and exits non-zero on failure."""
+    import importlib.util
+    import shutil
+    import sqlite3
+    import sys
+    from pathlib import Path
+
+    root = Path(__file__).resolve().parents[2]
+    spec = importlib.util.spec_from_file_location("backfill_distances", root / "utils" / "backfill_distances.py")
+    cli = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(cli)
+
+    # The committed test.db has the original schema, without coast points, comune or amenity columns
+    db_path = tmp_path / "old.db"
+    shutil.copyfile(root / "test.db", db_path)
+    with sqlite3.connect(db_path) as connection:
+        connection.execute(
+            "INSERT INTO property (id, region, category, discription, discription_dk, photo_list, latitude, longitude, sold, review_status) "
+            "VALUES (1, 'R', 'C', '', '', '[]', '44.10', '9.90', 0, 'To Review')"
+        )
+    monkeypatch.setattr(cli, "TEST_DATABASE_PATH", str(db_path))
+    monkeypatch.setattr(cli, "get_backfill_state_path", lambda use_test_db: tmp_path / "old.backfill.json")
+    monkeypatch.setattr(sys, "argv", ["backfill_distances.py", "--workers", "1"])
+
+    assert cli.main() == 0
+    with sqlite3.connect(db_path) as connection:
+        coast_lat, dist_coast = connection.execute("SELECT coast_lat, dist_coast FROM property WHERE id = 1").fetchone()
+    assert coast_lat is not None and dist_coast is not None
+
+    monkeypatch.setattr(cli, "TEST_DATABASE_PATH", str(tmp_path))  # A directory, not a database
+    assert cli.main() == 1
+
+
+def test_backfill_answers_water_distances_from_the_memo(db_engine, monkeypatch):
+    """Backfilled water distances come from the distance memo; only misses are calculated, at rounded coordinates."""
+    import numpy as np
+    from sqlmodel import Session, select
+
+    from property_tracker.models.distance_memo import DistanceMemo
+    from property_tracker.models.property import Property
+    from property_tracker.utils import backfill as backfill_module
+
+    calls = []
+
+    def water_distances(layer, lats, lons):
+        calls.append(len(lats))
+        return np.asarray(lats) + np.asarray(lons)
+
+    monkeypatch.setattr(backfill_module, "enrichers", lambda: {"water": "v1"})
+    monkeypatch.setattr(backfill_module, "_init_worker", lambda names: None)
+    monkeypatch.setattr(backfill_module, "raster_distances", water_distances)
+    DistanceMemo.__table__.create(db_engine, checkfirst=True)
+    with Session(db_engine) as session:
+        for property_id, (lat, lon) in enumerate([("44.10001", "9.9"), ("44.1", "9.9"), ("45.0", "10.0")], start=1):
+            session.add(
+                Property(id=property_id, region="R", category="C", latitude=lat, longitude=lon, discription="", discription_dk="", photo_list="[]")
+            )
+        session.commit()
+
+    first = backfill_module.backfill(db_engine, workers=1, memo=True)
+    assert (first.memo_hits, first.memo_misses) == (0, 3) and calls == [3]
+    with Session(db_engine) as session:
+        assert {p.id: float(p.dist_water) for p in session.exec(select(Property))} == {1: 54.0, 2: 54.0, 3: 55.0}
+        assert len(session.exec(select(DistanceMemo)).all()) == 2
+
+    again = backfill_module.backfill(db_engine, workers=1, memo=True)
+    assert (again.memo_hits, again.memo_misses) == (3, 0) and calls == [3]
+
+    bypassed = backfill_module.backfill(db_engine, workers=1, memo=False)
+    assert (bypassed.memo_hits, bypassed.memo_misses) == (0, 0) and calls == [3, 3]
+
+
+def test_water_tiles_match_the_full_network(tmp_path, monkeypatch):
+    """Unsimplified tiles give the full network's distances while evicting tiles; simplified tiles stay within the tolerance."""
+    import json
+
+    import numpy as np
+    import shapely
+
+    from property_tracker.config import settings
+    from property_tracker.utils.water_tiles import WaterTileIndex, build_water_tiles
+
+    rng = np.random.default_rng(1)
+    starts = np.column_stack([rng.uniform(9.5, 11.5, 60), rng.uniform(43.5, 45.0, 60)])
+    features = []
+    for start in starts:
+        coordinates = start + np.cumsum(rng.normal(0, 0.01, (20, 2)), axis=0)
+        features.append({"type": "Feature", "geometry": {"type": "LineString", "coordinates": coordinates.tolist()}})
+    water_path = tmp_path / "water.json"
+    water_path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    calc = DistanceCalculator()
+    arrays = calc.read_water_lines(water_path)
+    lines = shapely.linestrings(arrays["vertices"], indices=arrays["line_index"])
+    x = rng.uniform(*np.percentile(arrays["vertices"][:, 0], [0, 100]), 400)
+    y = rng.uniform(*np.percentile(arrays["vertices"][:, 1], [0, 100]), 400)
+    exact = shapely.distance(shapely.points(x, y)[:, None], lines[None, :]).min(axis=1)
+
+    index = build_water_tiles(water_path, tmp_path / "exact", tile_size_m=10_000, tolerance_m=0, calculator=calc)
+    tiles = WaterTileIndex(tmp_path / "exact", max_tiles=4)
+    np.testing.assert_allclose(tiles.distances(x, y), exact, atol=1e-6)
+    assert tiles.loaded_tiles == 4 and tiles.evictions == tiles.loads - 4
+    assert tiles.loads >= len(index["tiles"])
+
+    build_water_tiles(water_path, tmp_path / "simple", tile_size_m=10_000, tolerance_m=50, calculator=calc)
+    simplified = WaterTileIndex(tmp_path / "simple").distances(x, y)
+    assert np.abs(simplified - exact).max() <= 50 + 1e-6
+
+    # A rebuild swaps the index; a reader of the replaced build keeps its tiles until the build after
+    reader = WaterTileIndex(tmp_path / "exact")
+    build_water_tiles(water_path, tmp_path / "exact", tile_size_m=10_000, tolerance_m=0, calculator=calc)
+    np.testing.assert_allclose(reader.distances(x, y), exact, atol=1e-6)
+    build_water_tiles(water_path, tmp_path / "exact", tile_size_m=10_000, tolerance_m=0, calculator=calc)
+    assert len(list((tmp_path / "exact").glob("build-*"))) == 2
+    assert not reader.build_dir.exists()
+
+    # The calculator answers from the tiles once they are built
+    monkeypatch.setattr(settings, "WATER_TILE_DIR", tmp_path / "exact")
+    lats, lons = np.array([44.0, np.nan]), np.array([10.5, 10.5])
+    water = DistanceCalculator().calculate_water_distances(lats, lons)
+    (px,), (py,) = calc._transformer.transform([10.5], [44.0])
+    assert water[0] == pytest.approx(shapely.distance(shapely.Point(px, py), lines).min() / 1000.0)
+    assert np.isnan(water[1])
+
+
+def _write_comuni(path):
+    """Two square comuni side by side in one province, and an island comune in another region."""
+    import json
+
+    def square(min_lon, min_lat, size):
+        return [[[min_lon, min_lat], [min_lon + size, min_lat], [min_lon + size, min_lat + size], [min_lon, min_lat + size], [min_lon, min_lat]]]
+
+    comuni = [
+        ("Lucca", "LU", "Toscana", {"type": "Polygon", "coordinates": square(10.0, 43.0, 0.5)}),
+        ("Capannori", "LU", "Toscana", {"type": "Polygon", "coordinates": square(10.5, 43.0, 0.5)}),
+        ("La Maddalena", "SS", "Sardegna", {"type": "MultiPolygon", "coordinates": [square(9.0, 41.0, 0.1), square(9.2, 41.0, 0.1)]}),
+    ]
+    features = [
+        {"type": "Feature", "properties": {"COMUNE": name, "SIGLA": sigla, "DEN_REG": region}, "geometry": geometry}
+        for name, sigla, region, geometry in comuni
+    ]
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+def test_admin_boundaries_assign_comune_province_and_region(tmp_path, db_engine, monkeypatch):
+    """Points get the comune they lie in, snap to a comune just outside it, and the backfill stores the names."""
+    import numpy as np
+    from sqlmodel import Session, select
+
+    from property_tracker.config import settings
+    from property_tracker.models.property import Property
+    from property_tracker.utils.admin_boundaries import AdminBoundaries
+    from property_tracker.utils.backfill import backfill
+
+    comuni_path = tmp_path / "comuni.json"
+    _write_comuni(comuni_path)
+
+    lats = np.array([43.2, 43.2, 41.05, 43.5, 43.2, 43.2, np.nan])
+    lons = np.array([10.2, 10.7, 9.25, 10.5, 11.003, 12.0, 10.2])
+    names = AdminBoundaries(comuni_path).lookup(lats, lons)
+    assert names["city"].tolist() == ["Lucca", "Capannori", "La Maddalena", "Lucca", "Capannori", None, None]
+    assert names["province"].tolist() == ["LU", "LU", "SS", "LU", "LU", None, None]
+    assert names["admin_region"].tolist() == ["Toscana", "Toscana", "Sardegna", "Toscana", "Toscana", None, None]
+
+    # A second index reads the geometry cache and answers the same
+    again = AdminBoundaries(comuni_path)
+    again._parse = None  # Fails if the cache is not used
+    assert again.lookup(lats, lons)["city"].tolist() == names["city"].tolist()
+
+    monkeypatch.setattr(settings, "COMUNI_PATH", comuni_path)
+    with Session(db_engine) as session:
+        for property_id, (lat, lon) in enumerate([("43.2", "10.2"), ("41.05", "9.25"), ("43.2", "12.0")], start=1):
+            session.add(
+                Property(
+                    id=property_id,
+                    region="NORTHERN_ITALY",
+                    category="C",
+                    latitude=lat,
+                    longitude=lon,
+                    discription="",
+                    discription_dk="",
+                    photo_list="[]",
+                )
+            )
+        session.commit()
+
+    assert backfill(db_engine, workers=1).updated == 3
+    with Session(db_engine) as session:
+        stored = {p.id: (p.city, p.province, p.admin_region, p.region) for p in session.exec(select(Property))}
+    assert stored[1] == ("Lucca", "LU", "Toscana", "NORTHERN_ITALY")
+    assert stored[2] == ("La Maddalena", "SS", "Sardegna", "NORTHERN_ITALY")
+    assert stored[3][:3] == (None, None, None)
+    assert backfill(db_engine, workers=1).updated == 0
+
+
+def test_amenity_index_measures_nearest_amenity_per_class(tmp_path, db_engine, monkeypatch):
+    """The importer classifies OSM features per class, and the index returns metric nearest distances in one batch."""
+    import json
+
+    import numpy as np
+    from sqlmodel import Session, select
+
+    from property_tracker.config import settings
+    from property_tracker.models.property import Property
+    from property_tracker.utils.amenities import AmenityIndex, import_amenities
+    from property_tracker.utils.backfill import backfill
+
+    def point(lon, lat, **tags):
+        return {"type": "Feature", "properties": tags, "geometry": {"type": "Point", "coordinates": [lon, lat]}}
+
+    hospital = [[10.49, 43.83], [10.51, 43.83], [10.51, 43.85], [10.49, 43.85], [10.49, 43.83]]
+    features = [
+        point(10.50, 43.84, railway="station"),
+        point(10.40, 43.84, railway="station", station="subway"),  # Not a train station
+        {"type": "Feature", "properties": {"amenity": "hospital"}, "geometry": {"type": "Polygon", "coordinates": [hospital]}},
+        point(10.60, 43.90, highway="motorway_junction"),
+        point(10.39, 43.68, aeroway="aerodrome", iata="PSA"),
+        point(10.45, 43.70, aeroway="aerodrome"),  # Airfield without scheduled flights
+        point(10.5077, 43.8438, **{"tags": {"place": "town"}}),  # Overpass-style nested tags
+        point(10.55, 43.80, shop="bakery"),
+    ]
+    extract = tmp_path / "extract.geojson"
+    extract.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    calc = DistanceCalculator()
+    counts = import_amenities(extract, tmp_path / "amenities.npz", calculator=calc)
+    assert counts == {"station": 1, "hospital": 1, "motorway_exit": 1, "airport": 1, "town_centre": 1}
+
+    index = AmenityIndex(tmp_path / "amenities.npz", calculator=calc)
+    lats, lons = np.array([43.84, 44.0, np.nan]), np.array([10.50, 10.0, 10.5])
+    distances = index.distances(lats, lons)
+    for column, (lat, lon) in {"dist_station": (43.84, 10.50), "dist_airport": (43.68, 10.39), "dist_motorway_exit": (43.90, 10.60)}.items():
+        (x1, x2), (y1, y2) = calc._transformer.transform([lon, lons[1]], [lat, lats[1]])
+        assert distances[column][1] == pytest.approx(np.hypot(x2 - x1, y2 - y1) / 1000.0, abs=0.001)
+    assert distances["dist_station"][0] == pytest.approx(0.0, abs=0.001)
+    assert distances["dist_hospital"][0] < 1.2
+    assert all(np.isnan(values[2]) for values in distances.values())
+
+    # A CSV extract with only some classes
+    csv_path = tmp_path / "extract.csv"
+    csv_path.write_text("class,lat,lon,name\nstation,43.84,10.50,Lucca\nferry,43.0,10.0,Not a class\n")
+    import_amenities(csv_path, tmp_path / "csv.npz", calculator=calc)
+    from_csv = AmenityIndex(tmp_path / "csv.npz", calculator=calc).distances(lats, lons)
+    assert from_csv["dist_station"][1] == pytest.approx(distances["dist_station"][1], abs=0.001)
+    assert np.isnan(from_csv["dist_hospital"][0])
+
+    # The backfill fills the amenity columns once an extract is imported
+    monkeypatch.setattr(settings, "AMENITY_INDEX_PATH", tmp_path / "amenities.npz")
+    with Session(db_engine) as session:
+        session.add(Property(id=1, region="R", category="C", latitude="44.0", longitude="10.0", discription="", discription_dk="", photo_list="[]"))
+        session.commit()
+    backfill(db_engine, workers=1)
+    with Session(db_engine) as session:
+        stored = session.exec(select(Property)).one()
+    assert stored.dist_station == pytest.approx(round(distances["dist_station"][1], 2))
+    assert stored.dist_airport == pytest.approx(round(distances["dist_airport"][1], 2))
@@ -8,11 +8,13 @@ import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from sqlmodel import Session, create_engine, select
+from components.listings import get_active_df, queue_status_update, undo_last_review
+from sqlmodel import Session, create_engine
 
 from property_tracker.config.settings import get_database_url
-from property_tracker.models.property import Property
+from property_tracker.database.connection import install_database_hooks
 from property_tracker.services.review import ReviewService
+from property_tracker.services.summary import SummaryService, price_bucket_label
 
 # ================ CONFIGURATION ================
 PAGE_TITLE = "Property Review Dashboard"
@@ -27,6 +29,7 @@ st.set_page_config(page_title=PAGE_TITLE, page_icon=PAGE_ICON, layout="wide")
 @st.cache_resource
 def get_engine():
     """Create and cache database engine."""
+    install_database_hooks()
     return create_engine(get_database_url())
 
 
@@ -34,58 +37,22 @@ engine = get_engine()
 
 
 # ================ DATA LOADING ================
-@st.cache_data(ttl=300)  # Cache for 5 minutes
 def load_properties_df(status_filter=None, region_filter=None):
     """Load properties as DataFrame with optional filters.
 
-    Uses SQLModel's safe query builder to prevent SQL injection.
+    Reads the session's active listings (memory-mapped Arrow snapshot plus
+    change feed deltas), whose coordinate, distance and price columns are
+    already numeric.
     """
-    with Session(engine) as session:
-        # Build query using SQLModel (safe from SQL injection)
-        statement = select(Property).where(Property.sold == 0)
-
-        if status_filter and status_filter != "All":
-            statement = statement.where(Property.review_status == status_filter)
-
-        if region_filter and region_filter != "All":
-            statement = statement.where(Property.region == region_filter)
-
-        # Execute query and convert to DataFrame
-        properties = session.exec(statement).all()
-
-        if len(properties) == 0:
-            # Return empty DataFrame with proper column structure
-            return pd.DataFrame(
-                columns=[
-                    "id",
-                    "region",
-                    "price",
-                    "price_m",
-                    "rooms",
-                    "bathrooms",
-                    "surface",
-                    "latitude",
-                    "longitude",
-                    "dist_coast",
-                    "dist_water",
-                    "review_status",
-                    "reviewed_date",
-                    "photo_list",
-                    "discription",
-                ]
-            )
-
-        df = pd.DataFrame([prop.model_dump() for prop in properties])
-
-        # Convert numeric columns
-        df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
-        df["latitude"] = pd.to_numeric(df["latitude"], errors="coerce")
-        df["dist_coast"] = pd.to_numeric(df["dist_coast"], errors="coerce")
-        df["dist_water"] = pd.to_numeric(df["dist_water"], errors="coerce")
-        df["price"] = pd.to_numeric(df["price"], errors="coerce")
-        df["price_m"] = pd.to_numeric(df["price_m"], errors="coerce")
-
-        return df
+    df = get_active_df()
+
+    if status_filter and status_filter != "All":
+        df = df[df["review_status"] == status_filter]
+
+    if region_filter and region_filter != "All":
+        df = df[df["region"] == region_filter]
+
+    return df.reset_index(drop=True)
 
 
 def get_review_counts():
@@ -95,6 +62,18 @@ def get_review_counts():
         return service.get_status_counts()
 
 
+def get_regions():
+    """Get regions with unsold properties from the summary cube."""
+    with Session(engine) as session:
+        return SummaryService(session).get_regions()
+
+
+def get_price_distribution():
+    """Get unsold property counts per price bucket from the summary cube."""
+    with Session(engine) as session:
+        return SummaryService(session).get_price_distribution()
+
+
 # ================ MAIN APP ================
 def main():
     st.title(f"{PAGE_ICON} Property Review Dashboard")
@@ -156,6 +135,22 @@ def main():
         fig_pie.update_layout(title="Review Status Breakdown", height=350)
         st.plotly_chart(fig_pie, width="stretch")
 
+    # Price distribution
+    price_distribution = get_price_distribution()
+    if price_distribution:
+        fig_price = go.Figure(
+            data=[
+                go.Bar(
+                    x=[price_bucket_label(bucket) for bucket in price_distribution],
+                    y=list(price_distribution.values()),
+                    text=list(price_distribution.values()),
+                    textposition="auto",
+                )
+            ]
+        )
+        fig_price.update_layout(title="Price Distribution", xaxis_title="Price", yaxis_title="Number of Properties", height=350)
+        st.plotly_chart(fig_price, width="stretch")
+
     st.markdown("---")
 
     # === SECTION 3: FILTERS ===
@@ -172,8 +167,7 @@ def main():
 
     with col_f2:
         # Load unique regions
-        df_temp = load_properties_df()
-        regions = ["All"] + sorted(df_temp["region"].unique().tolist())
+        regions = ["All"] + get_regions()
         region_filter = st.selectbox("Region", regions)
 
     st.markdown("---")
@@ -187,9 +181,6 @@ def main():
         st.info("No properties match your filters.")
         return
 
-    # Store in session state for other pages
-    st.session_state["df"] = df
-
     # Tabs for different views
     tab1, tab2 = st.tabs(["⚡ Quick Actions", "📋 Detailed View"])
 
@@ -206,6 +197,14 @@ def render_quick_actions(df):
     # Show only To Review properties, limit to first 20
     to_review_df = df[df["review_status"] == "To Review"].head(PROPERTIES_PER_PAGE)
 
+    if st.button("↩️ Undo last review", key="undo_last_review"):
+        undone = undo_last_review()
+        if undone:
+            st.success(f"Undid last review of property {undone[0]}")
+            st.rerun()
+        else:
+            st.info("Nothing to undo")
+
     if len(to_review_df) == 0:
         st.info("No properties to review! All caught up 🎉")
         return
@@ -273,22 +272,11 @@ def render_detailed_view(df):
 
 # ================ HELPER FUNCTIONS ================
 def update_property_status(property_id: int, new_status: str):
-    """Update property review status and refresh UI."""
-    try:
-        with Session(engine) as session:
-            service = ReviewService(session)
-            success = service.update_status(property_id, new_status)
-
-            if success:
-                st.success(f"Property {property_id} marked as {new_status}!")
-                # Clear cache to force data reload
-                st.cache_data.clear()
-                # Rerun to refresh UI
-                st.rerun()
-            else:
-                st.error(f"Failed to update property {property_id}")
-    except Exception as e:
-        st.error(f"Error updating property: {e}")
+    """Queue a review status update and refresh the UI."""
+    queue_status_update(property_id, new_status)
+    st.success(f"Property {property_id} marked as {new_status}!")
+    # Shown optimistically on rerun; written by the write-behind queue
+    st.rerun()
 
 
 # ================ RUN APP ================
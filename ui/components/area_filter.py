@@ -0,0 +1,70 @@
+"""Sidebar area filter component.
+
+Lets a page load only the properties within a radius of a chosen point,
+using the R*Tree-backed SpatialService instead of loading every row and
+filtering coordinates in pandas, and reads their columns through
+PropertyRepository without building ORM objects.
+"""
+
+import pandas as pd
+import streamlit as st
+from sqlmodel import Session, create_engine
+
+from property_tracker.config.settings import get_database_url
+from property_tracker.database.connection import install_database_hooks
+from property_tracker.database.repository import LISTING_COLUMNS, PropertyRepository
+from property_tracker.services.spatial import SpatialService
+
+# Default search centre (near Parma, matching the scraper's search centre)
+DEFAULT_CENTER_LAT = 44.8
+DEFAULT_CENTER_LON = 10.3
+
+
+@st.cache_resource
+def _get_engine():
+    """Create and cache database engine."""
+    install_database_hooks()
+    return create_engine(get_database_url())
+
+
+@st.cache_data(ttl=300)
+def load_properties_within_km(lat: float, lon: float, radius_km: float) -> pd.DataFrame:
+    """Load unsold properties within a radius as a DataFrame.
+
+    Args:
+        lat: Centre latitude in decimal degrees
+        lon: Centre longitude in decimal degrees
+        radius_km: Search radius in kilometers
+
+    Returns:
+        DataFrame of matching properties with a ``distance_km`` column, nearest first
+    """
+    with Session(_get_engine()) as session:
+        # One query over the R*Tree-filtered subquery, rather than an IN list of every ID in range
+        within = SpatialService(session).within_km_subquery(lat, lon, radius_km)
+        df = PropertyRepository(session, table=within).fetch_df([*LISTING_COLUMNS, "distance_km"])
+    return df.round({"distance_km": 2}).sort_values(["distance_km", "id"], ignore_index=True)
+
+
+def render_area_filter(key_prefix: str = "") -> pd.DataFrame | None:
+    """Render the sidebar area filter.
+
+    Args:
+        key_prefix: Prefix for widget keys to ensure uniqueness
+
+    Returns:
+        DataFrame of properties in range when the filter is enabled, otherwise None
+        (the page should then fall back to its full dataset)
+    """
+    st.sidebar.header("📍 Area")
+    enabled = st.sidebar.checkbox("Only load properties within a radius", key=f"{key_prefix}_area_enabled")
+    if not enabled:
+        return None
+
+    lat = st.sidebar.number_input("Centre latitude", value=DEFAULT_CENTER_LAT, format="%.4f", key=f"{key_prefix}_area_lat")
+    lon = st.sidebar.number_input("Centre longitude", value=DEFAULT_CENTER_LON, format="%.4f", key=f"{key_prefix}_area_lon")
+    radius_km = st.sidebar.slider("Radius (km)", min_value=1, max_value=400, value=50, key=f"{key_prefix}_area_radius")
+
+    area_df = load_properties_within_km(float(lat), float(lon), float(radius_km))
+    st.sidebar.caption(f"{len(area_df)} properties within {radius_km} km")
+    return area_df
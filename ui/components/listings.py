@@ -0,0 +1,262 @@
+"""Shared loader and review writer for the active listing set.
+
+Pages read listings from the memory-mapped Arrow snapshot instead of
+running ``SELECT *`` through pandas. The per-session DataFrame is kept
+current through the change feed, so a review click costs a tiny delta
+fetch rather than a full reload.
+
+Review and interaction writes go through a process-wide write-behind
+queue: they show immediately (queued values are overlaid on the listings)
+and are committed in batches, after which the changed snapshot rows are
+refreshed. Each write carries the ``row_version`` this session last saw,
+so a change another session made in the meantime is not overwritten; the
+write is dropped and the next load warns about it, showing the other
+session's values.
+
+Photos come from the normalised photo table: cover photos for the listings
+on screen in one query, a listing's gallery only on demand.
+"""
+
+import uuid
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import Engine
+from sqlmodel import Session, create_engine
+
+from property_tracker.config.settings import get_database_url, get_write_journal_path
+from property_tracker.database.connection import install_database_hooks
+from property_tracker.database.repository import FLOAT_COLUMNS, LISTING_COLUMNS
+from property_tracker.database.snapshot import ListingSnapshot
+from property_tracker.services.changes import apply_changes
+from property_tracker.services.photos import PhotoService
+from property_tracker.services.review_log import ReviewLogService
+from property_tracker.services.spatial import SpatialService
+from property_tracker.services.write_queue import ReviewWriteQueue
+
+
+@st.cache_resource
+def _get_engine():
+    """Create and cache database engine."""
+    install_database_hooks()
+    return create_engine(get_database_url())
+
+
+@st.cache_resource
+def get_write_queue() -> ReviewWriteQueue:
+    """Create and cache the process-wide review write queue."""
+    engine = _get_engine()
+    return ReviewWriteQueue(engine, journal_path=get_write_journal_path(), on_flush=partial(_refresh_snapshot_rows, engine))
+
+
+def _refresh_snapshot_rows(engine: Engine, property_ids: list[int]) -> None:
+    """Refresh written properties' rows in the snapshot.
+
+    Runs on the queue's flush thread, so it is handed the engine rather
+    than reaching Streamlit's resource cache from there.
+    """
+    with engine.connect() as connection:
+        ListingSnapshot().refresh_rows(connection, property_ids)
+
+
+def _get_snapshot() -> ListingSnapshot:
+    """Get the snapshot, building it from the database on first use."""
+    snapshot = ListingSnapshot()
+    if not snapshot.exists():
+        with _get_engine().connect() as connection:
+            snapshot.rebuild(connection)
+    return snapshot
+
+
+def load_active_df(columns: list[str] | None = None) -> pd.DataFrame:
+    """Load unsold listings from the Arrow snapshot.
+
+    Builds the snapshot from the database on first use.
+
+    Args:
+        columns: Optional column projection
+
+    Returns:
+        DataFrame of active listings with typed columns
+    """
+    return _get_snapshot().load_df(columns)
+
+
+def get_active_df() -> pd.DataFrame:
+    """Get this session's active listings, applying only changes since the last call.
+
+    The DataFrame and the change feed version it reflects are kept in
+    ``st.session_state["df"]`` / ``st.session_state["df_version"]``.
+
+    Returns:
+        DataFrame of active listings
+    """
+    if "df" in st.session_state and "df_version" in st.session_state:
+        df, version = st.session_state["df"], st.session_state["df_version"]
+    else:
+        snapshot = _get_snapshot()
+        df, version = snapshot.load_df(), snapshot.feed_version()
+
+    with Session(_get_engine()) as session:
+        result = apply_changes(df, session, version)
+
+    if result is None:
+        # Feed was pruned past our version: start over from a fresh snapshot
+        snapshot = ListingSnapshot()
+        with _get_engine().connect() as connection:
+            snapshot.rebuild(connection)
+        result = (snapshot.load_df(), snapshot.feed_version())
+
+    st.session_state["df"], st.session_state["df_version"] = result
+    conflicts = get_write_queue().take_conflicts(review_actor())
+    if conflicts:
+        ids = ", ".join(str(property_id) for property_id in sorted(conflicts))
+        st.warning(f"Another session changed {ids} first, so your change was not saved. The latest values are shown.")
+    return _overlay_pending(result[0])
+
+
+def map_viewport(map_key: str) -> tuple[float, float, float, float] | None:
+    """Bounds a Folium map last reported through ``st_folium``.
+
+    Args:
+        map_key: Widget key the map was rendered with
+
+    Returns:
+        Tuple of (min_lat, max_lat, min_lon, max_lon), or None before the map has reported any
+    """
+    bounds = (st.session_state.get(map_key) or {}).get("bounds") or {}
+    south_west, north_east = bounds.get("_southWest") or {}, bounds.get("_northEast") or {}
+    edges = (south_west.get("lat"), north_east.get("lat"), south_west.get("lng"), north_east.get("lng"))
+    return None if None in edges else tuple(float(edge) for edge in edges)
+
+
+def map_view(map_key: str) -> tuple[list[float], int] | None:
+    """Centre and zoom a Folium map last reported, so a rerun keeps the user's view.
+
+    Returns:
+        Tuple of ([lat, lon], zoom), or None before the map has reported any
+    """
+    state = st.session_state.get(map_key) or {}
+    center, zoom = state.get("center") or {}, state.get("zoom")
+    if center.get("lat") is None or center.get("lng") is None or zoom is None:
+        return None
+    return [float(center["lat"]), float(center["lng"])], int(zoom)
+
+
+def get_listings_in_view(min_lat: float, max_lat: float, min_lon: float, max_lon: float) -> pd.DataFrame:
+    """Load only the active listings inside a map viewport, with queued writes shown.
+
+    Uses the R*Tree-backed ``SpatialService.properties_in_bbox``, so
+    panning a map reads the rows in view rather than every listing.
+
+    Args:
+        min_lat: Southern edge in decimal degrees
+        max_lat: Northern edge in decimal degrees
+        min_lon: Western edge in decimal degrees
+        max_lon: Eastern edge in decimal degrees
+
+    Returns:
+        DataFrame with the listing columns; coordinates and distances as floats
+    """
+    with Session(_get_engine()) as session:
+        properties = SpatialService(session).properties_in_bbox(min_lat, max_lat, min_lon, max_lon)
+        df = pd.DataFrame([prop.model_dump(include=set(LISTING_COLUMNS)) for prop in properties], columns=list(LISTING_COLUMNS))
+    for column in FLOAT_COLUMNS:
+        df[column] = pd.to_numeric(df[column], errors="coerce")
+    return _overlay_pending(df)
+
+
+def _overlay_pending(df: pd.DataFrame) -> pd.DataFrame:
+    """Show queued review writes before they are committed (optimistic update)."""
+    pending = get_write_queue().pending()
+    if not pending:
+        return df
+    df = df.copy()
+    for property_id, values in pending.items():
+        mask = df["id"] == property_id
+        for column, value in values.items():
+            df.loc[mask, column] = value
+    return df
+
+
+def _seen_version(property_id: int) -> int | None:
+    """``row_version`` of a property in this session's listings (None if not loaded)."""
+    df = st.session_state.get("df")
+    if df is None or "row_version" not in df.columns:
+        return None
+    versions = df.loc[df["id"] == property_id, "row_version"]
+    return None if versions.empty or pd.isna(versions.iloc[0]) else int(versions.iloc[0])
+
+
+def queue_status_update(property_id: int, new_status: str) -> bool:
+    """Queue a review status change; it shows at once and is written in the next batch.
+
+    Args:
+        property_id: ID of the property to update
+        new_status: New review status
+
+    Returns:
+        False if another session has a change to the property queued first
+    """
+    return get_write_queue().update_status(property_id, new_status, actor=review_actor(), expected_version=_seen_version(property_id))
+
+
+def queue_interaction_update(property_id: int, **values) -> bool:
+    """Queue interaction changes (favorite, viewed, hidden, notes) for a property.
+
+    Args:
+        property_id: ID of the property to update
+        **values: Column values to write
+
+    Returns:
+        False if another session has a change to the property queued first
+    """
+    return get_write_queue().submit(property_id, actor=review_actor(), expected_version=_seen_version(property_id), **values)
+
+
+def review_actor() -> str:
+    """Tag identifying this browser session in the review event log."""
+    if "review_actor" not in st.session_state:
+        st.session_state["review_actor"] = uuid.uuid4().hex[:12]
+    return st.session_state["review_actor"]
+
+
+def undo_last_review(count: int = 1) -> list[int]:
+    """Undo this session's most recent review actions.
+
+    Queued writes are flushed first so the log includes them.
+
+    Args:
+        count: Number of actions to undo
+
+    Returns:
+        IDs of the properties that were changed back
+    """
+    get_write_queue().flush()
+    with Session(_get_engine()) as session:
+        property_ids = ReviewLogService(session).undo_last(count, actor=review_actor())
+    if property_ids:
+        _refresh_snapshot_rows(_get_engine(), property_ids)
+    return property_ids
+
+
+@st.cache_data(ttl=300)
+def get_cover_photos(property_ids: tuple[int, ...]) -> dict[int, str]:
+    """Get the cover photo URL of each listing in one query.
+
+    Args:
+        property_ids: IDs of the listings shown (a tuple, so it can be cached)
+
+    Returns:
+        Dictionary mapping property ID to cover photo URL
+    """
+    with Session(_get_engine()) as session:
+        return PhotoService(session).cover_photos(property_ids)
+
+
+@st.cache_data(ttl=300)
+def get_gallery(property_id: int) -> list[str]:
+    """Get all photo URLs of one listing, loaded only when a page asks for them."""
+    with Session(_get_engine()) as session:
+        return PhotoService(session).gallery(property_id)
@@ -5,10 +5,8 @@ across all Streamlit pages.
 """
 
 import streamlit as st
-from sqlmodel import Session, create_engine
 
-from property_tracker.config.settings import get_database_url
-from property_tracker.services.review import ReviewService
+from .listings import queue_status_update
 
 
 def render_review_buttons(property_id: int, current_status: str, key_prefix: str = "", use_container_width: bool = True) -> None:
@@ -54,40 +52,18 @@ def render_review_buttons(property_id: int, current_status: str, key_prefix: str
 
 
 def _update_status(property_id: int, new_status: str) -> None:
-    """Update property status and refresh UI.
+    """Queue a property status update and refresh the UI.
 
-    Internal helper function that handles the database update and
-    triggers UI refresh.
+    The change shows immediately on rerun and is committed by the
+    write-behind queue, so rapid triage never waits on the database.
 
     Args:
         property_id: ID of the property to update
         new_status: New review status
     """
-    try:
-        # Create engine and session
-        engine = create_engine(get_database_url())
-
-        with Session(engine) as session:
-            service = ReviewService(session)
-            success = service.update_status(property_id, new_status)
-
-            if success:
-                st.success(f"Property {property_id} marked as {new_status}!")
-
-                # Clear cache to force data reload
-                st.cache_data.clear()
-
-                # Clear session state DataFrame if it exists
-                if "df" in st.session_state:
-                    del st.session_state["df"]
-
-                # Rerun to refresh UI
-                st.rerun()
-            else:
-                st.error(f"Failed to update property {property_id}")
-
-    except Exception as e:
-        st.error(f"Error updating property: {e}")
+    queue_status_update(property_id, new_status)
+    st.success(f"Property {property_id} marked as {new_status}!")
+    st.rerun()
 
 
 def render_status_badge(status: str) -> None:
@@ -1,24 +1,24 @@
 # noqa: N999
+import sys
+from pathlib import Path
+
 import pandas as pd
 import streamlit as st
-from sqlmodel import Session, create_engine
 
-from property_tracker.config.settings import get_database_url
+# Add parent directory to path for component imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from components.area_filter import render_area_filter  # noqa: E402
+from components.listings import get_active_df  # noqa: E402
 
 st.set_page_config(page_title="Filter Properties", page_icon="🔍", layout="wide")
 
 st.title("🔍 Filter Properties")
 
-# Load data from session state or database
-if "df" not in st.session_state:
-    # Load from database if session state not initialized
-    engine = create_engine(get_database_url())
-    with Session(engine) as session:
-        query = "SELECT * FROM property WHERE sold = 0"
-        df = pd.read_sql(query, con=session.connection())
-        st.session_state["df"] = df
-else:
-    df = st.session_state["df"]
+# Only the listings within a radius, from the spatial index, if an area is chosen;
+# otherwise the active listings from the snapshot, kept current through the change feed
+area_df = render_area_filter(key_prefix="filter")
+df = area_df if area_df is not None else get_active_df()
 
 # Show total properties metric at the top
 st.metric("Total Properties in Database", len(df))
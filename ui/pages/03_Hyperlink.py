@@ -4,32 +4,40 @@ Interactive Property Map with Clickable Markers
 Uses Folium for truly clickable markers that open property links
 """
 
+import sys
+from pathlib import Path
+
 import folium
 import pandas as pd
 import streamlit as st
-from sqlmodel import Session, create_engine
 from streamlit_folium import st_folium
 
-from property_tracker.config.settings import get_database_url
-from property_tracker.services.review import ReviewService
+# Add parent directory to path for component imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from components.area_filter import render_area_filter  # noqa: E402
+from components.listings import (  # noqa: E402
+    get_active_df,
+    get_cover_photos,
+    get_gallery,
+    get_listings_in_view,
+    map_view,
+    map_viewport,
+    queue_status_update,
+)
 
 st.set_page_config(page_title="Property Map", page_icon="🗺️", layout="wide")
 
+# Widget key of the map; its last reported viewport decides which listings are loaded
+MAP_KEY = "property_map"
+
 
 def update_property_status(property_id: int, new_status: str):
-    """Update property review status and refresh the UI."""
-    engine = create_engine(get_database_url())
-    with Session(engine) as session:
-        service = ReviewService(session)
-        success = service.update_status(property_id, new_status)
-        if success:
-            st.success(f"Property {property_id} marked as {new_status}!")
-            # Clear session state to force reload from database
-            if "df" in st.session_state:
-                del st.session_state["df"]
-            st.rerun()
-        else:
-            st.error(f"Failed to update property {property_id}")
+    """Queue a review status update and refresh the UI."""
+    queue_status_update(property_id, new_status)
+    st.success(f"Property {property_id} marked as {new_status}!")
+    # Shown optimistically on rerun; written by the write-behind queue
+    st.rerun()
 
 
 def _max_width_():
@@ -46,14 +54,20 @@ def _max_width_():
     )
 
 
-def create_folium_map(df):
-    """Create interactive Folium map with clickable markers that open property links"""
-    # Calculate center of Italy for initial view
-    center_lat = df["latitude"].mean() if len(df) > 0 else 42.5
-    center_lon = df["longitude"].mean() if len(df) > 0 else 12.5
+def create_folium_map(df, covers=None, view=None):
+    """Create interactive Folium map with clickable markers that open property links
+
+    ``view`` is the ([lat, lon], zoom) the map last showed, kept across reruns.
+    """
+    covers = covers or {}
+    if view is None:
+        # Calculate center of Italy for initial view
+        center_lat = df["latitude"].mean() if len(df) > 0 else 42.5
+        center_lon = df["longitude"].mean() if len(df) > 0 else 12.5
+        view = ([center_lat, center_lon], 6)
 
     # Create base map
-    m = folium.Map(location=[center_lat, center_lon], zoom_start=6, tiles="OpenStreetMap")
+    m = folium.Map(location=view[0], zoom_start=view[1], tiles="OpenStreetMap")
 
     # Add markers for each property
     for _idx, row in df.iterrows():
@@ -84,8 +98,12 @@ def create_folium_map(df):
 
         # Create popup HTML with clickable link
         property_url = f"https://www.immobiliare.it/en/annunci/{row['id']}/"
+        cover = covers.get(int(row["id"]))
+        # Lazy: the image is only fetched when its popup is opened
+        cover_html = f'<img src="{cover}" loading="lazy" style="width: 100%; margin-bottom: 8px;">' if cover else ""
         popup_html = f"""
         <div style="font-family: Arial; min-width: 250px; max-width: 300px;">
+            {cover_html}
             <h4 style="margin-bottom: 10px;">{row.get("caption", "Property")}</h4>
             <table style="width: 100%; font-size: 12px;">
                 <tr><td><b>💰 Price:</b></td><td>{price_display}</td></tr>
@@ -132,14 +150,21 @@ _max_width_()
 st.title("🏡 Property Explorer")
 
 # Load data
-if "df" not in st.session_state:
-    engine = create_engine(get_database_url())
-    with Session(engine) as session:
-        query = "SELECT * FROM property WHERE sold = 0"
-        df = pd.read_sql(query, con=session.connection())
-        st.session_state["df"] = df
+# Only the listings within a radius, from the spatial index, if an area is chosen;
+# otherwise only those inside the map's last viewport, once the map has reported one
+area_df = render_area_filter(key_prefix="hyperlink")
+viewport = map_viewport(MAP_KEY) if area_df is None else None
+view_df = get_listings_in_view(*viewport) if viewport is not None else None
+if view_df is not None and view_df.empty:
+    st.caption("No listings in the current map view; showing all listings.")
+    view_df = None
+if area_df is not None:
+    df = area_df.copy()
+elif view_df is not None:
+    df = view_df.copy()
 else:
-    df = st.session_state["df"]
+    # Active listings from the snapshot, kept current through the change feed
+    df = get_active_df().copy()
 
 # Data preprocessing
 df["longitude"] = pd.to_numeric(df["longitude"], errors="coerce")
@@ -246,13 +271,14 @@ st.write("**Color coding:** 🟢 Green (<€50k) | 🔵 Blue (€50-75k) | 🟠
 st.markdown("---")
 
 # Create map
-folium_map = create_folium_map(lat_lon)
+# Cover photos for every listing on the map in one query
+folium_map = create_folium_map(lat_lon, get_cover_photos(tuple(int(pid) for pid in lat_lon["id"])), map_view(MAP_KEY))
 
 # Display map with FOLIUM (supports truly clickable links!)
 st.subheader("🗺️ Interactive Property Map")
 
 # Display Folium map
-map_output = st_folium(folium_map, width="stretch", height=700, key="property_map")
+map_output = st_folium(folium_map, width="stretch", height=700, key=MAP_KEY)
 
 # Quick Review Actions
 st.markdown("---")
@@ -320,3 +346,11 @@ with col_buttons:
         with btn_col3:
             if st.button("❌ No", key=f"no_{property_id}", width="stretch"):
                 update_property_status(property_id, "Rejected")
+
+        # The gallery is only loaded for the selected property, on request
+        if st.toggle("📷 Show photos", key=f"photos_{property_id}"):
+            gallery = get_gallery(property_id)
+            if gallery:
+                st.image(gallery, width=220)
+            else:
+                st.caption("No photos for this property")
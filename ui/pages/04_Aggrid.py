@@ -4,21 +4,18 @@
 Displays properties in an interactive table view.
 """
 
-import pandas as pd
+import sys
+from pathlib import Path
+
 import streamlit as st
-from sqlmodel import Session, create_engine
 
-from property_tracker.config.settings import get_database_url
+# Add parent directory to path for component imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
 
-# Load data from session state or database
-if "df" not in st.session_state:
-    engine = create_engine(get_database_url())
-    with Session(engine) as session:
-        query = "SELECT * FROM property WHERE sold = 0"
-        df = pd.read_sql(query, con=session.connection())
-        st.session_state["df"] = df
-else:
-    df = st.session_state["df"]
+from components.listings import get_active_df  # noqa: E402
+
+# Active listings from the snapshot, kept current through the change feed
+df = get_active_df()
 
 if df is None or df.empty:
     st.warning("No data loaded. Please check your database.")
@@ -11,29 +11,25 @@ from pathlib import Path
 
 import folium
 import pandas as pd
-import pyproj
 import streamlit as st
-from shapely import wkt
-from shapely.geometry import Point
-from shapely.ops import nearest_points
-from sqlmodel import Session, create_engine
 from streamlit_folium import st_folium
 
-from property_tracker.config.settings import COASTLINE_PATH, get_database_url
-from property_tracker.services.review import ReviewService
+from property_tracker.config.settings import COASTLINE_PATH
 
 # Add parent directory to path for component imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+from components.area_filter import render_area_filter  # noqa: E402
+from components.listings import get_active_df, get_listings_in_view, map_view, map_viewport, queue_status_update  # noqa: E402
+
 st.set_page_config(page_title="Coast Distance Map", page_icon="🗺️", layout="wide")
 
+# Widget key of the map; its last reported viewport decides which listings are loaded
+MAP_KEY = "coast_map"
+
 st.title("🗺️ Interactive Coast Distance Map")
 st.markdown("This map shows property locations and calculates distance to the Italian coast using Folium.")
 
-# Database connection
-engine = create_engine(get_database_url())
-
-
 # Check if geojson file exists
 geojson_path = str(COASTLINE_PATH)
 if not os.path.exists(geojson_path):
@@ -43,56 +39,47 @@ if not os.path.exists(geojson_path):
 
 
 def update_property_status(property_id: int, new_status: str):
-    """Update property review status and refresh the UI."""
-    with Session(engine) as session:
-        service = ReviewService(session)
-        success = service.update_status(property_id, new_status)
-        if success:
-            st.success(f"Property {property_id} marked as {new_status}!")
-            st.cache_data.clear()
-            if "df" in st.session_state:
-                del st.session_state["df"]
-            st.rerun()
-        else:
-            st.error(f"Failed to update property {property_id}")
-
-
-# Load data from session state or database
-if "df" not in st.session_state:
-    with Session(engine) as session:
-        query = "SELECT * FROM property WHERE sold = 0"
-        df = pd.read_sql(query, con=session.connection())
-        st.session_state["df"] = df
+    """Queue a review status update and refresh the UI."""
+    queue_status_update(property_id, new_status)
+    st.success(f"Property {property_id} marked as {new_status}!")
+    # Shown optimistically on rerun; written by the write-behind queue
+    st.rerun()
+
+
+# Only the listings within a radius, from the spatial index, if an area is chosen;
+# otherwise only those inside the map's last viewport, once the map has reported one
+area_df = render_area_filter(key_prefix="coast")
+viewport = map_viewport(MAP_KEY) if area_df is None else None
+view_df = get_listings_in_view(*viewport) if viewport is not None else None
+if view_df is not None and view_df.empty:
+    st.caption("No listings in the current map view; showing all listings.")
+    view_df = None
+if area_df is not None:
+    df = area_df
+elif view_df is not None:
+    df = view_df
 else:
-    df = st.session_state["df"]
+    # Active listings from the snapshot, kept current through the change feed
+    df = get_active_df()
 
 if df is None or df.empty:
     st.warning("No property data loaded. Please check your database.")
     st.stop()
 
-# Set up coordinate systems
-wgs_proj = pyproj.CRS("EPSG:4326")
-utm_proj = pyproj.CRS("EPSG:32633")
-project = pyproj.Transformer.from_crs(wgs_proj, utm_proj, always_xy=True).transform
-
 
 # Load Italian coastline
 @st.cache_data
 def load_coastline():
-    """Load and parse Italian coastline from GeoJSON."""
-    with open(geojson_path) as f:
-        your_json_file = json.load(f)
+    """Load the Italian coastline GeoJSON for display.
 
-    # Parse the polygon coordinates
-    coords = your_json_file["features"][0]["geometry"]["coordinates"][0]
-    polygon_str = "POLYGON ((" + ", ".join([f"{c[0]} {c[1]}" for c in coords]) + "))"
-    shape = wkt.loads(polygon_str)
-
-    return your_json_file, shape
+    Only drawn as a layer; distances and nearest coast points are read from the stored listing columns.
+    """
+    with open(geojson_path) as f:
+        return json.load(f)
 
 
 try:
-    coastline_geojson, coastline_shape = load_coastline()
+    coastline_geojson = load_coastline()
 except Exception as e:
     st.error(f"Error loading coastline data: {e}")
     st.stop()
@@ -186,6 +173,9 @@ if selected_property != "None" and selected_property in filtered_df["id"].values
         center_lat = 43.0
         center_lon = 12.0
         zoom = 6
+elif map_view(MAP_KEY) is not None:
+    # Keep the view the user panned or zoomed to
+    (center_lat, center_lon), zoom = map_view(MAP_KEY)
 else:
     # Center on Italy
     center_lat = 43.0
@@ -266,23 +256,26 @@ for _idx, row in filtered_df.iterrows():
 if selected_property != "None" and selected_property in filtered_df["id"].values:
     selected_row = filtered_df[filtered_df["id"] == selected_property].iloc[0]
 
-    # Check if selected property has valid coordinates
-    if pd.notna(selected_row["latitude"]) and pd.notna(selected_row["longitude"]):
-        pt = Point(float(selected_row["longitude"]), float(selected_row["latitude"]))
-        p1, p2 = nearest_points(coastline_shape.boundary, pt)
+    # Nearest coast point stored by enrichment next to dist_coast; no geometry work on rerun
+    coast_lat, coast_lon = selected_row.get("coast_lat"), selected_row.get("coast_lon")
+    if pd.notna(selected_row["latitude"]) and pd.notna(selected_row["longitude"]) and pd.notna(coast_lat) and pd.notna(coast_lon):
+        coast_lat, coast_lon = float(coast_lat), float(coast_lon)
+        bearing = selected_row.get("coast_bearing")
+        line_tooltip = f"{selected_row['dist_coast']} km to the coast" + (f", bearing {float(bearing):.0f}°" if pd.notna(bearing) else "")
 
         # Add line to nearest coast point
         folium.PolyLine(
-            locations=[[float(selected_row["latitude"]), float(selected_row["longitude"])], [p1.y, p1.x]],
+            locations=[[float(selected_row["latitude"]), float(selected_row["longitude"])], [coast_lat, coast_lon]],
             color="red",
             weight=3,
             opacity=0.7,
             dash_array="10, 5",
+            tooltip=line_tooltip,
         ).add_to(m)
 
         # Add marker at nearest coast point
         folium.CircleMarker(
-            location=[p1.y, p1.x],
+            location=[coast_lat, coast_lon],
             radius=8,
             color="darkblue",
             fill=True,
@@ -291,6 +284,8 @@ if selected_property != "None" and selected_property in filtered_df["id"].values
             popup="Nearest Coast Point",
             tooltip="Nearest Coast Point",
         ).add_to(m)
+    elif pd.notna(selected_row["latitude"]) and pd.notna(selected_row["longitude"]):
+        st.caption("No nearest coast point stored for this property yet; run `utils/backfill_distances.py` to add it.")
 
 # Add legend
 legend_html = """
@@ -311,7 +306,7 @@ legend_html = """
 m.get_root().html.add_child(folium.Element(legend_html))
 
 # Display the map and capture clicks
-map_data = st_folium(m, width=1400, height=700, key="coast_map")
+map_data = st_folium(m, width=1400, height=700, key=MAP_KEY)
 
 # Display click debugging (temporary)
 if map_data:
@@ -0,0 +1,74 @@
+"""Recompute distances, comune, province and region for every listing in parallel.
+
+Streams located listings in chunks to a process pool and writes the
+results back one chunk per transaction. Progress is saved after every
+chunk, so an interrupted run continues where it stopped when started
+again (use ``--restart`` to start over). Examples:
+
+    uv run python utils/backfill_distances.py
+    uv run python utils/backfill_distances.py --prod --workers 8 --chunk-size 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.exc import SQLAlchemyError
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import (  # noqa: E402
+    BACKFILL_CHUNK_SIZE,
+    DATABASE_PATH,
+    TEST_DATABASE_PATH,
+    get_backfill_state_path,
+)
+from property_tracker.database.connection import create_database_tables  # noqa: E402
+from property_tracker.utils.backfill import backfill, enrichers  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recompute distance and city/province/admin_region columns for all listings across cores")
+    parser.add_argument("--prod", action="store_true", help="Backfill database.db instead of test.db")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help=f"Worker processes (default {os.cpu_count()})")
+    parser.add_argument("--chunk-size", type=int, default=BACKFILL_CHUNK_SIZE, help=f"Listings per chunk (default {BACKFILL_CHUNK_SIZE})")
+    parser.add_argument("--restart", action="store_true", help="Ignore saved progress and start from the first listing")
+    args = parser.parse_args()
+
+    db_path = DATABASE_PATH if args.prod else TEST_DATABASE_PATH
+    state_path = get_backfill_state_path(use_test_db=not args.prod)
+    print(f"Backfilling {', '.join(enrichers())} in {db_path} with {args.workers} workers")
+    started = time.monotonic()
+
+    def progress(done: int, total: int) -> None:
+        rate = done / max(time.monotonic() - started, 1e-9)
+        eta = (total - done) / rate if rate else 0
+        print(f"\r{done:,}/{total:,} listings  {rate:,.0f}/s  ETA {eta:,.0f}s", end="", flush=True)
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    try:
+        # Older databases lack the coast point, comune and amenity columns the backfill writes
+        create_database_tables(engine)
+        result = backfill(engine, workers=args.workers, chunk_size=args.chunk_size, state_path=state_path, restart=args.restart, progress=progress)
+    except KeyboardInterrupt:
+        print(f"\nInterrupted; progress saved to {state_path}, run again to resume")
+        return 130
+    except (SQLAlchemyError, OSError) as e:
+        print(f"\n✗ Backfill of {db_path} failed: {e}")
+        return 1
+    finally:
+        engine.dispose()
+
+    resumed = f" (resumed after id {result.resumed_after})" if result.resumed_after is not None else ""
+    print(f"\n✓ {result.rows:,} listings enriched, {result.updated:,} changed, in {result.seconds:.1f}s{resumed}")
+    lookups = result.memo_hits + result.memo_misses
+    if lookups:
+        print(f"  Distance memo: {result.memo_hits:,} hits, {result.memo_misses:,} misses ({result.memo_hits / lookups:.0%} hit rate)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
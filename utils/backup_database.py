@@ -0,0 +1,73 @@
+"""Take, list, verify and restore online database snapshots.
+
+Snapshots use the SQLite backup API, so they are safe while the scraper
+or the UI is writing. Examples:
+
+    uv run python utils/backup_database.py snapshot --prod
+    uv run python utils/backup_database.py list
+    uv run python utils/backup_database.py verify backups/database-20250101-030000-000000.db.gz
+    uv run python utils/backup_database.py restore backups/database-20250101-030000-000000.db.gz --prod
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import BACKUP_COMPRESS, BACKUP_DIR, BACKUP_KEEP, DATABASE_PATH, TEST_DATABASE_PATH  # noqa: E402
+from property_tracker.database.backup import (  # noqa: E402
+    BackupVerificationError,
+    list_backups,
+    restore_database,
+    snapshot_database,
+    verify_backup,
+)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Online SQLite snapshots of the property database")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    snapshot = subparsers.add_parser("snapshot", help="Take a verified snapshot")
+    snapshot.add_argument("--prod", action="store_true", help="Snapshot database.db instead of test.db")
+    snapshot.add_argument("--no-compress", action="store_true", help="Keep the snapshot uncompressed")
+    snapshot.add_argument("--keep", type=int, default=BACKUP_KEEP, help=f"Snapshots to keep (default {BACKUP_KEEP})")
+    snapshot.add_argument("--dir", default=str(BACKUP_DIR), help=f"Backup directory (default {BACKUP_DIR})")
+
+    listing = subparsers.add_parser("list", help="List snapshots")
+    listing.add_argument("--dir", default=str(BACKUP_DIR), help=f"Backup directory (default {BACKUP_DIR})")
+
+    verify = subparsers.add_parser("verify", help="Check a snapshot's integrity and row counts")
+    verify.add_argument("path", help="Snapshot file")
+
+    restore = subparsers.add_parser("restore", help="Verify a snapshot and restore it")
+    restore.add_argument("path", help="Snapshot file")
+    restore.add_argument("--prod", action="store_true", help="Restore into database.db instead of test.db")
+
+    args = parser.parse_args()
+
+    try:
+        if args.command == "snapshot":
+            db_path = DATABASE_PATH if args.prod else TEST_DATABASE_PATH
+            result = snapshot_database(db_path, backup_dir=args.dir, compress=BACKUP_COMPRESS and not args.no_compress, keep=args.keep)
+            print(f"✓ Snapshot of {db_path} written to {result.path} ({result.pages} pages in {result.seconds:.1f}s)")
+            print(f"  property rows: {result.row_counts.get('property', 0)}")
+        elif args.command == "list":
+            for path in list_backups(args.dir):
+                print(path)
+        elif args.command == "verify":
+            counts = verify_backup(args.path)
+            print(f"✓ {args.path} passed integrity check; {len(counts)} tables match the manifest")
+        elif args.command == "restore":
+            db_path = DATABASE_PATH if args.prod else TEST_DATABASE_PATH
+            counts = restore_database(args.path, db_path)
+            print(f"✓ Restored {args.path} into {db_path} (property rows: {counts.get('property', 0)})")
+    except (BackupVerificationError, FileNotFoundError) as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
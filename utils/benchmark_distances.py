@@ -0,0 +1,98 @@
+"""Benchmark per-point distance calculation against the vectorised batch API.
+
+Times the original per-point path (WKT point, ``nearest_points`` against
+the whole coastline, ``shapely.ops.transform`` with a Python callback)
+against ``DistanceCalculator.calculate_coast_distances`` (and the water
+equivalents when ``ITA_water_lines.json`` is present) for random points
+over the scraped search box, and prints the largest difference between
+them. The original coast path picked the nearest point in degrees, so it
+overestimates some coast distances; the calculator measures in metres.
+
+Usage:
+    uv run python utils/benchmark_distances.py               # 10k points
+    uv run python utils/benchmark_distances.py --points 2000
+"""
+
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+import numpy as np
+from shapely import wkt
+from shapely.ops import nearest_points, transform
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import WATERLINES_PATH  # noqa: E402
+from property_tracker.utils.distance import DistanceCalculator  # noqa: E402
+
+# Search box of main.py: (min_lat, max_lat, min_lng, max_lng)
+BOX = (43.5, 47.1, 6.6, 14.0)
+
+
+def legacy_coast_distance(calc: DistanceCalculator, lat: float, lon: float) -> float:
+    """The per-point coast distance as originally implemented."""
+    point = wkt.loads(f"POINT ({lon} {lat})")
+    p_coast, p_query = nearest_points(calc._coastline.boundary, point)
+    return transform(calc._transformer.transform, p_coast).distance(transform(calc._transformer.transform, p_query)) / 1000.0
+
+
+def legacy_water_distance(calc: DistanceCalculator, lat: float, lon: float) -> float:
+    """The per-point water distance as originally implemented."""
+    point_utm = transform(calc._transformer.transform, wkt.loads(f"POINT ({lon} {lat})"))
+    return point_utm.distance(calc._water_lines[calc._water_tree.nearest(point_utm)]) / 1000.0
+
+
+def _time(label: str, per_point, batch, lats: np.ndarray, lons: np.ndarray) -> None:
+    """Time both paths over the same points and print the speedup."""
+    start = time.perf_counter()
+    expected = np.array([per_point(lat, lon) for lat, lon in zip(lats, lons, strict=True)])
+    loop_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    actual = batch(lats, lons)
+    batch_seconds = time.perf_counter() - start
+
+    print(f"{label:<6} per-point {loop_seconds:8.3f}s   batch {batch_seconds:8.3f}s   speedup {loop_seconds / batch_seconds:7.1f}x")
+    print(f"{'':<6} max difference {np.abs(expected - actual).max():.2e} km")
+
+
+def _time_single(calc: DistanceCalculator, lats: np.ndarray, lons: np.ndarray) -> None:
+    """Time the single-point coast distance, as called once per listing."""
+    start = time.perf_counter()
+    for lat, lon in zip(lats, lons, strict=True):
+        calc.calculate_coast_distance(lat, lon)
+    seconds = time.perf_counter() - start
+    print(f"{'':<6} single-point calls {seconds / len(lats) * 1e6:8.1f}us per call")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-point vs vectorised distance calculation")
+    parser.add_argument("--points", type=int, default=10_000, help="Random points (default 10000)")
+    args = parser.parse_args()
+
+    # The legacy path deliberately uses the deprecated shapely.ops.transform
+    warnings.filterwarnings("ignore", category=DeprecationWarning)
+
+    rng = np.random.default_rng(42)
+    lats = rng.uniform(BOX[0], BOX[1], args.points)
+    lons = rng.uniform(BOX[2], BOX[3], args.points)
+
+    calc = DistanceCalculator()
+    # Load data up front so neither path pays for it
+    calc.calculate_coast_distance(45.0, 10.0)
+    print(f"{args.points:,} points")
+    _time("coast", lambda lat, lon: legacy_coast_distance(calc, lat, lon), calc.calculate_coast_distances, lats, lons)
+    _time_single(calc, lats[:1000], lons[:1000])
+
+    if WATERLINES_PATH.exists():
+        calc.calculate_water_distance(45.0, 10.0)
+        _time("water", lambda lat, lon: legacy_water_distance(calc, lat, lon), calc.calculate_water_distances, lats, lons)
+    else:
+        print(f"water  skipped: {WATERLINES_PATH} not found")
+
+
+if __name__ == "__main__":
+    main()
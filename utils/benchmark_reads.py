@@ -0,0 +1,115 @@
+"""Benchmark ORM reads against the PropertyRepository read layer.
+
+Builds a scratch database with synthetic listings and times loading the
+active listings through SQLModel objects (``select(Property)`` +
+``model_dump()``) versus Core projections via ``PropertyRepository``.
+
+Usage:
+    uv run python utils/benchmark_reads.py               # 100k rows
+    uv run python utils/benchmark_reads.py --rows 20000 --repeat 5
+"""
+
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import pandas as pd
+from sqlalchemy import insert
+from sqlmodel import Session, create_engine, select
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.database.connection import create_database_tables  # noqa: E402
+from property_tracker.database.repository import PropertyRepository  # noqa: E402
+from property_tracker.models.property import Property  # noqa: E402
+
+REGIONS = ["TUSCANY", "LIGURIA", "PIEMONTE", "EMILIA-ROMAGNA", "LOMBARDIA"]
+UI_COLUMNS = ["id", "region", "price", "latitude", "longitude", "dist_coast", "review_status"]
+
+
+def _populate(engine, rows: int) -> None:
+    """Insert synthetic listings with one Core executemany per chunk (the property triggers still fire)."""
+    rng = random.Random(42)
+    chunk = []
+    with engine.begin() as connection:
+        for i in range(1, rows + 1):
+            chunk.append(
+                {
+                    "id": i,
+                    "region": rng.choice(REGIONS),
+                    "category": "house",
+                    "price": rng.randint(20_000, 900_000),
+                    "price_m": rng.randint(300, 6_000),
+                    "discription": "Casa " * 40,
+                    "discription_dk": "Hus " * 40,
+                    "photo_list": "[]",
+                    "latitude": f"{rng.uniform(43.5, 47.1):.6f}",
+                    "longitude": f"{rng.uniform(6.6, 14.0):.6f}",
+                    "dist_coast": f"{rng.uniform(0, 200):.2f}",
+                    "dist_water": f"{rng.uniform(0, 20):.2f}",
+                    "sold": 0,
+                    "review_status": "To Review",
+                }
+            )
+            if len(chunk) == 10_000:
+                connection.execute(insert(Property.__table__), chunk)
+                chunk = []
+        if chunk:
+            connection.execute(insert(Property.__table__), chunk)
+
+
+def _time(label: str, repeat: int, load) -> float:
+    """Run a loader ``repeat`` times and print the best time."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = load()
+        best = min(best, time.perf_counter() - started)
+    print(f"{label:<45} {best * 1000:9.1f} ms  ({len(result)} rows)")
+    return best
+
+
+def main():
+    """Parse arguments and run the benchmark."""
+    parser = argparse.ArgumentParser(description="Compare ORM and repository read paths")
+    parser.add_argument("--rows", type=int, default=100_000, help="Synthetic listings to load (default: 100000)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per path; the best is reported (default: 3)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{Path(tmp) / 'bench.db'}")
+        create_database_tables(engine)
+        print(f"Populating {args.rows} listings...")
+        _populate(engine, args.rows)
+
+        with Session(engine) as session:
+
+            def orm_df():
+                properties = session.exec(select(Property).where(Property.sold == 0)).all()
+                df = pd.DataFrame([prop.model_dump() for prop in properties])
+                session.expunge_all()
+                return df
+
+            def orm_status():
+                properties = session.exec(select(Property).where(Property.sold == 0).where(Property.review_status == "To Review")).all()
+                session.expunge_all()
+                return properties
+
+            repository = PropertyRepository(session)
+            orm = _time("ORM select(Property) + model_dump -> DataFrame", args.repeat, orm_df)
+            core = _time("Repository fetch_df (all columns)", args.repeat, lambda: repository.fetch_df())
+            _time("Repository fetch_arrays (UI columns)", args.repeat, lambda: repository.fetch_arrays(UI_COLUMNS)["id"])
+            print()
+            orm_rows = _time("ORM get_properties_by_status path", args.repeat, orm_status)
+            rows = _time("Repository fetch_rows (all columns)", args.repeat, lambda: repository.fetch_rows(status="To Review"))
+
+        engine.dispose()
+
+    print(f"\nDataFrame load: {orm / core:.1f}x faster; status rows: {orm_rows / rows:.1f}x faster")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Build the precomputed distance rasters used for fast distance lookups.
+
+Computes distance-to-coast and distance-to-water over the search box at a
+fixed grid spacing and writes one memory-mapped ``.npy`` file per layer
+to ``DISTANCE_RASTER_DIR``. Once built, ``raster_distances()`` reads
+distances from the rasters and only calculates exactly close to the coast
+or water; ``main.py`` and the backfill use the water raster, since the
+coast distance is measured together with the nearest coast point.
+A raster built from an older boundary file is ignored until rebuilt. Examples:
+
+    uv run python utils/build_distance_raster.py                  # both layers, 100 m
+    uv run python utils/build_distance_raster.py --layers coast --resolution 250
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import DISTANCE_RASTER_DIR, DISTANCE_RASTER_RESOLUTION_M  # noqa: E402
+from property_tracker.utils.distance_raster import LAYERS, SOURCES, build_distance_raster, distance_layers  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rasterise distance to coast and water over the search box")
+    parser.add_argument("--layers", nargs="+", choices=LAYERS, default=list(LAYERS), help="Layers to build (default: all)")
+    parser.add_argument(
+        "--resolution", type=float, default=DISTANCE_RASTER_RESOLUTION_M, help=f"Grid spacing in metres (default {DISTANCE_RASTER_RESOLUTION_M:g})"
+    )
+    parser.add_argument("--out", default=str(DISTANCE_RASTER_DIR), help=f"Output directory (default {DISTANCE_RASTER_DIR})")
+    args = parser.parse_args()
+
+    built = 0
+    for layer in args.layers:
+        if layer not in distance_layers():
+            print(f"{layer}: skipped, {SOURCES[layer]} not found")
+            continue
+        started = time.monotonic()
+
+        def progress(done: int, total: int, layer: str = layer) -> None:
+            print(f"\r{layer}: {done}/{total} rows", end="", flush=True)
+
+        path = build_distance_raster(layer, resolution_m=args.resolution, raster_dir=args.out, progress=progress)
+        print(f"\r{layer}: {path} ({path.stat().st_size / 1024 / 1024:.1f} MB) in {time.monotonic() - started:.1f}s")
+        built += 1
+    return 0 if built else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+"""Cut the water network into simplified tiles for on-demand loading.
+
+Reads ``ITA_water_lines.json`` (or ``--source``), projects it to UTM,
+clips it into square tiles, simplifies each tile's lines and writes one
+``.npz`` per tile into a new build directory of ``WATER_TILE_DIR``, then
+switches its ``index.json`` to the new build. Once built,
+water distances load only the tiles near the listings being enriched.
+Rebuild after replacing the water lines file. Examples:
+
+    uv run python utils/build_water_tiles.py
+    uv run python utils/build_water_tiles.py --tile-size 20000 --tolerance 25
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import WATER_TILE_DIR, WATER_TILE_SIMPLIFY_M, WATER_TILE_SIZE_M, WATERLINES_PATH  # noqa: E402
+from property_tracker.utils.water_tiles import build_water_tiles  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Split the water network into simplified UTM tiles")
+    parser.add_argument("--source", default=str(WATERLINES_PATH), help=f"Water lines GeoJSON (default {WATERLINES_PATH})")
+    parser.add_argument("--out", default=str(WATER_TILE_DIR), help=f"Output directory (default {WATER_TILE_DIR})")
+    parser.add_argument("--tile-size", type=float, default=WATER_TILE_SIZE_M, help=f"Tile edge in metres (default {WATER_TILE_SIZE_M:g})")
+    parser.add_argument(
+        "--tolerance", type=float, default=WATER_TILE_SIMPLIFY_M, help=f"Simplification tolerance in metres (default {WATER_TILE_SIMPLIFY_M:g})"
+    )
+    args = parser.parse_args()
+
+    if not Path(args.source).exists():
+        print(f"Water lines not found: {args.source}")
+        return 1
+    started = time.monotonic()
+    index = build_water_tiles(args.source, args.out, tile_size_m=args.tile_size, tolerance_m=args.tolerance)
+    vertices = sum(index["tiles"].values())
+    print(f"✓ {len(index['tiles']):,} tiles, {vertices:,} vertices written to {args.out} in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,43 @@
+"""Import train stations, hospitals, motorway exits, airports and town centres from a local extract.
+
+Reads an OSM-derived GeoJSON (features with their OSM tags as properties,
+e.g. from ``osmium export`` or an Overpass export) or a CSV with
+``class``, ``lat`` and ``lon`` columns, and writes projected coordinates
+per class to ``AMENITY_INDEX_PATH``. Once imported, ``main.py`` and the
+backfill fill the ``dist_<class>`` columns without any network calls.
+Examples:
+
+    uv run python utils/import_amenities.py data/osm/italy_amenities.geojson
+    uv run python utils/import_amenities.py amenities.csv --out /tmp/amenities.npz
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import AMENITY_INDEX_PATH  # noqa: E402
+from property_tracker.utils.amenities import import_amenities  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import amenities from a local OSM-derived GeoJSON or CSV extract")
+    parser.add_argument("source", help="GeoJSON of OSM features, or CSV with class, lat and lon columns")
+    parser.add_argument("--out", default=str(AMENITY_INDEX_PATH), help=f"Output index (default {AMENITY_INDEX_PATH})")
+    args = parser.parse_args()
+
+    if not Path(args.source).exists():
+        print(f"Extract not found: {args.source}")
+        return 1
+    started = time.monotonic()
+    counts = import_amenities(args.source, args.out)
+    for amenity_class, count in counts.items():
+        print(f"  {amenity_class:<14} {count:>7,}")
+    print(f"✓ {sum(counts.values()):,} amenities written to {args.out} in {time.monotonic() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
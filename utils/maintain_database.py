@@ -0,0 +1,39 @@
+"""Run post-run maintenance on the property database.
+
+Refreshes planner statistics, releases free pages, checkpoints the WAL
+and runs a quick integrity check within a time budget. ``main.py`` runs
+the same steps after each scrape. Examples:
+
+    uv run python utils/maintain_database.py
+    uv run python utils/maintain_database.py --prod --budget 300
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.config.settings import DATABASE_PATH, MAINTENANCE_BUDGET_SECONDS, TEST_DATABASE_PATH  # noqa: E402
+from property_tracker.database.maintenance import run_maintenance  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="ANALYZE, incremental vacuum, WAL checkpoint and quick_check within a time budget")
+    parser.add_argument("--prod", action="store_true", help="Maintain database.db instead of test.db")
+    parser.add_argument(
+        "--budget", type=float, default=MAINTENANCE_BUDGET_SECONDS, help=f"Time budget in seconds (default {MAINTENANCE_BUDGET_SECONDS:g})"
+    )
+    args = parser.parse_args()
+
+    db_path = DATABASE_PATH if args.prod else TEST_DATABASE_PATH
+    result = run_maintenance(db_path, budget_seconds=args.budget)
+    print(f"Maintenance of {db_path}:")
+    for step in result.steps:
+        print(f"  {step.name:<12} {step.status:<12} {step.seconds:>7.2f}s {step.reclaimed_bytes:>12,} bytes  {step.detail}")
+    print(f"{'✓' if result.ok else '✗'} {result.size_before:,} -> {result.size_after:,} bytes in {result.seconds:.2f}s")
+    return 0 if result.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
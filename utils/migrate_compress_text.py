@@ -0,0 +1,89 @@
+"""Compress the description, translation and photo columns of existing rows.
+
+New and updated rows are written compressed by the ``CompressedText``
+column type; this converts rows stored before it as plain TEXT, then
+VACUUMs the database so the freed pages are returned to the filesystem.
+Rows that are already compressed are skipped, so it is safe to rerun.
+"""
+
+import sys
+from pathlib import Path
+
+from sqlmodel import create_engine
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.database.compression import COMPRESSED_COLUMNS, compress_existing_rows  # noqa: E402
+
+
+def _column_bytes(connection) -> dict[str, int]:
+    """Stored size of each compressed column, in bytes."""
+    return {
+        name: connection.exec_driver_sql(f"SELECT COALESCE(SUM(length(CAST({name} AS BLOB))), 0) FROM property").scalar()
+        for name in COMPRESSED_COLUMNS
+    }
+
+
+def _file_stats(connection) -> tuple[int, int]:
+    """(page count, page size) of the database file."""
+    return connection.exec_driver_sql("PRAGMA page_count").scalar(), connection.exec_driver_sql("PRAGMA page_size").scalar()
+
+
+def compress_database(db_path: str) -> bool:
+    """Compress the text columns of a database and report the sizes before and after.
+
+    Args:
+        db_path: Path to the SQLite database file
+
+    Returns:
+        True if successful, False otherwise
+    """
+    try:
+        engine = create_engine(f"sqlite:///{db_path}")
+        print(f"\nCompressing text columns in: {db_path}")
+
+        with engine.begin() as connection:
+            columns_before = _column_bytes(connection)
+            pages_before, page_size = _file_stats(connection)
+            converted = compress_existing_rows(connection, "property", COMPRESSED_COLUMNS)
+            columns_after = _column_bytes(connection)
+
+        # VACUUM cannot run inside a transaction
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+            connection.exec_driver_sql("VACUUM")
+            pages_after, _ = _file_stats(connection)
+        engine.dispose()
+
+        print(f"✓ Compressed {converted} values")
+        for name in COMPRESSED_COLUMNS:
+            print(f"  {name:<15} {columns_before[name]:>12,} -> {columns_after[name]:>12,} bytes")
+        print(f"  {'file':<15} {pages_before * page_size:>12,} -> {pages_after * page_size:>12,} bytes ({pages_before} -> {pages_after} pages)")
+        return True
+
+    except Exception as e:
+        print(f"✗ Error compressing {db_path}: {e}")
+        return False
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compress description and photo columns of existing rows")
+    parser.add_argument("--prod", action="store_true", help="Also compress database.db (production)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("Compress Text Columns Migration")
+    print("=" * 60)
+
+    success_test = compress_database("test.db")
+    success_prod = compress_database("database.db") if args.prod else True
+
+    print()
+    print("=" * 60)
+    if success_test and success_prod:
+        print("✓ Migration completed successfully!")
+        sys.exit(0)
+    else:
+        print("✗ Migration failed. Check errors above.")
+        sys.exit(1)
@@ -0,0 +1,53 @@
+"""Rank the statements in the slow-query log.
+
+Enable the log with ``SLOW_QUERY_LOG=true`` (and optionally
+``SLOW_QUERY_THRESHOLD_MS``), use the app or run ``main.py``, then run this
+script to see which statements cost the most in total or at the 95th
+percentile, where they are issued from and how SQLite plans them.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from property_tracker.database.querylog import read_query_log, summarize  # noqa: E402
+
+
+def print_report(log_path: str | None, order_by: str, top: int, show_plans: bool) -> None:
+    """Print the slowest statements in the log.
+
+    Args:
+        log_path: Log file (None for ``SLOW_QUERY_LOG_PATH``)
+        order_by: Ranking key ("total_ms", "p95_ms", "max_ms" or "count")
+        top: Number of statements to show
+        show_plans: Also print each statement's query plan
+    """
+    records = read_query_log(log_path)
+    if not records:
+        print("No statements logged.")
+        return
+
+    summary = summarize(records, order_by=order_by)
+    print(f"{len(records)} slow statements, {len(summary)} distinct (ranked by {order_by})\n")
+    print(f"{'count':>6} {'total ms':>11} {'p95 ms':>9} {'max ms':>9}  statement")
+    for row in summary[:top]:
+        statement = row["statement"] if len(row["statement"]) <= 100 else row["statement"][:97] + "..."
+        print(f"{row['count']:>6} {row['total_ms']:>11,.1f} {row['p95_ms']:>9,.1f} {row['max_ms']:>9,.1f}  {statement}")
+        print(f"{'':>39}  at {row['call_site']}")
+        if show_plans and row["plan"]:
+            for line in row["plan"]:
+                print(f"{'':>41}{line}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Rank statements in the slow-query log by total or p95 time")
+    parser.add_argument("--log", default=None, help="Log file (default: SLOW_QUERY_LOG_PATH)")
+    parser.add_argument("--by", choices=["total", "p95", "max", "count"], default="total", help="Ranking (default: total)")
+    parser.add_argument("--top", type=int, default=20, help="Statements to show (default: 20)")
+    parser.add_argument("--plans", action="store_true", help="Print each statement's EXPLAIN QUERY PLAN")
+    args = parser.parse_args()
+
+    print_report(args.log, "count" if args.by == "count" else f"{args.by}_ms", args.top, args.plans)